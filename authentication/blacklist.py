@@ -0,0 +1,232 @@
+"""
+Refresh token blacklist for Student Course Management System
+
+Revoked refresh tokens are stored by id (jti) in RevokedToken until they
+expire, and prune_revoked_tokens() deletes expired rows a batch at a time,
+so the table stays bounded by one refresh token lifetime of revocations.
+
+Revoking is a single primary key INSERT that fails if the token was
+already revoked, which makes rotation safe across processes: two refreshes
+racing with the same token cannot both succeed. Lookups go through a
+process-local Bloom filter of revoked ids first; a negative answer (the
+common case of a valid token) needs no query, and a positive one is
+confirmed with a primary key lookup. The filter syncs recent revocations
+from the database every few seconds, and since the INSERT is the
+authority, a filter that has not seen a revocation yet only costs the
+early rejection, never correctness.
+
+Building the filter reads every unexpired revocation, which takes seconds
+for millions of rows, so it runs in a background thread started by the
+first lookup (and again when the filter saturates). Until the first build
+finishes every lookup goes to the database.
+"""
+import hashlib
+import logging
+import math
+import threading
+import time
+from datetime import timedelta
+from itertools import islice
+
+import numpy as np
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+from .models import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+
+def get_filter_capacity():
+    """Revoked ids the Bloom filter is sized for before it is rebuilt larger"""
+    return max(1000, getattr(settings, 'TOKEN_BLACKLIST_FILTER_CAPACITY', 1_000_000))
+
+
+def get_filter_error_rate():
+    """Target false positive rate of the Bloom filter"""
+    return min(max(getattr(settings, 'TOKEN_BLACKLIST_FILTER_ERROR_RATE', 0.001), 1e-9), 0.5)
+
+
+def get_sync_interval():
+    """Seconds between syncs of the Bloom filter with the database"""
+    return max(0, getattr(settings, 'TOKEN_BLACKLIST_SYNC_INTERVAL', 5))
+
+
+# Ids hashed per NumPy pass when loading the filter
+LOAD_CHUNK_SIZE = 100000
+
+# Revocations committed this long after their revoked_at are still picked
+# up by the next sync
+SYNC_LAG = timedelta(seconds=60)
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter of strings.
+
+    Keys are hashed and their bit positions computed with NumPy, so loading
+    millions of ids costs one digest per key and a few array passes.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        self.count = 0
+
+    def _locate(self, keys):
+        """(offsets, masks) arrays of shape (len(keys), hash_count) locating the bits of keys"""
+        # Double hashing: k positions from the two 64-bit halves of one digest
+        digests = b''.join(hashlib.blake2b(key.encode(), digest_size=16).digest()
+                           for key in keys)
+        halves = np.frombuffer(digests, dtype='<u8').reshape(-1, 2)
+        steps = np.arange(self.hash_count, dtype=np.uint64)
+        positions = (halves[:, :1] + steps * (halves[:, 1:] | np.uint64(1))) % np.uint64(self.size)
+        return positions >> np.uint64(3), np.left_shift(1, positions & np.uint64(7)).astype(np.uint8)
+
+    def _present(self, offsets, masks):
+        return np.all(self.bits[offsets] & masks, axis=1)
+
+    def update(self, keys):
+        offsets, masks = self._locate(keys)
+        self.count += int(np.count_nonzero(~self._present(offsets, masks)))
+        offsets, masks = offsets.ravel(), masks.ravel()
+        for bit in range(8):
+            # Repeated offsets all set the same bit, so plain assignment is exact
+            selected = offsets[masks == 1 << bit]
+            self.bits[selected] |= np.uint8(1 << bit)
+
+    def __contains__(self, key):
+        return bool(self._present(*self._locate([key]))[0])
+
+    @property
+    def saturated(self):
+        return self.count > self.capacity
+
+
+class RevocationFilter:
+    """Process-local Bloom filter of the unexpired revoked token ids"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bloom = None
+        self._loading = False
+        # Ids revoked by this process while a build is running
+        self._pending = []
+        self._synced_at = None
+        self._checked = 0.0
+
+    def _load(self, bloom, revoked):
+        jtis = revoked.values_list('jti', flat=True).iterator(chunk_size=LOAD_CHUNK_SIZE)
+        while chunk := list(islice(jtis, LOAD_CHUNK_SIZE)):
+            bloom.update(chunk)
+
+    def load(self):
+        """Build the filter from every unexpired revocation and start using it"""
+        started = timezone.now()
+        revoked = RevokedToken.objects.filter(expires_at__gt=started)
+        capacity = max(get_filter_capacity(), 2 * revoked.count())
+        bloom = BloomFilter(capacity, get_filter_error_rate())
+        self._load(bloom, revoked)
+        with self._lock:
+            if self._pending:
+                bloom.update(self._pending)
+            self._bloom = bloom
+            self._pending = []
+            self._synced_at = started
+            # Pick up what was revoked elsewhere during the build right away
+            self._checked = 0.0
+
+    def _load_in_background(self):
+        try:
+            self.load()
+        except Exception:
+            logger.exception('Loading the token revocation filter failed')
+        finally:
+            connections.close_all()
+            with self._lock:
+                self._loading = False
+
+    def _sync(self):
+        now = timezone.now()
+        self._load(self._bloom, RevokedToken.objects.filter(
+            expires_at__gt=now, revoked_at__gte=self._synced_at - SYNC_LAG))
+        self._synced_at = now
+        self._checked = time.monotonic()
+
+    def might_contain(self, jti):
+        """False when jti is certainly not revoked (as of the last sync)"""
+        with self._lock:
+            if (self._bloom is None or self._bloom.saturated) and not self._loading:
+                # A saturated filter stays in use, with more false
+                # positives, until its replacement is built
+                self._loading = True
+                threading.Thread(target=self._load_in_background,
+                                 name='revocation-filter-load', daemon=True).start()
+            if self._bloom is None:
+                return True
+            if time.monotonic() - self._checked >= get_sync_interval():
+                self._sync()
+            return jti in self._bloom
+
+    def add(self, jti):
+        with self._lock:
+            if self._loading:
+                self._pending.append(jti)
+            if self._bloom is not None:
+                self._bloom.update([jti])
+
+    def reset(self):
+        with self._lock:
+            self._bloom = None
+
+
+revocation_filter = RevocationFilter()
+
+
+def is_token_revoked(jti):
+    """Whether the refresh token with id jti has been revoked"""
+    if not revocation_filter.might_contain(jti):
+        return False
+    return RevokedToken.objects.filter(pk=jti).exists()
+
+
+def revoke_token(jti, expires_at):
+    """
+    Revoke the refresh token with id jti.
+
+    Returns False if it was already revoked, so the caller that revokes a
+    token while rotating it knows whether it was the first to use it.
+    """
+    try:
+        with transaction.atomic():
+            RevokedToken.objects.create(jti=jti, expires_at=expires_at)
+    except IntegrityError:
+        return False
+    revocation_filter.add(jti)
+    return True
+
+
+def prune_revoked_tokens(batch_size=10000):
+    """
+    Delete the revocations of expired tokens, batch_size rows per
+    transaction, along with expired rows of the simplejwt outstanding token
+    table. Returns (revocations deleted, outstanding tokens deleted).
+    """
+    now = timezone.now()
+    counts = []
+    for model in (RevokedToken, OutstandingToken):
+        expired = model.objects.filter(expires_at__lte=now)
+        deleted = 0
+        while True:
+            with transaction.atomic():
+                keys = list(expired.values_list('pk', flat=True)[:batch_size])
+                if not keys:
+                    break
+                deleted += model.objects.filter(pk__in=keys).delete()[1].get(
+                    model._meta.label, 0)
+        counts.append(deleted)
+    return tuple(counts)
@@ -0,0 +1,124 @@
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from authentication.blacklist import revocation_filter
+from authentication.models import RevokedToken
+from authentication.serializers import ClaimsTokenRefreshSerializer
+from authentication.tokens import ClaimsRefreshToken
+
+User = get_user_model()
+
+# Prefix of the ids of the seeded historical tokens
+BENCH_PREFIX = 'bench-'
+
+
+def _percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Command(BaseCommand):
+    help = 'Time token refreshes against a blacklist holding many historical tokens'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tokens',
+            type=int,
+            default=10_000_000,
+            help='Historical revoked tokens seeded into the blacklist',
+        )
+        parser.add_argument(
+            '--refreshes',
+            type=int,
+            default=1000,
+            help='Number of chained refreshes timed',
+        )
+        parser.add_argument(
+            '--username',
+            default=None,
+            help='User the tokens are issued to (default: the first active user)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Rows inserted per query while seeding',
+        )
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help='Keep the seeded tokens for later runs',
+        )
+
+    def seed(self, count, batch_size):
+        """Insert historical revocations, half of them already expired"""
+        existing = RevokedToken.objects.filter(jti__startswith=BENCH_PREFIX).count()
+        now = timezone.now()
+        started = time.perf_counter()
+        for first in range(existing, count, batch_size):
+            RevokedToken.objects.bulk_create([
+                RevokedToken(
+                    jti=f'{BENCH_PREFIX}{index:012d}',
+                    expires_at=now + timedelta(minutes=index % 20160 - 10080))
+                for index in range(first, min(first + batch_size, count))
+            ])
+        if count > existing:
+            self.stdout.write(
+                f'Seeded {count - existing} token(s) in {time.perf_counter() - started:.1f}s')
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(is_active=True).order_by('pk')
+        if options['username']:
+            users = users.filter(username=options['username'])
+        user = users.first()
+        if user is None:
+            raise CommandError('No active user to issue tokens to')
+
+        self.seed(max(0, options['tokens']), max(1, options['batch_size']))
+        total = RevokedToken.objects.count()
+
+        revocation_filter.reset()
+        started = time.perf_counter()
+        revocation_filter.load()
+        self.stdout.write(f'Loaded the revocation filter from {total} row(s) in '
+                          f'{time.perf_counter() - started:.2f}s')
+
+        queries = 0
+
+        def count_queries(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        first = token = str(ClaimsRefreshToken.for_user(user))
+        timings = []
+        with connection.execute_wrapper(count_queries):
+            for _ in range(max(1, options['refreshes'])):
+                serializer = ClaimsTokenRefreshSerializer(data={'refresh': token})
+                started = time.perf_counter()
+                serializer.is_valid(raise_exception=True)
+                timings.append(time.perf_counter() - started)
+                token = serializer.validated_data['refresh']
+
+        try:
+            ClaimsTokenRefreshSerializer(data={'refresh': first}).is_valid(raise_exception=True)
+        except (InvalidToken, TokenError):
+            pass
+        else:
+            raise CommandError('A rotated refresh token was accepted again')
+
+        if not options['keep']:
+            RevokedToken.objects.filter(jti__startswith=BENCH_PREFIX).delete()
+            revocation_filter.reset()
+
+        timings.sort()
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(timings)} refreshes against {total} revoked token(s): '
+            f'p50 {_percentile(timings, 0.5) * 1000:.2f}ms, '
+            f'p95 {_percentile(timings, 0.95) * 1000:.2f}ms, '
+            f'p99 {_percentile(timings, 0.99) * 1000:.2f}ms, '
+            f'{queries / len(timings):.1f} queries per refresh'))
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+from authentication.blacklist import prune_revoked_tokens
+
+
+class Command(BaseCommand):
+    help = 'Delete revoked and outstanding refresh tokens that have expired'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Rows deleted per transaction',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=None,
+            help='Repeat the pruning every INTERVAL seconds instead of running it once',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        interval = options['interval']
+        try:
+            while True:
+                started = time.perf_counter()
+                revoked, outstanding = prune_revoked_tokens(batch_size)
+                if revoked or outstanding or interval is None:
+                    self.stdout.write(self.style.SUCCESS(
+                        f'Pruned {revoked} revoked and {outstanding} outstanding '
+                        f'token(s) in {time.perf_counter() - started:.2f}s'))
+                if interval is None:
+                    return
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.SUCCESS('Stopped'))
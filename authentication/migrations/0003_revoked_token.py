@@ -0,0 +1,42 @@
+# Generated by Django 5.2.5 on 2026-10-17 21:28
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def copy_blacklisted_tokens(apps, schema_editor):
+    """Carry over the unexpired tokens of simplejwt's blacklist"""
+    BlacklistedToken = apps.get_model('token_blacklist', 'BlacklistedToken')
+    RevokedToken = apps.get_model('authentication', 'RevokedToken')
+
+    rows = BlacklistedToken.objects.filter(
+        token__expires_at__gt=timezone.now(),
+    ).values_list('token__jti', 'token__expires_at')
+    RevokedToken.objects.bulk_create([
+        RevokedToken(jti=jti, expires_at=expires_at)
+        for jti, expires_at in rows.iterator(chunk_size=10000)
+    ], batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0002_user_token_version'),
+        ('token_blacklist', '0012_alter_outstandingtoken_user'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevokedToken',
+            fields=[
+                ('jti', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('expires_at', models.DateTimeField()),
+                ('revoked_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'revoked_tokens',
+                'indexes': [models.Index(fields=['expires_at'], name='revoked_token_expiry_idx'), models.Index(fields=['revoked_at'], name='revoked_token_revoked_idx')],
+            },
+        ),
+        migrations.RunPython(copy_blacklisted_tokens, migrations.RunPython.noop),
+    ]
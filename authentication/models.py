@@ -1,5 +1,11 @@
+from django.apps import apps
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils.functional import cached_property
+
+# Fields whose change revokes the user's outstanding tokens (see token_version)
+TOKEN_STATE_FIELDS = ('username', 'password', 'role', 'is_superuser', 'is_staff',
+                      'is_active')
 
 class User(AbstractUser):
     """
@@ -38,6 +44,12 @@ class User(AbstractUser):
         null=True,
         help_text="Profile picture"
     )
+    token_version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Bumped when the claims carried by the user's tokens change; "
+                  "refresh tokens of an older version are rejected"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -49,6 +61,35 @@ class User(AbstractUser):
     def __str__(self):
         return f"{self.username} ({self.get_role_display()})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._token_state = instance._get_token_state()
+        return instance
+
+    def _get_token_state(self):
+        loaded = self.__dict__
+        return {name: loaded[name] for name in TOKEN_STATE_FIELDS if name in loaded}
+
+    def save(self, *args, **kwargs):
+        # Changing a claim (or the password) revokes the refresh tokens issued so far
+        previous = getattr(self, '_token_state', None)
+        current = self._get_token_state()
+        if previous and any(current.get(name, value) != value
+                            for name, value in previous.items()):
+            self.token_version += 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'token_version'}
+        super().save(*args, **kwargs)
+        self._token_state = self._get_token_state()
+
+    @cached_property
+    def student_id(self):
+        """Primary key of the user's student profile, or None"""
+        Student = apps.get_model('students', 'Student')
+        return Student.objects.filter(user=self).values_list('pk', flat=True).first()
+
     @property
     def is_admin(self):
         return self.role == 'admin'
@@ -56,3 +97,50 @@ class User(AbstractUser):
     @property
     def is_student(self):
         return self.role == 'student'
+
+
+class ClaimsUser(User):
+    """
+    User built from the claims of an access token, without a query.
+
+    Only the claim fields are loaded; the first access to any other field
+    loads all of them in one query. Use authentication.tokens.get_full_user
+    before changing and saving the user, since the claims may be up to one
+    access token lifetime old.
+    """
+
+    class Meta:
+        proxy = True
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred and set(fields) <= deferred:
+            fields = deferred
+        super().refresh_from_db(using, fields, from_queryset)
+
+    def save(self, *args, **kwargs):
+        raise TypeError('Users built from token claims cannot be saved; '
+                        'load them with get_full_user() first')
+
+
+class RevokedToken(models.Model):
+    """
+    Id (jti) of a refresh token that can no longer be used.
+
+    Rows only matter until the token expires, so the table holds at most
+    one refresh token lifetime of revocations once expired rows are pruned
+    (see authentication.blacklist).
+    """
+    jti = models.CharField(max_length=255, primary_key=True)
+    expires_at = models.DateTimeField()
+    revoked_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'revoked_tokens'
+        indexes = [
+            models.Index(fields=['expires_at'], name='revoked_token_expiry_idx'),
+            models.Index(fields=['revoked_at'], name='revoked_token_revoked_idx'),
+        ]
+
+    def __str__(self):
+        return self.jti
@@ -1,7 +1,11 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 from .models import User
+from .tokens import VERSION_CLAIM, ClaimsRefreshToken, add_user_claims
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -103,7 +107,44 @@ class ChangePasswordSerializer(serializers.Serializer):
         return attrs
 
     def validate_old_password(self, value):
-        user = self.context['request'].user
+        user = self.context.get('user') or self.context['request'].user
         if not user.check_password(value):
             raise serializers.ValidationError('Old password is incorrect')
         return value
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh serializer that re-issues the user claims and rotates the
+    token through authentication.blacklist.
+
+    Refresh tokens issued before the user's last role, flag or password
+    change (an older token version) and tokens of inactive users are
+    rejected, so claims never outlive one access token lifetime.
+    """
+    token_class = ClaimsRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        user = User.objects.filter(
+            **{api_settings.USER_ID_FIELD: refresh.get(api_settings.USER_ID_CLAIM)},
+            is_active=True).first()
+        if user is None or refresh.get(VERSION_CLAIM, 0) != user.token_version:
+            raise InvalidToken('Token has been revoked')
+        add_user_claims(refresh, user)
+
+        data = {'access': str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            # Revoking is atomic, so of two refreshes racing with the same
+            # token only one gets through
+            if api_settings.BLACKLIST_AFTER_ROTATION and not refresh.blacklist():
+                raise InvalidToken('Token is blacklisted')
+
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+
+            data['refresh'] = str(refresh)
+
+        return data
@@ -1,3 +1,86 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from . import blacklist
+from .blacklist import (
+    RevocationFilter,
+    is_token_revoked,
+    prune_revoked_tokens,
+    revoke_token,
+)
+from .models import RevokedToken
+
+
+class TokenBlacklistTests(TestCase):
+    """Revoking refresh tokens and looking them up through the revocation filter"""
+
+    def setUp(self):
+        # A fresh filter per test, loaded synchronously where a test needs it
+        self.filter = RevocationFilter()
+        patcher = mock.patch.object(blacklist, 'revocation_filter', self.filter)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.expires_at = timezone.now() + timedelta(days=1)
+
+    def test_revoking_twice_only_succeeds_once(self):
+        self.assertTrue(revoke_token('jti-1', self.expires_at))
+        self.assertFalse(revoke_token('jti-1', self.expires_at))
+
+    def test_lookups_before_the_filter_is_loaded_fall_back_to_the_database(self):
+        revoke_token('revoked', self.expires_at)
+
+        with mock.patch.object(RevocationFilter, '_load_in_background') as load:
+            with self.assertNumQueries(1):
+                self.assertTrue(is_token_revoked('revoked'))
+            with self.assertNumQueries(1):
+                self.assertFalse(is_token_revoked('valid'))
+
+        # Only the first lookup started a build
+        self.assertEqual(load.call_count, 1)
+
+    def test_loaded_filter_answers_valid_tokens_without_queries(self):
+        revoke_token('revoked', self.expires_at)
+        self.filter.load()
+        self.filter.might_contain('')  # the sync right after a build
+
+        with self.assertNumQueries(0):
+            self.assertFalse(is_token_revoked('valid'))
+        self.assertTrue(is_token_revoked('revoked'))
+
+    def test_revocations_are_seen_by_a_loaded_filter(self):
+        self.filter.load()
+        self.filter.might_contain('')
+
+        revoke_token('later', self.expires_at)
+
+        self.assertTrue(is_token_revoked('later'))
+
+    @override_settings(TOKEN_BLACKLIST_SYNC_INTERVAL=10 ** 9)
+    def test_revocations_made_during_a_build_are_kept(self):
+        with mock.patch.object(RevocationFilter, '_load_in_background'):
+            self.filter.might_contain('')
+        self.assertTrue(revoke_token('during-build', self.expires_at))
+
+        with mock.patch.object(RevokedToken.objects, 'filter',
+                               return_value=RevokedToken.objects.none()):
+            # The build's read misses the revocation, the filter still has it
+            self.filter.load()
+        self.assertTrue(self.filter.might_contain('during-build'))
+
+    def test_expired_revocations_are_pruned_and_not_loaded(self):
+        revoke_token('expired', timezone.now() - timedelta(seconds=1))
+        revoke_token('current', self.expires_at)
+
+        self.filter.load()
+        self.filter.might_contain('')
+        with self.assertNumQueries(0):
+            self.assertFalse(self.filter.might_contain('expired'))
+
+        self.assertEqual(prune_revoked_tokens(), (1, 0))
+        self.assertEqual(list(RevokedToken.objects.values_list('jti', flat=True)),
+                         ['current'])
+        self.assertFalse(is_token_revoked('expired'))
+        self.assertTrue(is_token_revoked('current'))
@@ -0,0 +1,104 @@
+"""
+JWT tokens carrying the claims the API authorizes with
+
+Access tokens hold the user's username, role, is_superuser, is_staff,
+student id and token version, so requests are authenticated without
+loading the user: ClaimsJWTAuthentication builds a ClaimsUser from the
+claims and the user row is only read if a view touches another field.
+
+Revocation relies on a short access token lifetime plus the version claim:
+changing a user's role, flags or password bumps User.token_version, and
+refreshing a token of an older version fails, so stale claims live at
+most one access token lifetime.
+"""
+import uuid
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import BlacklistMixin, RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .blacklist import is_token_revoked, revoke_token
+from .models import ClaimsUser, User
+
+
+# Claims copied from user fields
+USER_CLAIM_FIELDS = ('username', 'role', 'is_superuser', 'is_staff')
+STUDENT_CLAIM = 'student_id'
+VERSION_CLAIM = 'ver'
+
+
+def add_user_claims(token, user):
+    """Set the user's claims on a token (access tokens inherit them from refresh tokens)"""
+    for field_name in USER_CLAIM_FIELDS:
+        token[field_name] = getattr(user, field_name)
+    student_id = user.student_id
+    token[STUDENT_CLAIM] = str(student_id) if student_id is not None else None
+    token[VERSION_CLAIM] = user.token_version
+    return token
+
+
+def user_from_claims(token):
+    """A ClaimsUser holding the claim fields of a validated token"""
+    values = {
+        User._meta.pk.attname: token[api_settings.USER_ID_CLAIM],
+        **{field_name: token[field_name] for field_name in USER_CLAIM_FIELDS},
+        'is_active': True,
+        'token_version': token[VERSION_CLAIM],
+    }
+    # from_db takes the loaded values in field order
+    field_names = [field.attname for field in ClaimsUser._meta.concrete_fields
+                   if field.attname in values]
+    user = ClaimsUser.from_db(None, field_names,
+                              [values[name] for name in field_names])
+    student_id = token.get(STUDENT_CLAIM)
+    # Primes the cached student_id property
+    user.student_id = uuid.UUID(student_id) if student_id else None
+    return user
+
+
+def get_full_user(user):
+    """The complete, saveable User row behind request.user"""
+    if isinstance(user, ClaimsUser):
+        return User.objects.get(pk=user.pk)
+    return user
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """
+    Refresh token whose access tokens carry the user claims.
+
+    Revocation goes through authentication.blacklist instead of simplejwt's
+    outstanding and blacklisted token tables, so issuing a token writes
+    nothing and checking one usually queries nothing.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        # Skips BlacklistMixin.for_user, which records every issued token
+        return add_user_claims(super(BlacklistMixin, cls).for_user(user), user)
+
+    def check_blacklist(self):
+        if is_token_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_('Token is blacklisted'))
+
+    def blacklist(self):
+        """Revoke this token; False if it had already been revoked"""
+        return revoke_token(self.payload[api_settings.JTI_CLAIM],
+                            datetime_from_epoch(self.payload['exp']))
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that trusts the token's claims instead of querying
+    the user. Tokens issued before the claims existed fall back to loading
+    the user.
+    """
+
+    def get_user(self, validated_token):
+        if VERSION_CLAIM not in validated_token or \
+                api_settings.USER_ID_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+        return user_from_claims(validated_token)
@@ -2,8 +2,10 @@ from rest_framework import status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
+from student_course_management.throttling import (
+    LoginAccountThrottle, LoginThrottle, RegisterThrottle)
+from .tokens import ClaimsRefreshToken, get_full_user
 from .serializers import (
     UserRegistrationSerializer,
     UserLoginSerializer,
@@ -17,6 +19,7 @@ User = get_user_model()
 class UserRegistrationAPIView(APIView):
     """User registration endpoint using APIView"""
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [RegisterThrottle]
 
     def post(self, request):
         serializer = UserRegistrationSerializer(data=request.data)
@@ -24,7 +27,7 @@ class UserRegistrationAPIView(APIView):
             user = serializer.save()
 
             # Generate tokens
-            refresh = RefreshToken.for_user(user)
+            refresh = ClaimsRefreshToken.for_user(user)
 
             return Response({
                 'message': 'User created successfully',
@@ -39,12 +42,13 @@ class UserRegistrationAPIView(APIView):
 class UserLoginAPIView(APIView):
     """Custom login view with additional user data using APIView"""
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [LoginThrottle, LoginAccountThrottle]
 
     def post(self, request):
         serializer = UserLoginSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.validated_data['user']
-            refresh = RefreshToken.for_user(user)
+            refresh = ClaimsRefreshToken.for_user(user)
 
             return Response({
                 'message': 'Login successful',
@@ -61,12 +65,12 @@ class UserProfileAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        serializer = UserProfileSerializer(request.user)
+        serializer = UserProfileSerializer(get_full_user(request.user))
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def put(self, request):
         serializer = UserProfileSerializer(
-            request.user, data=request.data, partial=True)
+            get_full_user(request.user), data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
             return Response({
@@ -91,10 +95,10 @@ class ChangePasswordAPIView(APIView):
         print(
             f"🔍 Data keys: {list(request.data.keys()) if request.data else 'None'}")
 
+        user = get_full_user(request.user)
         serializer = ChangePasswordSerializer(
-            data=request.data, context={'request': request})
+            data=request.data, context={'request': request, 'user': user})
         if serializer.is_valid():
-            user = request.user
             user.set_password(serializer.validated_data['new_password'])
             user.save()
             print(f"✅ Password changed successfully for {user.username}")
@@ -114,7 +118,7 @@ class LogoutAPIView(APIView):
         try:
             refresh_token = request.data.get('refresh')
             if refresh_token:
-                token = RefreshToken(refresh_token)
+                token = ClaimsRefreshToken(refresh_token)
                 token.blacklist()
             return Response({
                 'message': 'Logout successful'
@@ -1,4 +1,6 @@
 from django.contrib import admin
+from django.utils import timezone
+from student_course_management.response_cache import invalidate_models
 from .models import Course
 
 
@@ -33,6 +35,9 @@ class CourseAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_enrollment_counts()
+
     def enrolled_students_count(self, obj):
         """Display count of enrolled students"""
         return obj.enrolled_students_count
@@ -42,14 +47,16 @@ class CourseAdmin(admin.ModelAdmin):
 
     def activate_courses(self, request, queryset):
         """Bulk activate courses"""
-        updated = queryset.update(is_active=True)
+        updated = queryset.update(is_active=True, updated_at=timezone.now())
+        invalidate_models('courses.Course')
         self.message_user(
             request, f'{updated} courses were successfully activated.')
     activate_courses.short_description = 'Activate selected courses'
 
     def deactivate_courses(self, request, queryset):
         """Bulk deactivate courses"""
-        updated = queryset.update(is_active=False)
+        updated = queryset.update(is_active=False, updated_at=timezone.now())
+        invalidate_models('courses.Course')
         self.message_user(
             request, f'{updated} courses were successfully deactivated.')
     deactivate_courses.short_description = 'Deactivate selected courses'
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from courses.models import Course, CourseStatistic
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the course statistics rollup from enrollments with one GROUP BY'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--course',
+            action='append',
+            dest='course_codes',
+            metavar='COURSE_CODE',
+            help='Only rebuild this course (may be repeated)',
+        )
+
+    def handle(self, *args, **options):
+        course_ids = None
+        course_codes = options['course_codes']
+        if course_codes:
+            course_ids = list(Course.objects.filter(
+                course_code__in=course_codes).values_list('pk', flat=True))
+            if len(course_ids) != len(set(course_codes)):
+                raise CommandError('Unknown course code(s) given')
+
+        cells = CourseStatistic.objects.rebuild(course_ids)
+        scope = f'{len(course_ids)} course(s)' if course_ids is not None else 'all courses'
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt course statistics for {scope} ({cells} rollup cell(s))'))
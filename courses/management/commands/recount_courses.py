@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from courses.models import Course
+
+
+class Command(BaseCommand):
+    help = 'Recompute course enrollment counters from enrollments and fold counter shards'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of courses recounted per transaction',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report courses whose counters have drifted',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        dry_run = options['dry_run']
+
+        course_ids = list(
+            Course.objects.order_by('pk').values_list('pk', flat=True))
+        drifted = 0
+
+        for start in range(0, len(course_ids), batch_size):
+            batch = course_ids[start:start + batch_size]
+            if dry_run:
+                drifted += self.recount_batch(batch, write=False)
+            else:
+                with transaction.atomic():
+                    drifted += self.recount_batch(batch, write=True)
+
+        verb = 'have' if dry_run else 'had'
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Checked {len(course_ids)} course(s); {drifted} {verb} drifted counters'
+            )
+        )
+
+    def recount_batch(self, course_ids, write):
+        """Recount one batch of courses, returning how many had drifted"""
+        drifted = Course.objects.recount(course_ids, write=write)
+        for course, current, actual in drifted:
+            self.stdout.write(f'  • {course.course_code}: {current} -> {actual}')
+        return len(drifted)
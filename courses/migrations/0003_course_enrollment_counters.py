@@ -0,0 +1,73 @@
+# Generated by Django 5.2.5 on 2026-10-17 20:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+COUNTER_FIELDS = {
+    'enrolled': 'enrolled_count',
+    'completed': 'completed_count',
+    'withdrawn': 'withdrawn_count',
+}
+
+
+def populate_enrollment_counters(apps, schema_editor):
+    """Fill the new counter columns from existing enrollments"""
+    Course = apps.get_model('courses', 'Course')
+    Enrollment = apps.get_model('students', 'Enrollment')
+
+    counters = {}
+    rows = Enrollment.objects.filter(
+        status__in=COUNTER_FIELDS
+    ).values('course_id', 'status').annotate(total=models.Count('pk'))
+    for row in rows:
+        counters.setdefault(row['course_id'], {})[
+            COUNTER_FIELDS[row['status']]] = row['total']
+
+    for course_id, values in counters.items():
+        Course.objects.filter(pk=course_id).update(**values)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0002_remove_course_prerequisites'),
+        ('students', '0005_student_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='completed_count',
+            field=models.IntegerField(default=0, editable=False, help_text="Number of enrollments with status 'completed' (excluding shard deltas)"),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='enrolled_count',
+            field=models.IntegerField(default=0, editable=False, help_text="Number of enrollments with status 'enrolled' (excluding shard deltas)"),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='withdrawn_count',
+            field=models.IntegerField(default=0, editable=False, help_text="Number of enrollments with status 'withdrawn' (excluding shard deltas)"),
+        ),
+        migrations.CreateModel(
+            name='CourseCounterShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField(help_text='Shard number')),
+                ('enrolled_count', models.IntegerField(default=0)),
+                ('completed_count', models.IntegerField(default=0)),
+                ('withdrawn_count', models.IntegerField(default=0)),
+                ('course', models.ForeignKey(help_text='Course the counters belong to', on_delete=django.db.models.deletion.CASCADE, related_name='counter_shards', to='courses.course')),
+            ],
+            options={
+                'verbose_name': 'Course Counter Shard',
+                'verbose_name_plural': 'Course Counter Shards',
+                'db_table': 'course_counter_shards',
+                'unique_together': {('course', 'shard')},
+            },
+        ),
+        migrations.RunPython(populate_enrollment_counters,
+                             migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-17 20:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0003_course_enrollment_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='capacity',
+            field=models.PositiveIntegerField(blank=True, help_text='Maximum number of enrolled students (empty for unlimited)', null=True),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='rush_mode',
+            field=models.BooleanField(default=False, help_text='Queue enroll requests and allocate seats in batches'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.5 on 2026-10-17 21:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+GRADED_STATUSES = ('completed', 'failed')
+
+
+def populate_course_statistics(apps, schema_editor):
+    """Fill the rollup from existing enrollments with one GROUP BY"""
+    CourseStatistic = apps.get_model('courses', 'CourseStatistic')
+    Enrollment = apps.get_model('students', 'Enrollment')
+
+    rows = Enrollment.objects.annotate(
+        graded_grade=models.Case(
+            models.When(status__in=GRADED_STATUSES, grade__isnull=False,
+                        then=models.F('grade')),
+            default=models.Value(''),
+            output_field=models.CharField()),
+    ).order_by().values('course_id', 'status', 'graded_grade').annotate(
+        total=models.Count('pk'),
+        credits=models.Sum(models.Case(
+            models.When(status='completed', then=models.F('credits_earned')),
+            default=models.Value(0))),
+    )
+    CourseStatistic.objects.bulk_create([
+        CourseStatistic(
+            course_id=row['course_id'], shard=0, status=row['status'],
+            grade=row['graded_grade'], enrollments=row['total'],
+            credits_earned=row['credits'] or 0)
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_course_capacity_rush_mode'),
+        ('students', '0009_student_academic_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseStatistic',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField(default=0, help_text='Shard number')),
+                ('status', models.CharField(help_text='Enrollment status', max_length=20)),
+                ('grade', models.CharField(blank=True, default='', help_text='Grade (graded statuses only)', max_length=3)),
+                ('enrollments', models.IntegerField(default=0)),
+                ('credits_earned', models.IntegerField(default=0)),
+                ('course', models.ForeignKey(help_text='Course the statistics belong to', on_delete=django.db.models.deletion.CASCADE, related_name='statistics', to='courses.course')),
+            ],
+            options={
+                'verbose_name': 'Course Statistic',
+                'verbose_name_plural': 'Course Statistics',
+                'db_table': 'course_statistics',
+                'unique_together': {('course', 'shard', 'status', 'grade')},
+            },
+        ),
+        migrations.RunPython(populate_course_statistics, migrations.RunPython.noop),
+    ]
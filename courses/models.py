@@ -1,9 +1,201 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, Count, Exists, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.conf import settings
 from django.core.validators import MinValueValidator
 from django.utils import timezone
+from student_course_management.response_cache import invalidate_models
+import random
 import uuid
 
 
+# Enrollment statuses with a denormalized counter column on Course
+ENROLLMENT_COUNTER_FIELDS = {
+    'enrolled': 'enrolled_count',
+    'completed': 'completed_count',
+    'withdrawn': 'withdrawn_count',
+}
+
+
+# Enrollment statuses whose grade is part of the course statistics
+GRADED_ENROLLMENT_STATUSES = ('completed', 'failed')
+
+
+def get_counter_shard_count():
+    """Number of CourseCounterShard rows enrollment writes are spread across"""
+    return max(1, getattr(settings, 'COURSE_COUNTER_SHARDS', 1))
+
+
+def _shard_total(field_name):
+    """Correlated subquery summing a counter over a course's shard rows"""
+    totals = CourseCounterShard.objects.filter(
+        course=OuterRef('pk')
+    ).order_by().values('course').annotate(total=Sum(field_name)).values('total')
+    return Coalesce(Subquery(totals, output_field=models.IntegerField()), 0)
+
+
+class CourseFullError(Exception):
+    """Raised when an enrollment would exceed a course's capacity"""
+
+
+class CourseQuerySet(models.QuerySet):
+    """Custom queryset for Course model"""
+
+    def with_enrollment_counts(self):
+        """
+        Annotate each course with its per-status enrollment totals.
+
+        The totals (`enrolled_students_total`, `completed_students_total` and
+        `withdrawn_students_total`) are the counter columns plus any
+        pending deltas held in the course's counter shards.
+        """
+        return self.annotate(
+            enrolled_students_total=F('enrolled_count') +
+            _shard_total('enrolled_count'),
+            completed_students_total=F('completed_count') +
+            _shard_total('completed_count'),
+            withdrawn_students_total=F('withdrawn_count') +
+            _shard_total('withdrawn_count'),
+        )
+
+    def not_enrolled_by(self, student_id):
+        """
+        Courses the student is not currently enrolled in.
+
+        A single NOT EXISTS anti-join, answered from the (student, course)
+        unique index, so the catalog is never compared in Python.
+        """
+        from students.models import Enrollment
+
+        return self.filter(~Exists(Enrollment.objects.filter(
+            course=OuterRef('pk'), student_id=student_id, status='enrolled')))
+
+    def record_enrollment_transition(self, course_id, old_status=None, new_status=None, count=1):
+        """
+        Move `count` enrollments between status counters of a course.
+
+        old_status is None for new enrollments and new_status is None for
+        deleted ones. The change is applied with a single F() update on a
+        randomly chosen counter shard, so concurrent enrollments in the same
+        course do not all queue on the course row lock. Must be called in
+        the same transaction as the enrollment change.
+        """
+        changes = {}
+        if old_status is not None:
+            changes[old_status] = changes.get(old_status, 0) - count
+        if new_status is not None:
+            changes[new_status] = changes.get(new_status, 0) + count
+        self.record_enrollment_changes(course_id, changes)
+
+    def record_enrollment_changes(self, course_id, changes, use_shard=True):
+        """
+        Apply {status: delta} changes to the status counters of a course.
+
+        With use_shard=False the course row itself is updated, which is
+        cheaper for callers that already hold its lock.
+        """
+        deltas = {}
+        for status, delta in changes.items():
+            if status in ENROLLMENT_COUNTER_FIELDS:
+                field_name = ENROLLMENT_COUNTER_FIELDS[status]
+                deltas[field_name] = deltas.get(field_name, 0) + delta
+
+        updates = {field_name: F(field_name) + delta
+                   for field_name, delta in deltas.items() if delta}
+        if not updates:
+            return
+
+        shard_count = get_counter_shard_count()
+        if use_shard and shard_count > 1:
+            updated = CourseCounterShard.objects.filter(
+                course_id=course_id,
+                shard=random.randrange(shard_count)
+            ).update(**updates)
+            if updated:
+                return
+
+        # Sharding disabled or the shard row does not exist yet
+        self.model.objects.filter(pk=course_id).update(**updates)
+
+    def lock_seats(self, course_id):
+        """
+        Lock a course row and return (capacity, enrolled total).
+
+        Seat allocations for the course serialize on this lock. The counters
+        are read in a second query, once the lock is held, so the read sees
+        every allocation committed before it. For courses without a limit
+        (capacity None) the count is skipped and None returned for it.
+        """
+        capacity = self.select_for_update().values_list(
+            'capacity', flat=True).get(pk=course_id)
+        if capacity is None:
+            return None, None
+        taken = self.filter(pk=course_id).with_enrollment_counts().values_list(
+            'enrolled_students_total', flat=True).get()
+        return capacity, taken
+
+    def recount(self, course_ids, write=True):
+        """
+        Recompute the status counters of courses from their enrollments and
+        fold their counter shards into the course rows.
+
+        Returns (course, counters before, counters after) for each course
+        whose counters had drifted; with write=False nothing is changed.
+        Runs in the caller's transaction, or in its own.
+        """
+        from students.models import Enrollment
+
+        course_ids = list(course_ids)
+        counter_fields = list(ENROLLMENT_COUNTER_FIELDS.values())
+        with transaction.atomic():
+            if write:
+                # Lock the counter rows first so enrollment writes for these
+                # courses wait until they have been folded
+                list(CourseCounterShard.objects.select_for_update().filter(
+                    course_id__in=course_ids).values_list('pk', flat=True))
+                list(self.select_for_update().filter(
+                    pk__in=course_ids).values_list('pk', flat=True))
+
+            # Actual counts in a single GROUP BY over the courses
+            actual = {course_id: dict.fromkeys(counter_fields, 0)
+                      for course_id in course_ids}
+            rows = Enrollment.objects.filter(
+                course_id__in=course_ids,
+                status__in=ENROLLMENT_COUNTER_FIELDS
+            ).order_by().values('course_id', 'status').annotate(total=Count('pk'))
+            for row in rows:
+                actual[row['course_id']][
+                    ENROLLMENT_COUNTER_FIELDS[row['status']]] = row['total']
+
+            courses = list(self.filter(pk__in=course_ids).with_enrollment_counts())
+            drifted = []
+            for course in courses:
+                current = {
+                    'enrolled_count': course.enrolled_students_total,
+                    'completed_count': course.completed_students_total,
+                    'withdrawn_count': course.withdrawn_students_total,
+                }
+                if current != actual[course.pk]:
+                    drifted.append((course, current, actual[course.pk]))
+                for field_name, value in actual[course.pk].items():
+                    setattr(course, field_name, value)
+
+            if write:
+                self.bulk_update(courses, counter_fields)
+                CourseCounterShard.objects.filter(course_id__in=course_ids).update(
+                    **dict.fromkeys(counter_fields, 0))
+
+                shard_count = get_counter_shard_count()
+                if shard_count > 1:
+                    CourseCounterShard.objects.bulk_create([
+                        CourseCounterShard(course_id=course_id, shard=shard)
+                        for course_id in course_ids
+                        for shard in range(shard_count)
+                    ], ignore_conflicts=True)
+                invalidate_models('courses.Course')
+        return drifted
+
+
 class Course(models.Model):
     """
     Course model to store course information
@@ -41,9 +233,35 @@ class Course(models.Model):
         default=True,
         help_text="Whether the course is currently active"
     )
+    capacity = models.PositiveIntegerField(
+        blank=True,
+        null=True,
+        help_text="Maximum number of enrolled students (empty for unlimited)"
+    )
+    rush_mode = models.BooleanField(
+        default=False,
+        help_text="Queue enroll requests and allocate seats in batches"
+    )
+    enrolled_count = models.IntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of enrollments with status 'enrolled' (excluding shard deltas)"
+    )
+    completed_count = models.IntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of enrollments with status 'completed' (excluding shard deltas)"
+    )
+    withdrawn_count = models.IntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of enrollments with status 'withdrawn' (excluding shard deltas)"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CourseQuerySet.as_manager()
+
     class Meta:
         db_table = 'courses'
         verbose_name = 'Course'
@@ -53,10 +271,33 @@ class Course(models.Model):
     def __str__(self):
         return f"{self.course_code} - {self.course_name}"
 
+    def _get_counter_total(self, field_name):
+        """Return a counter column plus the pending deltas in its shards"""
+        shard_total = self.counter_shards.aggregate(
+            total=Coalesce(Sum(field_name), 0))['total']
+        return getattr(self, field_name) + shard_total
+
     @property
     def enrolled_students_count(self):
         """Return the number of students enrolled in this course"""
-        return self.enrolled_students.count()
+        # Use the annotated value when the queryset provided one
+        if hasattr(self, 'enrolled_students_total'):
+            return self.enrolled_students_total
+        return self._get_counter_total('enrolled_count')
+
+    @property
+    def completed_students_count(self):
+        """Return the number of students who completed this course"""
+        if hasattr(self, 'completed_students_total'):
+            return self.completed_students_total
+        return self._get_counter_total('completed_count')
+
+    @property
+    def withdrawn_students_count(self):
+        """Return the number of students who withdrew from this course"""
+        if hasattr(self, 'withdrawn_students_total'):
+            return self.withdrawn_students_total
+        return self._get_counter_total('withdrawn_count')
 
     def clean(self):
         """Custom validation"""
@@ -69,5 +310,255 @@ class Course(models.Model):
             self.course_code = self.course_code.upper()
 
     def save(self, *args, **kwargs):
+        adding = self._state.adding
         self.full_clean()
         super().save(*args, **kwargs)
+
+        if adding and get_counter_shard_count() > 1:
+            CourseCounterShard.objects.bulk_create([
+                CourseCounterShard(course=self, shard=shard)
+                for shard in range(get_counter_shard_count())
+            ], ignore_conflicts=True)
+
+
+class CourseCounterShard(models.Model):
+    """
+    Pending enrollment counter deltas for a course.
+
+    Enrollment writes increment one of several shard rows instead of the
+    course row; recount_courses folds the shards back into Course.
+    """
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        related_name='counter_shards',
+        help_text="Course the counters belong to"
+    )
+    shard = models.PositiveSmallIntegerField(
+        help_text="Shard number"
+    )
+    enrolled_count = models.IntegerField(default=0)
+    completed_count = models.IntegerField(default=0)
+    withdrawn_count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'course_counter_shards'
+        verbose_name = 'Course Counter Shard'
+        verbose_name_plural = 'Course Counter Shards'
+        unique_together = [['course', 'shard']]
+
+    def __str__(self):
+        return f"{self.course_id} #{self.shard}"
+
+
+def statistic_cell(status, grade=None, credits_earned=None):
+    """
+    Return ((status, grade), credits) for an enrollment's rollup cell.
+
+    Grades only count once the enrollment is graded and credits only once
+    it is completed.
+    """
+    grade = (grade or '') if status in GRADED_ENROLLMENT_STATUSES else ''
+    credits = (credits_earned or 0) if status == 'completed' else 0
+    return (status, grade), credits
+
+
+class CourseStatisticQuerySet(models.QuerySet):
+    """Custom queryset for CourseStatistic model"""
+
+    def record(self, course_id, old=None, new=None, count=1):
+        """
+        Move `count` enrollments between rollup cells of a course.
+
+        old and new are (status, grade, credits_earned) tuples of the
+        enrollment before and after the write; old is None for new
+        enrollments and new is None for deleted ones.
+        """
+        cells = {}
+        for state, sign in ((old, -1), (new, 1)):
+            if state is None:
+                continue
+            key, credits = statistic_cell(*state)
+            enrollments, credit_total = cells.get(key, (0, 0))
+            cells[key] = (enrollments + sign * count,
+                          credit_total + sign * count * credits)
+        self.record_cells(course_id, cells)
+
+    def record_cells(self, course_id, cells):
+        """
+        Apply {(status, grade): (enrollment delta, credits delta)} to a course.
+
+        Like the course counters, each write goes to a randomly chosen shard
+        row so concurrent writes to one course do not queue on a single row.
+        """
+        shard = random.randrange(get_counter_shard_count())
+        for (status, grade), (enrollments, credits) in cells.items():
+            if not enrollments and not credits:
+                continue
+            rows = self.filter(course_id=course_id, shard=shard,
+                               status=status, grade=grade)
+            updates = {'enrollments': F('enrollments') + enrollments,
+                       'credits_earned': F('credits_earned') + credits}
+            if rows.update(**updates):
+                continue
+            if enrollments <= 0:
+                # Take decrements from any shard holding the cell; without
+                # one there is nothing to take them from (e.g. the course is
+                # being deleted) and a rebuild realigns the rollup
+                pk = self.filter(course_id=course_id, status=status,
+                                 grade=grade).values_list('pk', flat=True).first()
+                if pk is not None:
+                    self.filter(pk=pk).update(**updates)
+                continue
+            try:
+                with transaction.atomic():
+                    self.create(course_id=course_id, shard=shard, status=status,
+                                grade=grade, enrollments=enrollments,
+                                credits_earned=credits)
+            except IntegrityError:
+                # A concurrent write created the cell first
+                rows.update(**updates)
+
+    def rebuild(self, course_ids=None):
+        """
+        Recompute the rollup from the enrollments table with one GROUP BY.
+
+        Returns the number of cells written. Runs in the caller's
+        transaction, or in its own.
+        """
+        from students.models import Enrollment
+
+        enrollments = Enrollment.objects.all()
+        cells = self.all()
+        if course_ids is not None:
+            enrollments = enrollments.filter(course_id__in=course_ids)
+            cells = cells.filter(course_id__in=course_ids)
+
+        rows = enrollments.order_by().annotate(
+            graded_grade=Case(
+                When(status__in=GRADED_ENROLLMENT_STATUSES,
+                     then=Coalesce('grade', Value(''))),
+                default=Value(''),
+                output_field=models.CharField()),
+        ).values('course_id', 'status', 'graded_grade').annotate(
+            total=Count('pk'),
+            credits=Coalesce(Sum(Case(
+                When(status='completed', then=F('credits_earned')),
+                default=Value(0))), 0))
+
+        with transaction.atomic():
+            # Lock the existing cells so incremental writes wait for the swap
+            list(cells.select_for_update().values_list('pk', flat=True))
+            statistics = [
+                self.model(course_id=row['course_id'], shard=0,
+                           status=row['status'], grade=row['graded_grade'],
+                           enrollments=row['total'], credits_earned=row['credits'])
+                for row in rows
+            ]
+            cells.delete()
+            self.bulk_create(statistics, batch_size=1000)
+            invalidate_models('courses.CourseStatistic')
+        return len(statistics)
+
+    def summarize(self, course_ids=None):
+        """
+        Per-course statistics read from the rollup alone.
+
+        Returns {course_id: {'enrollments': {status: count},
+        'grades': {grade: count}, 'credits_earned': total}}; one query
+        whose result size depends on the number of courses, not enrollments.
+        """
+        cells = self.all()
+        if course_ids is not None:
+            cells = cells.filter(course_id__in=course_ids)
+        rows = cells.order_by().values('course_id', 'status', 'grade').annotate(
+            total=Sum('enrollments'), credits=Sum('credits_earned'))
+
+        summary = {}
+        for row in rows:
+            course = summary.setdefault(row['course_id'], {
+                'enrollments': {}, 'grades': {}, 'credits_earned': 0})
+            status = row['status']
+            course['enrollments'][status] = (
+                course['enrollments'].get(status, 0) + row['total'])
+            if row['grade']:
+                course['grades'][row['grade']] = (
+                    course['grades'].get(row['grade'], 0) + row['total'])
+            if status == 'completed':
+                course['credits_earned'] += row['credits']
+        return summary
+
+
+def course_statistics(courses):
+    """
+    Statistics rows for an iterable of courses, read from the rollup.
+
+    Costs one rollup query regardless of how many enrollments the courses
+    have.
+    """
+    courses = list(courses)
+    summary = CourseStatistic.objects.summarize([course.pk for course in courses])
+    rows = []
+    for course in courses:
+        stats = summary.get(course.pk, {'enrollments': {}, 'grades': {}, 'credits_earned': 0})
+        counts = stats['enrollments']
+        completed = counts.get('completed', 0)
+        rows.append({
+            'course_id': course.pk,
+            'course_code': course.course_code,
+            'course_name': course.course_name,
+            'is_active': course.is_active,
+            'enrolled': counts.get('enrolled', 0),
+            'completed': completed,
+            'withdrawn': counts.get('withdrawn', 0),
+            'failed': counts.get('failed', 0),
+            'suspended': counts.get('suspended', 0),
+            'total': sum(counts.values()),
+            'grade_distribution': dict(sorted(stats['grades'].items())),
+            'average_credits_earned': (
+                round(stats['credits_earned'] / completed, 2) if completed else None),
+        })
+    return rows
+
+
+class CourseStatistic(models.Model):
+    """
+    Enrollment rollup cell of a course.
+
+    Holds the number of enrollments (and their credits earned) with a given
+    status and, for graded statuses, grade. Kept up to date by enrollment
+    writes; rebuild_course_statistics recomputes it from scratch.
+    """
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        related_name='statistics',
+        help_text="Course the statistics belong to"
+    )
+    shard = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Shard number"
+    )
+    status = models.CharField(
+        max_length=20,
+        help_text="Enrollment status"
+    )
+    grade = models.CharField(
+        max_length=3,
+        blank=True,
+        default='',
+        help_text="Grade (graded statuses only)"
+    )
+    enrollments = models.IntegerField(default=0)
+    credits_earned = models.IntegerField(default=0)
+
+    objects = CourseStatisticQuerySet.as_manager()
+
+    class Meta:
+        db_table = 'course_statistics'
+        verbose_name = 'Course Statistic'
+        verbose_name_plural = 'Course Statistics'
+        unique_together = [['course', 'shard', 'status', 'grade']]
+
+    def __str__(self):
+        return f"{self.course_id} #{self.shard} {self.status} {self.grade}"
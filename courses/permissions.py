@@ -44,7 +44,7 @@ class IsOwnerOrAdmin(permissions.BasePermission):
 
         # Write permissions only to the owner or admin
         if hasattr(obj, 'user'):
-            return obj.user == request.user or request.user.is_superuser or request.user.role == 'admin'
+            return obj.user_id == request.user.pk or request.user.is_superuser or request.user.role == 'admin'
 
         return request.user.is_superuser or request.user.role == 'admin'
 
@@ -65,7 +65,7 @@ class IsStudentOwnerOrAdmin(permissions.BasePermission):
 
         # Students can only access their own records
         if hasattr(obj, 'user'):
-            return obj.user == request.user
+            return obj.user_id == request.user.pk
 
         return False
 
@@ -2,15 +2,86 @@ from rest_framework import serializers
 from .models import Course
 
 
-class CourseSerializer(serializers.ModelSerializer):
+def _split_param(value):
+    """Split a comma separated query parameter into a set of names"""
+    return {name.strip() for name in (value or '').split(',') if name.strip()}
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin adding sparse fieldset support.
+
+    Pass `fields` (an iterable of field names) when instantiating the
+    serializer to drop every other field. Fields listed in
+    `expandable_fields` are nested representations that are left out of a
+    sparse response unless named in ?fields= or ?expand=.
+    """
+    expandable_fields = ()
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+    @classmethod
+    def get_requested_fields(cls, query_params):
+        """
+        Resolve ?fields= and ?expand= into a set of field names.
+
+        Returns None when neither parameter is given, meaning the full
+        representation. Raises ValidationError for unknown names.
+        """
+        if 'fields' not in query_params and 'expand' not in query_params:
+            return None
+
+        available = set(cls().fields)
+        expand = _split_param(query_params.get('expand'))
+        fields = _split_param(query_params.get('fields'))
+        if not fields:
+            fields = available - set(cls.expandable_fields)
+
+        errors = {}
+        unknown_fields = fields - available
+        if unknown_fields:
+            errors['fields'] = [
+                f"Unknown field(s): {', '.join(sorted(unknown_fields))}"]
+        unknown_expand = expand - set(cls.expandable_fields)
+        if unknown_expand:
+            errors['expand'] = [
+                f"Field(s) cannot be expanded: {', '.join(sorted(unknown_expand))}"]
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        return fields | expand
+
+    @classmethod
+    def get_model_columns(cls, fields):
+        """Return the concrete model columns backing the requested fields"""
+        opts = cls.Meta.model._meta
+        concrete = {field.name for field in opts.concrete_fields}
+        return [opts.pk.name] + sorted((concrete & set(fields)) - {opts.pk.name})
+
+
+class CourseSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for Course model"""
     enrolled_students_count = serializers.ReadOnlyField()
+    completed_students_count = serializers.ReadOnlyField()
+    withdrawn_students_count = serializers.ReadOnlyField()
+
+    # Fields served from the enrollment counters (see with_enrollment_counts)
+    counter_fields = ('enrolled_students_count', 'completed_students_count',
+                      'withdrawn_students_count')
 
     class Meta:
         model = Course
-        fields = '__all__'
-        read_only_fields = ('course_id', 'created_at',
-                            'updated_at', 'enrolled_students_count')
+        # The raw counter columns are exposed through the *_students_count fields
+        exclude = ('enrolled_count', 'completed_count', 'withdrawn_count')
+        read_only_fields = ('course_id', 'created_at', 'updated_at',
+                            'enrolled_students_count', 'completed_students_count',
+                            'withdrawn_students_count')
 
     def validate_course_code(self, value):
         """Validate course code format and uniqueness"""
@@ -55,13 +126,17 @@ class CourseDetailSerializer(CourseSerializer):
     students = serializers.SerializerMethodField()
 
     class Meta(CourseSerializer.Meta):
+        exclude = None
         fields = [
             'course_id', 'course_name', 'course_code', 'course_duration',
             'description', 'credits', 'is_active',
-            'created_at', 'updated_at', 'enrolled_students_count', 'students'
+            'created_at', 'updated_at', 'enrolled_students_count',
+            'completed_students_count', 'withdrawn_students_count', 'students'
         ]
 
     def get_students(self, obj):
         """Get basic student information for this course"""
         from students.serializers import StudentBasicSerializer
-        return StudentBasicSerializer(obj.students.all(), many=True).data
+        students = obj.enrolled_students.with_enrollment_summary(
+            fields=set(StudentBasicSerializer.Meta.fields))
+        return StudentBasicSerializer(students, many=True).data
@@ -1,3 +1,134 @@
+from collections import Counter
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from student_course_management.testing import QueryBudget, QueryBudgetMixin
+from students.enrollment_queue import process_batch
+from students.models import Enrollment, EnrollmentRequest, Student
+from . import urls
+from .models import Course
+
+User = get_user_model()
+
+
+def create_students(count, prefix='student'):
+    """Students with user accounts, in creation order"""
+    return [
+        Student.objects.get(user=User.objects.create_user(
+            username=f'{prefix}-{index}', password='x', role='student',
+            email=f'{prefix}-{index}@example.com'))
+        for index in range(count)
+    ]
+
+
+def admin_client():
+    admin = User.objects.create_user(
+        username='test-admin', password='x', role='admin',
+        is_superuser=True, is_staff=True)
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
+
+
+def _fill(test):
+    """Make other_course full so the first student can join its waitlist"""
+    Course.objects.filter(pk=test.other_course.pk).update(capacity=1)
+    return {}
+
+
+class CourseEndpointQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Each courses endpoint runs a fixed number of queries"""
+    urls_module = urls
+    budgets = {
+        'course_list_create': QueryBudget(4),
+        'course_list_create_alt': QueryBudget(4),
+        'course_detail': QueryBudget(5, kwargs={'pk': 'course'}),
+        'course_detail_alt': QueryBudget(5, kwargs={'pk': 'course'}),
+        'course_students': QueryBudget(5, kwargs={'pk': 'course'}),
+        'course_enroll_student': QueryBudget(
+            12, 'post', kwargs={'pk': 'other_course'},
+            data=lambda test: {'student_id': str(test.student.pk)}),
+        'course_bulk_enroll': QueryBudget(
+            12, 'post', kwargs={'pk': 'other_course'},
+            data=lambda test: {'student_ids': [str(student.pk) for student in test.students]}),
+        'course_unenroll_student': QueryBudget(
+            11, 'post', kwargs={'pk': 'course'},
+            data=lambda test: {'student_id': str(test.student.pk)}),
+        'course_waitlist': QueryBudget(
+            12, 'post', user='student', kwargs={'pk': 'other_course'}, data=_fill),
+        'course_activate': QueryBudget(6, 'post', kwargs={'pk': 'course'}),
+        'course_deactivate': QueryBudget(6, 'post', kwargs={'pk': 'course'}),
+        'active_courses': QueryBudget(4),
+        'course_statistics': QueryBudget(2),
+    }
+
+
+class CourseBulkEnrollTests(TestCase):
+    """POST /api/courses/<pk>/enroll/bulk/"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.students = create_students(3)
+        cls.course = Course.objects.create(
+            course_name='Bulk', course_code='BK101', course_duration=12, credits=3)
+
+    def setUp(self):
+        self.client = admin_client()
+
+    def bulk_enroll(self, data, course=None):
+        return self.client.post(
+            reverse('courses:course_bulk_enroll', kwargs={'pk': (course or self.course).pk}),
+            data, format='json')
+
+    def test_enrolls_students_matching_a_filter(self):
+        Student.objects.filter(pk=self.students[0].pk).update(status='inactive')
+
+        response = self.bulk_enroll({'filter': {'status': 'active'}})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['matched'], response.data['created']), (2, 2))
+
+    def test_rejects_unsupported_filter_keys(self):
+        response = self.bulk_enroll({'filter': {'gender': 'M'}})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('gender', str(response.data['filter']))
+
+    def test_grants_seats_in_the_given_order(self):
+        course = Course.objects.create(
+            course_name='Small', course_code='SM101', course_duration=12,
+            credits=3, capacity=2)
+        withdrawn, first, last = self.students
+        Enrollment.objects.enroll(withdrawn.pk, course.pk, capacity=2)
+        Enrollment.objects.transition(withdrawn.pk, course.pk, 'withdrawn', ('enrolled',))
+
+        response = self.bulk_enroll(
+            {'student_ids': [str(first.pk), str(withdrawn.pk), str(last.pk)]}, course)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [response.data[key] for key in ('created', 'reactivated', 'skipped', 'full')],
+            [1, 1, 0, 1])
+        self.assertEqual(set(Enrollment.objects.filter(
+            course=course, status='enrolled').values_list('student_id', flat=True)),
+            {first.pk, withdrawn.pk})
+
+    def test_rush_mode_queues_the_students(self):
+        course = Course.objects.create(
+            course_name='Rush', course_code='RU101', course_duration=12,
+            credits=3, capacity=1, rush_mode=True)
+
+        response = self.bulk_enroll(
+            {'student_ids': [str(student.pk) for student in self.students]}, course)
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['queued'], 3)
+        self.assertFalse(Enrollment.objects.filter(course=course).exists())
+
+        process_batch()
 
-# Create your tests here.
+        self.assertEqual(Counter(EnrollmentRequest.objects.filter(
+            course=course).values_list('status', flat=True)), {'enrolled': 1, 'full': 2})
@@ -13,13 +13,19 @@ urlpatterns = [
          name='course_students'),
     path('<uuid:pk>/enroll/', views.CourseEnrollStudentAPIView.as_view(),
          name='course_enroll_student'),
+    path('<uuid:pk>/enroll/bulk/', views.CourseBulkEnrollAPIView.as_view(),
+         name='course_bulk_enroll'),
     path('<uuid:pk>/unenroll/', views.CourseUnenrollStudentAPIView.as_view(),
          name='course_unenroll_student'),
+    path('<uuid:pk>/waitlist/', views.CourseWaitlistAPIView.as_view(),
+         name='course_waitlist'),
     path('<uuid:pk>/activate/', views.CourseActivateAPIView.as_view(),
          name='course_activate'),
     path('<uuid:pk>/deactivate/', views.CourseDeactivateAPIView.as_view(),
          name='course_deactivate'),
     path('active/', views.ActiveCoursesAPIView.as_view(), name='active_courses'),
+    path('statistics/', views.CourseStatisticsAPIView.as_view(),
+         name='course_statistics'),
 
     # Additional course endpoints
     path('list/', views.CourseListCreateAPIView.as_view(),
@@ -1,5 +1,6 @@
-from rest_framework import permissions, status, filters
+from rest_framework import permissions, serializers, status, filters
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
 from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db import transaction
@@ -7,9 +8,64 @@ from django.core.exceptions import ValidationError
 from django.core.paginator import Paginator
 from django.db.models import Q
 from django.utils import timezone
-from .models import Course
+from .models import Course, CourseFullError, course_statistics
 from .serializers import CourseSerializer, CourseDetailSerializer
-from .permissions import IsAdminOrReadOnly, IsStudentOrAdmin
+from .permissions import IsAdminOrReadOnly, IsAdminUser, IsStudentOrAdmin
+from student_course_management.conditional import Validators, conditional_get
+from student_course_management.response_cache import cache_response
+from student_course_management.throttling import EnrollThrottle
+from students.models import Enrollment
+
+# Models whose changes expire cached course responses; the enrollment
+# counters on courses move with every enrollment write
+COURSE_CACHE_MODELS = ('courses.Course', 'students.Enrollment')
+
+
+def filter_courses(request, queryset):
+    """Apply the course list's role-based restriction and query filters"""
+    # Apply role-based filtering
+    if hasattr(request.user, 'role') and request.user.role == 'student':
+        queryset = queryset.filter(is_active=True)
+
+    # Apply search filter
+    search = request.query_params.get('search')
+    if search:
+        queryset = queryset.filter(
+            Q(course_name__icontains=search) |
+            Q(course_code__icontains=search) |
+            Q(description__icontains=search)
+        )
+
+    # Apply filters
+    is_active = request.query_params.get('is_active')
+    if is_active is not None:
+        queryset = queryset.filter(is_active=is_active.lower() == 'true')
+
+    course_duration = request.query_params.get('course_duration')
+    if course_duration:
+        queryset = queryset.filter(course_duration=course_duration)
+
+    credits = request.query_params.get('credits')
+    if credits:
+        queryset = queryset.filter(credits=credits)
+
+    return queryset
+
+
+def course_list_validators(view, request):
+    """Fingerprint the filtered courses and the enrollments counted on them"""
+    courses = filter_courses(request, Course.objects.all())
+    return (Validators()
+            .add_queryset(courses)
+            .add_queryset(Enrollment.objects.filter(course__in=courses.values('pk'))))
+
+
+def active_course_validators(view, request):
+    """Fingerprint the active courses and the enrollments counted on them"""
+    courses = Course.objects.filter(is_active=True)
+    return (Validators()
+            .add_queryset(courses)
+            .add_queryset(Enrollment.objects.filter(course__in=courses.values('pk'))))
 
 
 class CourseListCreateAPIView(APIView):
@@ -18,35 +74,24 @@ class CourseListCreateAPIView(APIView):
     """
     permission_classes = [permissions.IsAuthenticated, IsAdminOrReadOnly]
 
+    @conditional_get(course_list_validators, per_user=False)
+    @cache_response(*COURSE_CACHE_MODELS, per_user=False)
     def get(self, request):
         """Get list of courses with filtering and pagination"""
-        queryset = Course.objects.all()
-
-        # Apply role-based filtering
-        if hasattr(request.user, 'role') and request.user.role == 'student':
-            queryset = queryset.filter(is_active=True)
-
-        # Apply search filter
-        search = request.query_params.get('search')
-        if search:
-            queryset = queryset.filter(
-                Q(course_name__icontains=search) |
-                Q(course_code__icontains=search) |
-                Q(description__icontains=search)
-            )
-
-        # Apply filters
-        is_active = request.query_params.get('is_active')
-        if is_active is not None:
-            queryset = queryset.filter(is_active=is_active.lower() == 'true')
+        # Sparse fieldsets (?fields=)
+        try:
+            fields = CourseSerializer.get_requested_fields(
+                request.query_params)
+        except serializers.ValidationError as e:
+            return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
 
-        course_duration = request.query_params.get('course_duration')
-        if course_duration:
-            queryset = queryset.filter(course_duration=course_duration)
+        queryset = Course.objects.all()
+        if fields is None or fields & set(CourseSerializer.counter_fields):
+            queryset = queryset.with_enrollment_counts()
+        if fields is not None:
+            queryset = queryset.only(*CourseSerializer.get_model_columns(fields))
 
-        credits = request.query_params.get('credits')
-        if credits:
-            queryset = queryset.filter(credits=credits)
+        queryset = filter_courses(request, queryset)
 
         # Apply ordering
         ordering = request.query_params.get('ordering', 'course_name')
@@ -59,7 +104,8 @@ class CourseListCreateAPIView(APIView):
         paginator = Paginator(queryset, page_size)
         page_obj = paginator.get_page(page)
 
-        serializer = CourseSerializer(page_obj.object_list, many=True)
+        serializer = CourseSerializer(
+            page_obj.object_list, many=True, fields=fields)
 
         return Response({
             'count': paginator.count,
@@ -95,6 +141,8 @@ class CourseDetailAPIView(APIView):
         except Course.DoesNotExist:
             return None
 
+    @cache_response(*COURSE_CACHE_MODELS, 'students.Student',
+                    'authentication.User', per_user=False)
     def get(self, request, pk):
         """Retrieve course details"""
         course = self.get_object(pk)
@@ -168,6 +216,8 @@ class CourseStudentsAPIView(APIView):
     """Get all students enrolled in a course using APIView"""
     permission_classes = [permissions.IsAuthenticated]
 
+    @cache_response(*COURSE_CACHE_MODELS, 'students.Student',
+                    'authentication.User', per_user=False)
     def get(self, request, pk):
         try:
             course = Course.objects.get(pk=pk)
@@ -177,12 +227,13 @@ class CourseStudentsAPIView(APIView):
             }, status=status.HTTP_404_NOT_FOUND)
 
         from students.serializers import StudentBasicSerializer
-        students = course.enrolled_students.all()
+        students = course.enrolled_students.with_enrollment_summary(
+            fields=set(StudentBasicSerializer.Meta.fields))
         serializer = StudentBasicSerializer(students, many=True)
 
         return Response({
             'course': CourseSerializer(course).data,
-            'students_count': students.count(),
+            'students_count': len(serializer.data),
             'students': serializer.data
         }, status=status.HTTP_200_OK)
 
@@ -190,14 +241,10 @@ class CourseStudentsAPIView(APIView):
 class CourseEnrollStudentAPIView(APIView):
     """Enroll a student to a course using APIView"""
     permission_classes = [permissions.IsAuthenticated, IsStudentOrAdmin]
+    throttle_classes = [EnrollThrottle]
 
     def post(self, request, pk):
-        # Debug logging
-        print(
-            f"🔐 Enrollment request from user: {request.user.username if request.user.is_authenticated else 'Anonymous'}")
-        print(f"🔐 User role: {getattr(request.user, 'role', 'No role')}")
-        print(f"🔐 User authenticated: {request.user.is_authenticated}")
-        print(f"🔐 Request data: {request.data}")
+        from students.models import Enrollment, Student
 
         try:
             course = Course.objects.get(pk=pk)
@@ -211,11 +258,7 @@ class CourseEnrollStudentAPIView(APIView):
         # If student_id is not provided and user is a student, use their own profile
         if not student_id and request.user.role == 'student':
             try:
-                # Get the student profile for the current user
-                from students.models import Student
-                student = Student.objects.get(user=request.user)
-                student_id = student.student_id
-                print(f"🎓 Auto-detected student ID: {student_id}")
+                student = Student.objects.select_related('user').get(user=request.user)
             except Student.DoesNotExist:
                 return Response({
                     'error': 'Student profile not found for current user'
@@ -224,14 +267,14 @@ class CourseEnrollStudentAPIView(APIView):
             return Response({
                 'error': 'student_id is required'
             }, status=status.HTTP_400_BAD_REQUEST)
-
-        try:
-            from students.models import Student
-            student = Student.objects.get(student_id=student_id)
-        except Student.DoesNotExist:
-            return Response({
-                'error': 'Student not found'
-            }, status=status.HTTP_404_NOT_FOUND)
+        else:
+            try:
+                student = Student.objects.select_related('user').get(
+                    student_id=student_id)
+            except Student.DoesNotExist:
+                return Response({
+                    'error': 'Student not found'
+                }, status=status.HTTP_404_NOT_FOUND)
 
         # Students can only enroll themselves, admins can enroll anyone
         if request.user.role == 'student' and student.user != request.user:
@@ -239,18 +282,34 @@ class CourseEnrollStudentAPIView(APIView):
                 'error': 'Students can only enroll themselves'
             }, status=status.HTTP_403_FORBIDDEN)
 
-        # Check if student is already enrolled in this course
-        if student.is_enrolled_in_course(course):
+        # During a registration rush requests are queued and answered with
+        # a ticket; workers allocate the seats in arrival order
+        if course.rush_mode:
+            from students.enrollment_queue import submit_enrollment_request
+
+            ticket = submit_enrollment_request(student, course)
+            return Response({
+                'message': f'Enrollment request for {course.course_code} queued',
+                'request_id': str(ticket.request_id),
+                'status': ticket.status,
+                'status_url': reverse(
+                    'students:enrollment_request_status', args=[ticket.request_id],
+                    request=request),
+            }, status=status.HTTP_202_ACCEPTED)
+
+        # Insert or reactivate the enrollment in one compare-and-set step
+        try:
+            result = Enrollment.objects.enroll(
+                student.pk, course.pk, capacity=course.capacity)
+        except CourseFullError:
+            return Response({
+                'error': 'Course is full'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if not result.changed:
             return Response({
                 'error': 'Student is already enrolled in this course'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        # Enroll student in course using the enrollment method
-        enrollment = student.enroll_in_course(course)
-
-        print(
-            f"✅ Successfully enrolled {student.student_number} in {course.course_code}")
-
         return Response({
             'message': f'Student {student.student_number} successfully enrolled in {course.course_code}',
             'student': {
@@ -258,12 +317,99 @@ class CourseEnrollStudentAPIView(APIView):
                 'student_number': student.student_number,
                 'name': student.full_name,
                 'course': course.course_code,
-                'enrollment_date': enrollment.enrollment_date.strftime('%Y-%m-%d'),
-                'enrollment_status': enrollment.status
+                'enrollment_date': result.changed_at.strftime('%Y-%m-%d'),
+                'enrollment_status': result.status
             }
         }, status=status.HTTP_200_OK)
 
 
+class CourseBulkEnrollAPIView(APIView):
+    """
+    Enroll many students in a course in one transaction (admin only)
+
+    Accepts {"student_ids": [...]} or {"filter": {...}} using the student
+    list filters (search, status, course). For a course in rush mode the
+    students are queued instead and the request tickets returned.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAdminUser]
+    throttle_classes = [EnrollThrottle]
+
+    def post(self, request, pk):
+        from students.bulk import bulk_enroll_students, get_max_rows
+        from students.models import Student
+        from students.serializers import BulkEnrollSerializer
+        from students.views import filter_students
+
+        try:
+            course = Course.objects.get(pk=pk)
+        except Course.DoesNotExist:
+            return Response({
+                'error': 'Course not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        if not course.is_active:
+            return Response({
+                'error': 'Cannot enroll students in an inactive course'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = BulkEnrollSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        max_rows = get_max_rows()
+        requested_ids = serializer.validated_data.get('student_ids')
+        if requested_ids is not None:
+            if len(requested_ids) > max_rows:
+                return Response({
+                    'error': f'At most {max_rows} students can be enrolled per request'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            students = Student.objects.filter(pk__in=requested_ids)
+        else:
+            students = filter_students(
+                request, Student.objects.all(),
+                params=serializer.validated_data['filter'])
+
+        # One extra row tells us whether the filter matched too many students
+        student_ids = list(
+            students.order_by().values_list('pk', flat=True)[:max_rows + 1])
+        if len(student_ids) > max_rows:
+            return Response({
+                'error': f'At most {max_rows} students can be enrolled per request'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if requested_ids is not None:
+            # Seats are granted in the order the students were given
+            found = set(student_ids)
+            student_ids = [student_id for student_id in dict.fromkeys(requested_ids)
+                           if student_id in found]
+
+        # During a registration rush the students join the queue like any
+        # other enroll request
+        if course.rush_mode:
+            from students.enrollment_queue import submit_enrollment_requests
+
+            tickets = submit_enrollment_requests(course, student_ids)
+            return Response({
+                'message': f'Queued {len(tickets)} enrollment requests for {course.course_code}',
+                'course': course.course_code,
+                'matched': len(student_ids),
+                'queued': len(tickets),
+                'request_ids': [str(ticket.request_id) for ticket in tickets],
+            }, status=status.HTTP_202_ACCEPTED)
+
+        counts = bulk_enroll_students(course, student_ids)
+
+        response = {
+            'message': f'Processed {len(student_ids)} students for {course.course_code}',
+            'course': course.course_code,
+            'matched': len(student_ids),
+            **counts,
+        }
+        if requested_ids is not None:
+            response['not_found'] = sorted(
+                str(student_id) for student_id in set(requested_ids) - set(student_ids))
+        return Response(response, status=status.HTTP_200_OK)
+
+
 class CourseUnenrollStudentAPIView(APIView):
     """Unenroll a student from a course using APIView"""
     permission_classes = [permissions.IsAuthenticated, IsAdminOrReadOnly]
@@ -282,23 +428,23 @@ class CourseUnenrollStudentAPIView(APIView):
                 'error': 'student_id is required'
             }, status=status.HTTP_400_BAD_REQUEST)
 
+        from students.models import Enrollment, Student, WITHDRAWABLE_STATUSES
         try:
-            from students.models import Student
-            student = Student.objects.get(student_id=student_id)
+            student = Student.objects.select_related('user').get(
+                student_id=student_id)
         except Student.DoesNotExist:
             return Response({
                 'error': 'Student not found'
             }, status=status.HTTP_404_NOT_FOUND)
 
-        # Check if student is enrolled in this course
-        if not student.is_enrolled_in_course(course):
+        # Withdraw with a compare-and-set; no match means not enrolled
+        result = Enrollment.objects.transition(
+            student.pk, course.pk, 'withdrawn', WITHDRAWABLE_STATUSES)
+        if result is None:
             return Response({
                 'error': 'Student is not enrolled in this course'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        # Unenroll student from course using the enrollment method
-        enrollment = student.unenroll_from_course(course)
-
         return Response({
             'message': f'Student {student.student_number} successfully unenrolled from {course.course_code}',
             'student': {
@@ -306,12 +452,105 @@ class CourseUnenrollStudentAPIView(APIView):
                 'student_number': student.student_number,
                 'name': student.full_name,
                 'course': course.course_code,
-                'enrollment_status': enrollment.status if enrollment else 'withdrawn',
+                'enrollment_status': result.status,
                 'note': 'Enrollment status changed to withdrawn'
             }
         }, status=status.HTTP_200_OK)
 
 
+class CourseWaitlistAPIView(APIView):
+    """
+    Join (POST) or leave (DELETE) the waitlist of a full course.
+
+    Students act for themselves; admins pass student_id. Waitlisted
+    students are enrolled by the promote_waitlists pass as seats free up.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsStudentOrAdmin]
+    throttle_classes = [EnrollThrottle]
+
+    def get_student(self, request):
+        """Return (student, None) or (None, error response)"""
+        from students.models import Student
+
+        student_id = request.data.get('student_id')
+        try:
+            if not student_id and request.user.role == 'student':
+                return Student.objects.select_related('user').get(
+                    user=request.user), None
+            if not student_id:
+                return None, Response({
+                    'error': 'student_id is required'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            student = Student.objects.select_related('user').get(
+                student_id=student_id)
+        except (Student.DoesNotExist, ValidationError):
+            return None, Response({
+                'error': 'Student not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        if request.user.role == 'student' and student.user != request.user:
+            return None, Response({
+                'error': 'Students can only manage their own waitlist entries'
+            }, status=status.HTTP_403_FORBIDDEN)
+        return student, None
+
+    def post(self, request, pk):
+        from students.models import Waitlist
+
+        try:
+            course = Course.objects.with_enrollment_counts().get(pk=pk)
+        except Course.DoesNotExist:
+            return Response({
+                'error': 'Course not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        student, error = self.get_student(request)
+        if error:
+            return error
+
+        if Enrollment.objects.filter(
+                student=student, course=course, status='enrolled').exists():
+            return Response({
+                'error': 'Student is already enrolled in this course'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        # Free seats are held for the students already waiting, so the
+        # course only has a seat to offer once it has more than its waitlist
+        if course.capacity is None or (
+                course.capacity - course.enrolled_students_total >
+                Waitlist.objects.seats_held(course.pk, student.pk)):
+            return Response({
+                'error': 'Course has free seats; enroll instead'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        entry, created = Waitlist.objects.join(student.pk, course.pk)
+        entry = Waitlist.objects.with_rank().get(pk=entry.pk)
+        return Response({
+            'message': (f'Student {student.student_number} added to the waitlist of {course.course_code}'
+                        if created else 'Student is already on the waitlist'),
+            'course': course.course_code,
+            'position': entry.waitlist_rank,
+            'waitlist_length': entry.waitlist_length,
+        }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+    def delete(self, request, pk):
+        from students.models import Waitlist
+
+        if not Course.objects.filter(pk=pk).exists():
+            return Response({
+                'error': 'Course not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        student, error = self.get_student(request)
+        if error:
+            return error
+
+        if not Waitlist.objects.leave(student.pk, pk):
+            return Response({
+                'error': 'Student is not on the waitlist of this course'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 class CourseActivateAPIView(APIView):
     """Activate a course using APIView"""
     permission_classes = [permissions.IsAuthenticated, IsAdminOrReadOnly]
@@ -358,11 +597,31 @@ class ActiveCoursesAPIView(APIView):
     """Get all active courses using APIView"""
     permission_classes = [permissions.IsAuthenticated]
 
+    @conditional_get(active_course_validators, per_user=False)
+    @cache_response(*COURSE_CACHE_MODELS, per_user=False)
     def get(self, request):
-        active_courses = Course.objects.filter(is_active=True)
+        active_courses = Course.objects.filter(
+            is_active=True).with_enrollment_counts()
         serializer = CourseSerializer(active_courses, many=True)
 
         return Response({
             'count': active_courses.count(),
             'results': serializer.data
         }, status=status.HTTP_200_OK)
+
+
+class CourseStatisticsAPIView(APIView):
+    """Enrollment statistics per course, served from the statistics rollup"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    @cache_response(*COURSE_CACHE_MODELS, 'courses.CourseStatistic', per_user=False)
+    def get(self, request):
+        courses = filter_courses(request, Course.objects.only(
+            'course_id', 'course_code', 'course_name', 'is_active'
+        ).order_by('course_name'))
+        results = course_statistics(courses)
+
+        return Response({
+            'count': len(results),
+            'results': results
+        }, status=status.HTTP_200_OK)
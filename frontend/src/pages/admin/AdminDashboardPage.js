@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from "react";
 import { useAuth } from "../../context/AuthContext";
 import { useNavigate, useLocation } from "react-router-dom";
-import { coursesAPI, studentsAPI } from "../../services/api";
+import { coursesAPI, dashboardAPI, studentsAPI } from "../../services/api";
 import {
   BookOpen,
   Users,
@@ -76,40 +76,26 @@ const AdminDashboardPage = () => {
     try {
       setLoading(true);
 
-      // Admin dashboard - fetch summary data
-      const coursesResponse = await coursesAPI.list({ limit: 5 });
-      const activeCoursesResponse = await coursesAPI.listActive({ limit: 5 });
-      const studentsResponse = await studentsAPI.list({ limit: 5 });
-      const activeStudentsResponse = await studentsAPI.listActive({
-        limit: 5,
-      });
-
-      console.log("📊 Dashboard - Students data:", studentsResponse.data);
-      console.log(
-        "📋 Dashboard - First student structure:",
-        studentsResponse.data.results?.[0]
-      );
-
-      // Fetch all courses for student modal
-      const allCoursesResponse = await coursesAPI.list({ is_active: true });
+      // Admin dashboard - totals come from the summary endpoint
+      const [
+        dashboardResponse,
+        coursesResponse,
+        studentsResponse,
+        allCoursesResponse,
+      ] = await Promise.all([
+        dashboardAPI.admin(),
+        coursesAPI.list({ limit: 5 }),
+        studentsAPI.list({ limit: 5 }),
+        // All active courses for the student modal
+        coursesAPI.list({ is_active: true }),
+      ]);
+      const summary = dashboardResponse.data;
 
       setStats({
-        totalCourses:
-          coursesResponse.data.count ||
-          coursesResponse.data.results?.length ||
-          0,
-        activeCourses:
-          activeCoursesResponse.data.count ||
-          activeCoursesResponse.data.results?.length ||
-          0,
-        totalStudents:
-          studentsResponse.data.count ||
-          studentsResponse.data.results?.length ||
-          0,
-        activeStudents:
-          activeStudentsResponse.data.count ||
-          activeStudentsResponse.data.results?.length ||
-          0,
+        totalCourses: summary.courses.total,
+        activeCourses: summary.courses.active,
+        totalStudents: summary.students.total,
+        activeStudents: summary.students.active,
       });
 
       setRecentCourses(
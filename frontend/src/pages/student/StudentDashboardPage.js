@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from "react";
 import { useAuth } from "../../context/AuthContext";
 import { useNavigate } from "react-router-dom";
-import { coursesAPI, studentsAPI } from "../../services/api";
+import { studentsAPI } from "../../services/api";
 import {
   BookOpen,
   Users,
@@ -22,7 +22,7 @@ const StudentDashboardPage = () => {
   const [loading, setLoading] = useState(true);
   const [studentProfile, setStudentProfile] = useState(null);
   const [enrolledCourses, setEnrolledCourses] = useState([]);
-  const [availableCourses, setAvailableCourses] = useState([]);
+  const [availableCount, setAvailableCount] = useState(0);
   const [selectedCourse, setSelectedCourse] = useState(null);
   const [showCourseModal, setShowCourseModal] = useState(false);
 
@@ -34,35 +34,20 @@ const StudentDashboardPage = () => {
     try {
       setLoading(true);
 
-      // Student dashboard - fetch all available courses and student profile
-      const [allCoursesResponse, profileResponse] = await Promise.all([
-        coursesAPI.list({ is_active: true }),
-        studentsAPI.getProfile(),
-      ]);
+      // Student dashboard - the server works out enrolled vs available courses
+      const response = await studentsAPI.getMyDashboard();
+      const dashboard = response.data;
+      setStudentProfile({
+        ...dashboard.student,
+        user_details: {
+          full_name: dashboard.student.full_name,
+          email: dashboard.student.email,
+          phone: dashboard.student.phone,
+        },
+      });
 
-      const allCourses =
-        allCoursesResponse.data.results || allCoursesResponse.data || [];
-      const studentData = profileResponse.data || profileResponse;
-      console.log("📊 Dashboard - Student Data:", studentData);
-      setStudentProfile(studentData);
-
-      // Separate enrolled and available courses
-      const studentActiveCourses = studentData?.active_courses || [];
-      console.log(
-        "📚 Dashboard - Found enrolled courses:",
-        studentActiveCourses
-      );
-      const enrolled = studentActiveCourses;
-      const available = allCourses.filter(
-        (course) =>
-          !enrolled.some(
-            (enrolledCourse) => enrolledCourse.course_id === course.course_id
-          )
-      );
-      console.log("📖 Dashboard - Available courses:", available.length);
-
-      setEnrolledCourses(enrolled);
-      setAvailableCourses(available);
+      setEnrolledCourses(dashboard.enrolled_courses);
+      setAvailableCount(dashboard.available_courses.count);
     } catch (error) {
       console.error("Error fetching dashboard data:", error);
     } finally {
@@ -307,7 +292,7 @@ const StudentDashboardPage = () => {
                     Available Courses
                   </p>
                   <p className="text-xl sm:text-2xl font-bold">
-                    {availableCourses.length}
+                    {availableCount}
                   </p>
                 </div>
               </div>
@@ -95,6 +95,16 @@ export const coursesAPI = {
   getAllCourses: () => api.get("/api/courses/"),
 };
 
+// Dashboard API
+export const dashboardAPI = {
+  admin: (params) => api.get("/api/dashboard/admin/", { params }),
+};
+
+// Batch API - run several GET requests in one round trip
+export const batchAPI = {
+  get: (paths) => api.post("/api/batch/", { requests: paths }),
+};
+
 // Students API
 export const studentsAPI = {
   list: (params) => api.get("/api/students/", { params }),
@@ -124,6 +134,8 @@ export const studentsAPI = {
   listByCourse: (params) => api.get("/api/students/by-course/", { params }),
   listActive: (params) => api.get("/api/students/active/", { params }),
   getMyProfile: () => api.get("/api/students/my-profile/"),
+  getMyDashboard: (params) =>
+    api.get("/api/students/my-dashboard/", { params }),
   getProfile: () => api.get("/api/students/my-profile/"),
   updateProfile: (userData) => api.put("/api/students/my-profile/", userData),
   getAllStudents: () => api.get("/api/students/"),
@@ -0,0 +1,158 @@
+"""
+Batch (composite) GET requests for Student Course Management System
+
+POST /api/batch/ takes a list of relative GET paths and runs each one
+through its view inside the same request: the caller is authenticated once
+and the sub-requests reuse that user and the request's database
+connection, then all responses come back in one JSON envelope.
+
+Only paths under /api/ served by DRF API views can be batched, so each
+sub-request goes through its view's permission checks and the admin site,
+/metrics and other plain Django views stay out of reach.
+"""
+import io
+import json
+import logging
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.urls import Resolver404, resolve
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+
+logger = logging.getLogger(__name__)
+
+API_PREFIX = '/api/'
+BATCH_PATH = '/api/batch/'
+
+# Request headers that only apply to the batch request itself
+_DROPPED_META = ('CONTENT_LENGTH', 'CONTENT_TYPE', 'HTTP_IF_NONE_MATCH',
+                 'HTTP_IF_MODIFIED_SINCE', 'HTTP_IF_MATCH', 'HTTP_IF_UNMODIFIED_SINCE')
+
+
+def get_max_requests():
+    """Largest number of sub-requests accepted in one batch"""
+    return max(1, getattr(settings, 'BATCH_MAX_REQUESTS', 20))
+
+
+def _build_sub_request(request, path, query):
+    """A GET request for path that shares the batch request's user and headers"""
+    environ = {key: value for key, value in request.META.items()
+               if key not in _DROPPED_META}
+    environ.update({
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'CONTENT_LENGTH': '0',
+        'wsgi.input': io.BytesIO(b''),
+        'wsgi.url_scheme': request.scheme,
+    })
+    sub_request = WSGIRequest(environ)
+    # DRF views skip authentication for a forced user; plain Django views
+    # read request.user
+    sub_request._force_auth_user = request.user
+    sub_request._force_auth_token = request.auth
+    sub_request.user = request.user
+    return sub_request
+
+
+def _response_body(response):
+    if hasattr(response, 'data'):
+        return response.data
+    content_type = response.get('Content-Type', '')
+    if content_type.startswith('application/json'):
+        return json.loads(response.content or b'null')
+    return response.content.decode(response.charset or 'utf-8')
+
+
+def run_sub_request(request, path):
+    """Run one GET sub-request; returns (status code, body)"""
+    parts = urlsplit(path)
+    if parts.scheme or parts.netloc or not parts.path.startswith('/'):
+        return status.HTTP_400_BAD_REQUEST, {'error': 'Paths must be relative, e.g. /api/courses/'}
+    if parts.path.rstrip('/') == BATCH_PATH.rstrip('/'):
+        return status.HTTP_400_BAD_REQUEST, {'error': 'Batches cannot be nested'}
+    if not parts.path.startswith(API_PREFIX):
+        return status.HTTP_400_BAD_REQUEST, {'error': f'Only {API_PREFIX} paths can be batched'}
+    try:
+        match = resolve(parts.path)
+    except Resolver404:
+        return status.HTTP_404_NOT_FOUND, {'error': 'Not found'}
+    view_class = getattr(match.func, 'cls', None)
+    if not (isinstance(view_class, type) and issubclass(view_class, APIView)):
+        return status.HTTP_400_BAD_REQUEST, {'error': 'Only API endpoints can be batched'}
+
+    sub_request = _build_sub_request(request, parts.path, parts.query)
+    try:
+        response = match.func(sub_request, *match.args, **match.kwargs)
+        if response.streaming:
+            return status.HTTP_400_BAD_REQUEST, {'error': 'Streaming responses cannot be batched'}
+        # Only DRF responses expose their data unrendered
+        if not hasattr(response, 'data') and hasattr(response, 'render'):
+            response.render()
+        return response.status_code, _response_body(response)
+    except Exception:
+        logger.exception('Batch sub-request %s failed', path)
+        return status.HTTP_500_INTERNAL_SERVER_ERROR, {'error': 'Internal server error'}
+
+
+class BatchAPIView(APIView):
+    """
+    Run several GET requests in one round trip.
+
+    The body is {"requests": [{"id": ..., "path": "/api/courses/?page=2"}, ...]}
+    (entries may also be plain path strings). Each sub-request is checked
+    against its own view's permissions; the envelope lists every response
+    with its status and duration, in request order.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        entries = request.data.get('requests') if isinstance(request.data, dict) else request.data
+        if not isinstance(entries, list) or not entries:
+            return Response({
+                'error': 'Expected a non-empty list of requests'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        max_requests = get_max_requests()
+        if len(entries) > max_requests:
+            return Response({
+                'error': f'A batch may contain at most {max_requests} requests'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        paths = []
+        for index, entry in enumerate(entries):
+            if isinstance(entry, str):
+                entry = {'path': entry}
+            if not isinstance(entry, dict) or not isinstance(entry.get('path'), str):
+                return Response({
+                    'error': f'Request {index} must be a path or an object with a "path"'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            if str(entry.get('method', 'GET')).upper() != 'GET':
+                return Response({
+                    'error': f'Request {index}: only GET requests can be batched'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            paths.append((entry.get('id', index), entry['path']))
+
+        responses = []
+        started = time.perf_counter()
+        for request_id, path in paths:
+            sub_started = time.perf_counter()
+            status_code, body = run_sub_request(request, path)
+            responses.append({
+                'id': request_id,
+                'path': path,
+                'status': status_code,
+                'duration_ms': round((time.perf_counter() - sub_started) * 1000, 2),
+                'body': body,
+            })
+
+        return Response({
+            'count': len(responses),
+            'duration_ms': round((time.perf_counter() - started) * 1000, 2),
+            'responses': responses
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,95 @@
+"""
+Admin dashboard summary for Student Course Management System
+
+Every number on the admin dashboard comes from one response built with a
+fixed set of aggregate queries: students by status (index-only GROUP BY),
+courses by active flag, enrollments by status and the top courses (both
+from the course statistics rollup, so independent of the number of
+enrollments) and the most recent enrollments (an index range scan).
+"""
+from django.db.models import Case, Count, F, Sum, When
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from courses.models import Course, CourseStatistic
+from courses.permissions import IsAdminUser
+from students.models import Enrollment, Student
+from .response_cache import cache_response
+
+
+# Default and largest number of top courses and recent enrollments
+DEFAULT_LIST_SIZE = 5
+MAX_LIST_SIZE = 50
+
+
+def _counts(choices, rows):
+    """Zero-filled {choice: count} from (choice, count) rows"""
+    counts = dict.fromkeys((value for value, _ in choices), 0)
+    counts.update(rows)
+    return {**counts, 'total': sum(counts.values())}
+
+
+def _list_size(request, name):
+    try:
+        size = int(request.query_params.get(name, DEFAULT_LIST_SIZE))
+    except ValueError:
+        size = DEFAULT_LIST_SIZE
+    return min(max(size, 0), MAX_LIST_SIZE)
+
+
+def get_admin_dashboard(top=DEFAULT_LIST_SIZE, recent=DEFAULT_LIST_SIZE):
+    """Build the admin dashboard summary with five queries"""
+    students = Student.objects.order_by().values_list('status').annotate(Count('pk'))
+    courses = dict(Course.objects.order_by().values_list('is_active').annotate(Count('pk')))
+    enrollments = CourseStatistic.objects.order_by().values_list(
+        'status').annotate(Sum('enrollments'))
+
+    top_courses = CourseStatistic.objects.order_by().values(
+        'course_id',
+        course_code=F('course__course_code'),
+        course_name=F('course__course_name'),
+    ).annotate(
+        enrolled=Sum(Case(When(status='enrolled', then='enrollments'), default=0)),
+        total=Sum('enrollments'),
+    ).order_by('-enrolled', 'course_code')[:top]
+
+    recent_enrollments = Enrollment.objects.order_by('-enrollment_date').values(
+        'enrollment_id',
+        'student_id',
+        'course_id',
+        'status',
+        'enrollment_date',
+        student_number=F('student__student_number'),
+        first_name=F('student__user__first_name'),
+        last_name=F('student__user__last_name'),
+        course_code=F('course__course_code'),
+    )[:recent]
+
+    return {
+        'students': _counts(Student.STATUS_CHOICES, students),
+        'courses': {
+            'active': courses.get(True, 0),
+            'inactive': courses.get(False, 0),
+            'total': sum(courses.values()),
+        },
+        'enrollments': _counts(Enrollment.ENROLLMENT_STATUS_CHOICES, enrollments),
+        'top_courses': list(top_courses) if top else [],
+        'recent_enrollments': list(recent_enrollments) if recent else [],
+    }
+
+
+class AdminDashboardAPIView(APIView):
+    """
+    Totals for the admin dashboard in a single request (admin only).
+    ?top= and ?recent= size the course and enrollment lists (default 5).
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAdminUser]
+
+    @cache_response('students.Student', 'courses.Course', 'courses.CourseStatistic',
+                    'students.Enrollment', 'authentication.User', per_user=False)
+    def get(self, request):
+        return Response(get_admin_dashboard(
+            top=_list_size(request, 'top'),
+            recent=_list_size(request, 'recent'),
+        ), status=status.HTTP_200_OK)
@@ -0,0 +1,53 @@
+"""
+Database helpers for Student Course Management System
+"""
+import random
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import OperationalError, connection
+
+
+# MySQL error codes: 1213 deadlock found, 1205 lock wait timeout exceeded
+MYSQL_DEADLOCK_CODES = (1213, 1205)
+# PostgreSQL SQLSTATEs: deadlock detected, serialization failure
+POSTGRESQL_DEADLOCK_STATES = ('40P01', '40001')
+
+
+def is_deadlock(exc):
+    """Whether an OperationalError means the transaction lost a lock conflict"""
+    if exc.args and exc.args[0] in MYSQL_DEADLOCK_CODES:
+        return True
+    cause = exc.__cause__
+    state = getattr(cause, 'sqlstate', None) or getattr(cause, 'pgcode', None)
+    return state in POSTGRESQL_DEADLOCK_STATES
+
+
+def get_deadlock_backoff(attempt):
+    """Seconds to wait before retry number `attempt` (exponential, jittered)"""
+    base = getattr(settings, 'DEADLOCK_RETRY_BACKOFF', 0.05)
+    return base * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+
+
+def retry_on_deadlock(func):
+    """
+    Retry func when the database aborts it with a deadlock.
+
+    A deadlock rolls back the whole transaction, so func is only retried when
+    it ran its own outermost transaction; inside an enclosing atomic block
+    the error is re-raised so the owner of that transaction can retry.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        attempts = max(1, getattr(settings, 'DEADLOCK_RETRY_ATTEMPTS', 3))
+        for attempt in range(1, attempts + 1):
+            try:
+                return func(*args, **kwargs)
+            except OperationalError as exc:
+                if (attempt == attempts or not is_deadlock(exc) or
+                        connection.in_atomic_block):
+                    raise
+                time.sleep(get_deadlock_backoff(attempt))
+
+    return wrapper
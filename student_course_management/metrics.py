@@ -0,0 +1,361 @@
+"""
+Prometheus metrics for Student Course Management System
+
+MetricsMiddleware records, per resolved URL name (students:student_list_create,
+courses:course_enroll_student, ...), the request count by method and
+status and histograms of the request, database and serializer time.
+GET /metrics serves them in the Prometheus text format.
+
+GET /metrics requires METRICS_TOKEN as a bearer token, or a logged-in
+staff user while no token is configured.
+
+Pre-fork servers run several worker processes, so each process keeps its
+samples in its own memory-mapped file under METRICS_DIR
+(metrics_<pid>.db, by default <BASE_DIR>/metrics) and /metrics sums the
+files of every worker. Recording
+a request is a handful of in-place float additions into the mapping, with
+no system call or lock shared between processes. Files of exited workers
+are kept so counters never go backwards; clear METRICS_DIR when deploying.
+
+Serializer time is spent in Serializer.data and is_valid, including any
+queries they run, so it overlaps the database time. Database time comes
+from the shared SQL timing wrapper of sql_metrics, so it matches the
+X-DB-Queries header and the trace spans of the same request.
+"""
+import glob
+import hmac
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from functools import wraps
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse, HttpResponseForbidden
+from rest_framework import serializers
+
+from .sql_metrics import QueryRecorder
+
+
+def get_metrics_enabled():
+    return getattr(settings, 'METRICS_ENABLED', True)
+
+
+def get_metrics_dir():
+    """Directory shared by the worker processes for their metrics files"""
+    return getattr(settings, 'METRICS_DIR', None) or os.path.join(
+        settings.BASE_DIR, 'metrics')
+
+
+def get_metrics_token():
+    """Bearer token required to read /metrics, or None to require a staff login"""
+    return getattr(settings, 'METRICS_TOKEN', None) or None
+
+
+# Upper bounds (seconds) of the latency histogram buckets
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKET_LABELS = tuple(repr(bound) for bound in BUCKETS) + ('+Inf',)
+
+# Route label of requests that matched no URL pattern
+UNMATCHED_ROUTE = 'unmatched'
+
+# name: (type, help, label names)
+METRICS = {
+    'http_requests_total': (
+        'counter', 'Requests handled', ('route', 'method', 'status')),
+    'http_request_duration_seconds': (
+        'histogram', 'Time to produce the response', ('route', 'method')),
+    'http_request_db_duration_seconds': (
+        'histogram', 'Time spent running SQL queries', ('route',)),
+    'http_request_serializer_duration_seconds': (
+        'histogram', 'Time spent in serializer data and validation', ('route',)),
+    'http_request_db_queries_total': (
+        'counter', 'SQL queries run', ('route',)),
+}
+
+
+_HEADER = struct.Struct('<Q')  # bytes in use, entries start after it
+_KEY_LENGTH = struct.Struct('<I')
+_VALUE = struct.Struct('<d')
+
+
+def _entries(buffer):
+    """(key, offset of the value) of each entry in a metrics file buffer"""
+    used = _HEADER.unpack_from(buffer, 0)[0]
+    position = _HEADER.size
+    while position < used:
+        (length,) = _KEY_LENGTH.unpack_from(buffer, position)
+        start = position + _KEY_LENGTH.size
+        key = bytes(buffer[start:start + length]).decode()
+        offset = start + length
+        offset += -offset % 8
+        yield key, offset
+        position = offset + _VALUE.size
+
+
+class MetricsFile:
+    """
+    Append-only mapping of sample keys to float values in a memory-mapped
+    file written by a single process.
+
+    An entry is written before the used size in the header covers it, so
+    other processes reading the file never see a partial entry.
+    """
+    INITIAL_SIZE = 64 * 1024
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'a+b')
+        size = os.fstat(self._file.fileno()).st_size
+        if size < self.INITIAL_SIZE:
+            self._file.truncate(self.INITIAL_SIZE)
+            size = self.INITIAL_SIZE
+        self._map = mmap.mmap(self._file.fileno(), size)
+        self._used = _HEADER.unpack_from(self._map, 0)[0] or _HEADER.size
+        self._offsets = dict(_entries(self._map))
+
+    def _append(self, key):
+        encoded = key.encode()
+        offset = self._used + _KEY_LENGTH.size + len(encoded)
+        offset += -offset % 8
+        end = offset + _VALUE.size
+        if end > len(self._map):
+            size = len(self._map)
+            while size < end:
+                size *= 2
+            self._map.close()
+            self._file.truncate(size)
+            self._map = mmap.mmap(self._file.fileno(), size)
+        _KEY_LENGTH.pack_into(self._map, self._used, len(encoded))
+        start = self._used + _KEY_LENGTH.size
+        self._map[start:start + len(encoded)] = encoded
+        _VALUE.pack_into(self._map, offset, 0.0)
+        _HEADER.pack_into(self._map, 0, end)
+        self._used = end
+        self._offsets[key] = offset
+        return offset
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def add(self, key, amount):
+        offset = self._offsets.get(key)
+        if offset is None:
+            offset = self._append(key)
+        _VALUE.pack_into(self._map, offset,
+                         _VALUE.unpack_from(self._map, offset)[0] + amount)
+
+
+def _sample_key(name, labels):
+    return json.dumps([name, labels], separators=(',', ':'))
+
+
+class MetricsRegistry:
+    """Metrics of this process, recorded into its file under METRICS_DIR"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._owner = None
+        self._file = None
+        self._keys = {}
+
+    def _current_file(self):
+        owner = (os.getpid(), get_metrics_dir())
+        if owner != self._owner:
+            # First use, a worker forked from a process that recorded, or a
+            # new METRICS_DIR (tests)
+            pid, directory = owner
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+            if self._file is not None:
+                self._file.close()
+            self._file = MetricsFile(os.path.join(directory, f'metrics_{pid}.db'))
+            self._owner = owner
+        return self._file
+
+    def _key(self, name, labels):
+        key = self._keys.get((name, labels))
+        if key is None:
+            key = self._keys[name, labels] = _sample_key(name, labels)
+        return key
+
+    def _observe(self, metrics_file, name, labels, value):
+        bucket = BUCKET_LABELS[bisect_left(BUCKETS, value)]
+        metrics_file.add(self._key(name + '_bucket', labels + (bucket,)), 1)
+        metrics_file.add(self._key(name + '_sum', labels), value)
+
+    def record_request(self, route, method, status, duration, db_duration,
+                       db_queries, serializer_duration):
+        with self._lock:
+            metrics_file = self._current_file()
+            metrics_file.add(self._key('http_requests_total', (route, method, status)), 1)
+            self._observe(metrics_file, 'http_request_duration_seconds',
+                          (route, method), duration)
+            self._observe(metrics_file, 'http_request_db_duration_seconds',
+                          (route,), db_duration)
+            self._observe(metrics_file, 'http_request_serializer_duration_seconds',
+                          (route,), serializer_duration)
+            if db_queries:
+                metrics_file.add(self._key('http_request_db_queries_total', (route,)),
+                                 db_queries)
+
+
+registry = MetricsRegistry()
+
+
+def collect():
+    """{sample key: value} summed over the metrics files of every process"""
+    totals = defaultdict(float)
+    for path in glob.glob(os.path.join(get_metrics_dir(), 'metrics_*.db')):
+        try:
+            with open(path, 'rb') as metrics_file:
+                buffer = metrics_file.read()
+        except FileNotFoundError:
+            continue
+        if len(buffer) < _HEADER.size:
+            continue
+        for key, offset in _entries(buffer):
+            totals[key] += _VALUE.unpack_from(buffer, offset)[0]
+    return totals
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _format_labels(names, values):
+    return '{' + ','.join(f'{name}="{_escape(value)}"'
+                          for name, value in zip(names, values)) + '}'
+
+
+def _format_value(value):
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def render_metrics(totals):
+    """Prometheus text exposition of collected samples"""
+    samples = defaultdict(dict)
+    for key, value in totals.items():
+        name, labels = json.loads(key)
+        samples[name][tuple(labels)] = value
+
+    lines = []
+    for name, (kind, help_text, label_names) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        if kind == 'counter':
+            for labels, value in sorted(samples[name].items()):
+                lines.append(f'{name}{_format_labels(label_names, labels)} '
+                             f'{_format_value(value)}')
+            continue
+
+        buckets = samples[name + '_bucket']
+        bucket_names = label_names + ('le',)
+        for labels, total in sorted(samples[name + '_sum'].items()):
+            count = 0.0
+            for bucket in BUCKET_LABELS:
+                count += buckets.get(labels + (bucket,), 0)
+                lines.append(f'{name}_bucket{_format_labels(bucket_names, labels + (bucket,))} '
+                             f'{_format_value(count)}')
+            formatted = _format_labels(label_names, labels)
+            lines.append(f'{name}_sum{formatted} {_format_value(total)}')
+            lines.append(f'{name}_count{formatted} {_format_value(count)}')
+    return '\n'.join(lines) + '\n'
+
+
+class _RequestTimings(threading.local):
+    """Serializer time of the request running on this thread"""
+    active = False
+    serializing = False
+    serializer_duration = 0.0
+
+    def start(self):
+        self.active = True
+        self.serializing = False
+        self.serializer_duration = 0.0
+
+
+_timings = _RequestTimings()
+
+
+def _time_serializer(function):
+    @wraps(function)
+    def timed(*args, **kwargs):
+        # Only the outermost call is timed: Serializer.data calls
+        # BaseSerializer.data, and nested serializers run inside it
+        if not _timings.active or _timings.serializing:
+            return function(*args, **kwargs)
+        _timings.serializing = True
+        started = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _timings.serializer_duration += time.perf_counter() - started
+            _timings.serializing = False
+    timed.metrics_timed = True
+    return timed
+
+
+def install_serializer_timing():
+    """Time the data and is_valid of every DRF serializer (idempotent)"""
+    for cls in (serializers.BaseSerializer, serializers.Serializer,
+                serializers.ListSerializer):
+        data = cls.__dict__.get('data')
+        if isinstance(data, property) and not getattr(data.fget, 'metrics_timed', False):
+            cls.data = property(_time_serializer(data.fget))
+        is_valid = cls.__dict__.get('is_valid')
+        if is_valid is not None and not getattr(is_valid, 'metrics_timed', False):
+            cls.is_valid = _time_serializer(is_valid)
+
+
+class MetricsMiddleware:
+    """Record the count, status and timings of every request by route"""
+
+    def __init__(self, get_response):
+        if not get_metrics_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        install_serializer_timing()
+
+    def __call__(self, request):
+        _timings.start()
+        queries = QueryRecorder(shapes=False)
+        started = time.perf_counter()
+        try:
+            with queries.record():
+                response = self.get_response(request)
+        finally:
+            _timings.active = False
+        duration = time.perf_counter() - started
+
+        match = request.resolver_match
+        registry.record_request(
+            match.view_name if match else UNMATCHED_ROUTE,
+            request.method, str(response.status_code), duration,
+            queries.duration, queries.count, _timings.serializer_duration)
+        return response
+
+
+def metrics_view(request):
+    """
+    Metrics of all worker processes in the Prometheus text format.
+
+    With METRICS_TOKEN set, scrapers must send Authorization: Bearer <token>;
+    without it only logged-in staff users may read them.
+    """
+    token = get_metrics_token()
+    if token:
+        allowed = hmac.compare_digest(
+            request.headers.get('Authorization', '').encode(),
+            f'Bearer {token}'.encode())
+    else:
+        allowed = request.user.is_authenticated and request.user.is_staff
+    if not allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(collect()),
+                        content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,185 @@
+"""
+Versioned response cache for read-only API views
+
+Cached GET responses are keyed by path, normalized query parameters, the
+caller's scope and the current version of every model the view depends on.
+Writes never delete cache entries: the post_save/post_delete signals (and
+the bulk write paths that bypass signals) bump the version of the changed
+model, so older entries are no longer addressed and expire on their own.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from .stats import CounterStatsAPIView, OutcomeCounters, ratio
+
+
+KEY_PREFIX = 'rc'
+
+
+def get_cache():
+    """Cache backend used for responses, versions and stats"""
+    return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+
+# Hits and misses per view decorated with cache_response
+counters = OutcomeCounters(get_cache, KEY_PREFIX, ('hits', 'misses'))
+
+
+def is_enabled():
+    return getattr(settings, 'RESPONSE_CACHE_ENABLED', True)
+
+
+def get_timeout():
+    """Lifetime in seconds of a cached response"""
+    return getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300)
+
+
+def _version_key(label):
+    return f'{KEY_PREFIX}:version:{label}'
+
+
+def _seed_version():
+    # Seeding with a timestamp means a version that was evicted never comes
+    # back with a value an older entry was stored under
+    return time.time_ns()
+
+
+def get_versions(labels):
+    """Return {model label: version} for the given model labels"""
+    cache = get_cache()
+    keys = {label: _version_key(label) for label in labels}
+    found = cache.get_many(list(keys.values()))
+
+    versions = {}
+    for label, key in keys.items():
+        version = found.get(key)
+        if version is None:
+            cache.add(key, _seed_version(), timeout=None)
+            version = cache.get(key)
+        versions[label] = version
+    return versions
+
+
+def bump_versions(*labels):
+    """Invalidate every cached response depending on the given models"""
+    cache = get_cache()
+    for label in labels:
+        key = _version_key(label)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _seed_version(), timeout=None)
+
+
+def invalidate_models(*labels):
+    """
+    Bump the versions of the given models once the current transaction commits.
+
+    Bumping before the commit would let a concurrent reader cache the old
+    rows under the new version.
+    """
+    labels = tuple(label.lower() for label in labels)
+    transaction.on_commit(lambda: bump_versions(*labels))
+
+
+def get_cache_scope(user, per_user=True):
+    """
+    Scope separating callers that may see different data.
+
+    Admins share one scope; other users get their own scope unless the view
+    only varies by role (per_user=False).
+    """
+    role = getattr(user, 'role', '')
+    scope = f'role:{role}'
+    if user.is_superuser:
+        scope += ':superuser'
+    elif per_user and role != 'admin':
+        scope = f'user:{user.pk}'
+    return scope
+
+
+def build_cache_key(request, labels, per_user=True):
+    """Cache key for a request against the current model versions"""
+    params = sorted(
+        (name, sorted(values)) for name, values in request.query_params.lists())
+    versions = get_versions(labels)
+    raw = repr((
+        request.path,
+        params,
+        get_cache_scope(request.user, per_user),
+        sorted(versions.items()),
+    ))
+    digest = hashlib.sha256(raw.encode('utf-8')).hexdigest()
+    return f'{KEY_PREFIX}:response:{digest}'
+
+
+def cache_response(*models, per_user=True, timeout=None):
+    """
+    Cache successful responses of an APIView get() method.
+
+    models are 'app_label.ModelName' labels whose changes invalidate the
+    response. Responses carry an X-Cache: HIT/MISS header.
+    """
+    labels = tuple(label.lower() for label in models)
+
+    def decorator(method):
+        view_name = method.__qualname__.split('.')[0]
+        counters.register(view_name)
+
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            if not is_enabled():
+                return method(self, request, *args, **kwargs)
+
+            cache = get_cache()
+            key = build_cache_key(request, labels, per_user)
+            cached = cache.get(key)
+            if cached is not None:
+                counters.record(view_name, 'hits')
+                data, status_code = cached
+                response = Response(data, status=status_code)
+                response['X-Cache'] = 'HIT'
+                return response
+
+            counters.record(view_name, 'misses')
+            response = method(self, request, *args, **kwargs)
+            if isinstance(response, Response) and response.status_code == status.HTTP_200_OK:
+                cache.set(key, (response.data, response.status_code),
+                          timeout if timeout is not None else get_timeout())
+                response['X-Cache'] = 'MISS'
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def get_cache_stats():
+    """Hit/miss counts and hit rate per cached view and in total"""
+    def summarize(hits, misses):
+        return {'hits': hits, 'misses': misses, 'hit_rate': ratio(hits, hits + misses)}
+
+    views = {name: summarize(counts['hits'], counts['misses'])
+             for name, counts in counters.counts().items()}
+    total_hits = sum(view['hits'] for view in views.values())
+    total_misses = sum(view['misses'] for view in views.values())
+    return {**summarize(total_hits, total_misses), 'views': views}
+
+
+class CacheStatsAPIView(CounterStatsAPIView):
+    """Response cache hit-rate statistics (admin only); DELETE resets them"""
+    counters = counters
+
+    def get_report(self, request):
+        return {
+            'enabled': is_enabled(),
+            'timeout': get_timeout(),
+            **get_cache_stats(),
+        }
@@ -56,8 +56,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'student_course_management.metrics.MetricsMiddleware',
+    'student_course_management.tracing.TracingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'student_course_management.sql_metrics.QueryInstrumentationMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -103,6 +106,35 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Defaults to a per-process locmem cache; point CACHE_BACKEND at
+# django.core.cache.backends.filebased.FileBasedCache (or a shared backend)
+# so every worker sees the same cached responses and version counters.
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND',
+                          default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='scms-default'),
+        'TIMEOUT': config('CACHE_TIMEOUT', default=300, cast=int),
+        'OPTIONS': {
+            'MAX_ENTRIES': config('CACHE_MAX_ENTRIES', default=5000, cast=int),
+        },
+    }
+}
+
+# Response cache for read-only API views (see response_cache.py)
+RESPONSE_CACHE_ENABLED = config('RESPONSE_CACHE_ENABLED', default=True, cast=bool)
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = config('RESPONSE_CACHE_TIMEOUT', default=300, cast=int)
+
+# Cache holding the throttle buckets (see throttling.py). It must be shared
+# by every worker process: with the per-process locmem default each worker
+# throttles on its own, so the THROTTLE_*_RATE limits are multiplied by the
+# number of workers. Set CACHE_BACKEND to a shared backend in production.
+THROTTLE_CACHE_ALIAS = 'default'
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -152,7 +184,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.tokens.ClaimsJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -167,11 +199,25 @@ REST_FRAMEWORK = {
         'rest_framework.parsers.MultiPartParser',
         'rest_framework.parsers.FormParser',
     ],
+    # Token bucket sizes and refill rates of the throttles in
+    # student_course_management.throttling ('N/period': bursts of N, N per period)
+    'DEFAULT_THROTTLE_RATES': {
+        'login': config('THROTTLE_LOGIN_RATE', default='20/min'),
+        'login_account': config('THROTTLE_LOGIN_ACCOUNT_RATE', default='5/min'),
+        'register': config('THROTTLE_REGISTER_RATE', default='10/hour'),
+        'enroll': config('THROTTLE_ENROLL_RATE', default='30/min'),
+    },
+    # Reverse proxies in front of the app. Throttles take the client IP from
+    # that many X-Forwarded-For entries; with 0 the header (which clients
+    # can forge) is ignored and REMOTE_ADDR is used
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
 }
 
 # Simple JWT Configuration
 SIMPLE_JWT = {
-    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
+    # Access tokens carry the user's claims (see authentication.tokens), so
+    # a short lifetime bounds how long a role or password change takes to apply
+    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=config('JWT_ACCESS_TOKEN_MINUTES', default=15, cast=int)),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
@@ -194,6 +240,7 @@ SIMPLE_JWT = {
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
     'TOKEN_USER_CLASS': 'rest_framework_simplejwt.models.TokenUser',
+    'TOKEN_REFRESH_SERIALIZER': 'authentication.serializers.ClaimsTokenRefreshSerializer',
 
     'JTI_CLAIM': 'jti',
 
@@ -217,3 +264,79 @@ CORS_ALLOW_ALL_ORIGINS = True
 
 # Custom User Model
 AUTH_USER_MODEL = 'authentication.User'
+
+# Number of counter shard rows per course that enrollment writes are spread
+# across (1 disables sharding and updates the course row directly)
+COURSE_COUNTER_SHARDS = config('COURSE_COUNTER_SHARDS', default=8, cast=int)
+
+# Number of student numbers each worker reserves per sequence round trip
+STUDENT_NUMBER_BLOCK_SIZE = config('STUDENT_NUMBER_BLOCK_SIZE', default=20, cast=int)
+
+# Bulk student import limits and password hashing pool size
+STUDENT_BULK_MAX_ROWS = config('STUDENT_BULK_MAX_ROWS', default=5000, cast=int)
+STUDENT_BULK_CHUNK_SIZE = config('STUDENT_BULK_CHUNK_SIZE', default=500, cast=int)
+PASSWORD_HASH_WORKERS = config('PASSWORD_HASH_WORKERS', default=4, cast=int)
+
+# Rows fetched per query when streaming CSV/NDJSON exports
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', default=2000, cast=int)
+
+# Retries for transactions aborted by a deadlock (MySQL 1213/1205) and the
+# base of their exponential backoff in seconds
+DEADLOCK_RETRY_ATTEMPTS = config('DEADLOCK_RETRY_ATTEMPTS', default=3, cast=int)
+DEADLOCK_RETRY_BACKOFF = config('DEADLOCK_RETRY_BACKOFF', default=0.05, cast=float)
+
+# Queued enrollment for courses in rush mode: requests claimed per worker
+# transaction, worker threads and the idle poll interval in seconds
+ENROLLMENT_QUEUE_BATCH_SIZE = config('ENROLLMENT_QUEUE_BATCH_SIZE', default=200, cast=int)
+ENROLLMENT_QUEUE_WORKERS = config('ENROLLMENT_QUEUE_WORKERS', default=4, cast=int)
+ENROLLMENT_QUEUE_POLL_INTERVAL = config('ENROLLMENT_QUEUE_POLL_INTERVAL', default=1.0, cast=float)
+
+# Enrollment rows fetched per cursor round trip when computing GPAs
+ACADEMIC_SUMMARY_CHUNK_SIZE = config('ACADEMIC_SUMMARY_CHUNK_SIZE', default=50000, cast=int)
+
+# Seconds the enrollment trend watermark trails each refresh (covers
+# transactions still open when it starts) and months rebuilt per
+# transaction by a backfill
+ENROLLMENT_TRENDS_WATERMARK_LAG = config('ENROLLMENT_TRENDS_WATERMARK_LAG', default=300, cast=int)
+ENROLLMENT_TRENDS_CHUNK_MONTHS = config('ENROLLMENT_TRENDS_CHUNK_MONTHS', default=12, cast=int)
+
+# Largest number of GET sub-requests accepted by POST /api/batch/
+BATCH_MAX_REQUESTS = config('BATCH_MAX_REQUESTS', default=20, cast=int)
+
+# Refresh token blacklist: revoked ids the in-process Bloom filter is sized
+# for, its false positive rate and seconds between syncs with the database
+TOKEN_BLACKLIST_FILTER_CAPACITY = config('TOKEN_BLACKLIST_FILTER_CAPACITY', default=1000000, cast=int)
+TOKEN_BLACKLIST_FILTER_ERROR_RATE = config('TOKEN_BLACKLIST_FILTER_ERROR_RATE', default=0.001, cast=float)
+TOKEN_BLACKLIST_SYNC_INTERVAL = config('TOKEN_BLACKLIST_SYNC_INTERVAL', default=5.0, cast=float)
+
+# SQL instrumentation: fraction of requests whose queries are counted and
+# reported in the X-DB-Queries / Server-Timing headers (0 disables it), and
+# the query count, SQL time and repeats of one query shape above which a
+# request is logged
+SQL_METRICS_SAMPLE_RATE = config('SQL_METRICS_SAMPLE_RATE', default=1.0 if DEBUG else 0.0, cast=float)
+SQL_METRICS_MAX_QUERIES = config('SQL_METRICS_MAX_QUERIES', default=50, cast=int)
+SQL_METRICS_MAX_DURATION_MS = config('SQL_METRICS_MAX_DURATION_MS', default=500, cast=float)
+SQL_METRICS_REPEAT_THRESHOLD = config('SQL_METRICS_REPEAT_THRESHOLD', default=10, cast=int)
+
+# Prometheus metrics served at /metrics. Each worker process writes its
+# samples to a file in METRICS_DIR (default <BASE_DIR>/metrics, shared by
+# the workers, cleared on deploy). Scrapers must send METRICS_TOKEN as a
+# bearer token; without a token only logged-in staff users can read them
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_DIR = config('METRICS_DIR', default='')
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Request tracing: fraction of requests traced, header forcing a trace when
+# it carries TRACING_TOKEN (ignored while the token is empty), JSON-lines
+# file the traces are appended to, its size before rotation to <path>.1 and
+# the most spans kept per trace
+TRACING_SAMPLE_RATE = config('TRACING_SAMPLE_RATE', default=0.0, cast=float)
+TRACING_HEADER = config('TRACING_HEADER', default='X-Trace')
+TRACING_TOKEN = config('TRACING_TOKEN', default='')
+TRACING_EXPORT_PATH = config('TRACING_EXPORT_PATH', default='')
+TRACING_EXPORT_MAX_BYTES = config('TRACING_EXPORT_MAX_BYTES', default=100 * 1024 * 1024, cast=int)
+TRACING_MAX_SPANS = config('TRACING_MAX_SPANS', default=1000, cast=int)
+
+# Points METRICS_DIR and TRACING_EXPORT_PATH at a temporary directory while
+# the tests run
+TEST_RUNNER = 'student_course_management.test_runner.TestRunner'
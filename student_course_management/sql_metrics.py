@@ -0,0 +1,190 @@
+"""
+Per-request SQL instrumentation for Student Course Management System
+
+Every layer that looks at the queries of a request (this middleware, the
+Prometheus metrics and the tracing spans) goes through one execute wrapper:
+the outermost layer installs it on the database connections, each query is
+timed once and the measurement is handed to every active QueryRecorder and
+listener. The layers therefore agree on the count and time of the queries
+they share, and nesting them costs no extra wrappers.
+
+QueryRecorder counts the queries, their total time and how often each query
+shape (the SQL with its parameters left out and IN lists collapsed) ran.
+The middleware records sampled requests, reports the totals in the
+X-DB-Queries and Server-Timing headers and logs requests over the query,
+time or repeated-shape thresholds; a shape repeated many times is usually
+a per-row (N+1) lookup. query_budget() applies the same recorder in tests.
+
+Unsampled requests only pay for one random number. Queries run while a
+streaming response is consumed happen after the middleware returns and
+are not counted.
+"""
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST = re.compile(r'\((?:%s, )+%s\)')
+
+
+def get_sample_rate():
+    """Fraction of requests recorded (0 disables the middleware)"""
+    return getattr(settings, 'SQL_METRICS_SAMPLE_RATE', 0.0)
+
+
+def get_thresholds():
+    """(queries, milliseconds, repeats of one shape) above which a request is logged"""
+    return (getattr(settings, 'SQL_METRICS_MAX_QUERIES', 50),
+            getattr(settings, 'SQL_METRICS_MAX_DURATION_MS', 500),
+            getattr(settings, 'SQL_METRICS_REPEAT_THRESHOLD', 10))
+
+
+def query_shape(sql):
+    """SQL of a query with variable-length IN lists collapsed"""
+    return _IN_LIST.sub('(...)', sql)
+
+
+class _ActiveTiming(threading.local):
+    """Recorders and listeners fed by the execute wrapper on this thread"""
+    installed = False
+    recorders = ()
+    listeners = ()
+
+
+_active = _ActiveTiming()
+
+
+def _time_query(execute, sql, params, many, context):
+    """The single execute wrapper: time a query once for every consumer"""
+    error = None
+    started = time.perf_counter_ns()
+    try:
+        return execute(sql, params, many, context)
+    except Exception as exc:
+        error = exc
+        raise
+    finally:
+        ended = time.perf_counter_ns()
+        for recorder in _active.recorders:
+            recorder.add(sql, (ended - started) / 1e9)
+        for listener in _active.listeners:
+            listener(sql, many, context, started, ended, error)
+
+
+@contextmanager
+def time_queries(recorder=None, listener=None):
+    """
+    Feed the queries run on this thread in the block to recorder and/or
+    listener.
+
+    listener(sql, many, context, started, ended, error) gets the
+    perf_counter_ns() bounds of each query. Only the outermost block installs
+    the execute wrapper; nested blocks add themselves to the running one.
+    """
+    saved = (_active.recorders, _active.listeners)
+    if recorder is not None:
+        _active.recorders += (recorder,)
+    if listener is not None:
+        _active.listeners += (listener,)
+    try:
+        if _active.installed:
+            yield
+        else:
+            _active.installed = True
+            try:
+                with ExitStack() as stack:
+                    for connection in connections.all():
+                        stack.enter_context(connection.execute_wrapper(_time_query))
+                    yield
+            finally:
+                _active.installed = False
+    finally:
+        _active.recorders, _active.listeners = saved
+
+
+class QueryRecorder:
+    """Count, time and (with shapes) shapes of the queries run while recording"""
+
+    def __init__(self, shapes=True):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter() if shapes else None
+
+    def add(self, sql, duration):
+        self.count += 1
+        self.duration += duration
+        if self.shapes is not None:
+            self.shapes[query_shape(sql)] += 1
+
+    def record(self):
+        """Record the queries of every database connection of this thread"""
+        return time_queries(self)
+
+    def repeated(self, threshold):
+        """(shape, count) of the shapes run at least threshold times, most frequent first"""
+        return [(shape, count) for shape, count in self.shapes.most_common()
+                if count >= threshold]
+
+    def report(self, threshold=2, width=200):
+        """Readable summary of the recording and its repeated shapes"""
+        lines = [f'{self.count} queries in {self.duration * 1000:.1f}ms']
+        lines.extend(f'  {count}x {shape[:width]}'
+                     for shape, count in self.repeated(threshold))
+        return '\n'.join(lines)
+
+
+class QueryInstrumentationMiddleware:
+    """Report the SQL of sampled requests in headers and log slow or chatty ones"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rate = get_sample_rate()
+        if rate <= 0 or (rate < 1 and random.random() >= rate):
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        with recorder.record():
+            response = self.get_response(request)
+
+        duration_ms = recorder.duration * 1000
+        response['X-DB-Queries'] = str(recorder.count)
+        timing = f'db;dur={duration_ms:.1f};desc="{recorder.count} queries"'
+        if response.has_header('Server-Timing'):
+            timing = f"{response['Server-Timing']}, {timing}"
+        response['Server-Timing'] = timing
+
+        max_queries, max_duration_ms, repeat_threshold = get_thresholds()
+        repeated = recorder.repeated(repeat_threshold)
+        if recorder.count > max_queries or duration_ms > max_duration_ms or repeated:
+            logger.warning('%s %s ran %s', request.method, request.path,
+                           recorder.report(repeat_threshold))
+        return response
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def query_budget(maximum, label='block'):
+    """
+    Fail with QueryBudgetExceeded when the block runs more than maximum
+    queries; the error lists the repeated query shapes.
+    """
+    recorder = QueryRecorder()
+    with recorder.record():
+        yield recorder
+    if recorder.count > maximum:
+        raise QueryBudgetExceeded(
+            f'{label} exceeded its budget of {maximum} queries: {recorder.report()}')
@@ -0,0 +1,89 @@
+"""
+Cache-backed outcome counters and their admin stats endpoint
+
+The response cache counts hits and misses per view and the throttles count
+allowed and throttled requests per scope. Both keep the counts in their
+cache, one integer per (name, outcome), so every worker process adds to the
+same totals without touching the database.
+"""
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from courses.permissions import IsAdminUser
+
+
+def ratio(part, total):
+    """part / total rounded for reports, or None without any total"""
+    return round(part / total, 4) if total else None
+
+
+class OutcomeCounters:
+    """
+    Counters of outcomes per name, e.g. hits and misses per cached view.
+
+    get_cache is called on every use, so the backend follows the settings.
+    Names are registered at import time; only registered names are reported
+    and reset.
+    """
+
+    def __init__(self, get_cache, prefix, outcomes):
+        self.get_cache = get_cache
+        self.prefix = prefix
+        self.outcomes = tuple(outcomes)
+        self.names = set()
+
+    def register(self, name):
+        self.names.add(name)
+
+    def _key(self, name, outcome):
+        return f'{self.prefix}:stats:{name}:{outcome}'
+
+    def _keys(self):
+        return [self._key(name, outcome)
+                for name in self.names for outcome in self.outcomes]
+
+    def record(self, name, outcome):
+        cache = self.get_cache()
+        key = self._key(name, outcome)
+        try:
+            cache.incr(key)
+        except ValueError:
+            if not cache.add(key, 1, timeout=None):
+                cache.incr(key)
+
+    def counts(self):
+        """{name: {outcome: count}} of the registered names, sorted by name"""
+        found = self.get_cache().get_many(self._keys())
+        return {
+            name: {outcome: found.get(self._key(name, outcome), 0)
+                   for outcome in self.outcomes}
+            for name in sorted(self.names)
+        }
+
+    def reset(self):
+        self.get_cache().delete_many(self._keys())
+
+
+class CounterStatsAPIView(APIView):
+    """
+    Report (GET) or reset (DELETE) a set of outcome counters (admin only).
+
+    Subclasses set counters and build the report in get_report().
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAdminUser]
+    counters = None
+
+    def get_report(self, request):
+        raise NotImplementedError
+
+    def get(self, request):
+        return Response({
+            'backend': self.counters.get_cache().__class__.__name__,
+            **self.get_report(request),
+        }, status=status.HTTP_200_OK)
+
+    def delete(self, request):
+        """Reset the counters"""
+        self.counters.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,29 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Test runner keeping the metrics and trace files of the test run apart
+    from those of a server running on the same machine.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._files_dir = tempfile.mkdtemp(prefix='scms-tests-')
+        self._saved_settings = {
+            name: getattr(settings, name, None)
+            for name in ('METRICS_DIR', 'TRACING_EXPORT_PATH')
+        }
+        settings.METRICS_DIR = os.path.join(self._files_dir, 'metrics')
+        settings.TRACING_EXPORT_PATH = os.path.join(self._files_dir, 'traces.jsonl')
+
+    def teardown_test_environment(self, **kwargs):
+        for name, value in self._saved_settings.items():
+            setattr(settings, name, value)
+        shutil.rmtree(self._files_dir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
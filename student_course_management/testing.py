@@ -0,0 +1,118 @@
+"""
+Query budget test helpers for Student Course Management System
+
+QueryBudgetMixin checks every endpoint of an app's URLconf against a
+declared maximum number of SQL queries, run against a fixture with several
+students per course so that per-row (N+1) queries push an endpoint over
+its budget.
+
+Only test modules import this module; it is not loaded by the application.
+"""
+import random
+from collections import namedtuple
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.urls import URLPattern, reverse
+from rest_framework.test import APIClient
+
+from courses.models import Course
+from students.models import Enrollment, Student
+from .sql_metrics import query_budget
+
+
+User = get_user_model()
+
+
+class QueryBudget(namedtuple('QueryBudget', 'maximum method user kwargs data')):
+    """
+    Most queries one request to an endpoint may run.
+
+    user is 'admin' or 'student' (the fixture's first student), kwargs maps
+    URL parameters to fixture attribute names and data is the request body.
+    """
+    __slots__ = ()
+
+    def __new__(cls, maximum, method='get', user='admin', kwargs=None, data=None):
+        return super().__new__(cls, maximum, method, user, kwargs or {}, data)
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin running one request per endpoint of urls_module within
+    its query budget.
+
+    Subclasses set urls_module and budgets ({URL name: QueryBudget}); every
+    named URL must have a budget. Data callables are called with the test
+    case and may also prepare state for the request; each request runs on a
+    cold response cache and is rolled back with that state. The fixture and
+    each request run with a fixed random seed, so sharded counter writes
+    repeat the same queries on every run.
+    """
+    urls_module = None
+    budgets = {}
+
+    # Fixture size: student i is enrolled in the first i % COURSES + 1 courses
+    STUDENTS = 8
+    COURSES = 3
+
+    @classmethod
+    def setUpTestData(cls):
+        # The fixture's enrollments also write to random counter and
+        # statistics shards; which shard rows exist decides whether a later
+        # write is an UPDATE or an INSERT
+        random.seed(cls.__name__)
+        cls.admin = User.objects.create_user(
+            username='budget-admin', password='x', role='admin',
+            is_superuser=True, is_staff=True)
+        cls.courses = [
+            Course.objects.create(course_name=f'Budget {index}', course_code=f'QB{index}',
+                                  course_duration=12, credits=3)
+            for index in range(cls.COURSES)
+        ]
+        cls.students = []
+        for index in range(cls.STUDENTS):
+            user = User.objects.create_user(
+                username=f'budget-{index}', password='x', role='student',
+                first_name='Budget', last_name=str(index),
+                email=f'budget-{index}@example.com')
+            student = Student.objects.get(user=user)
+            for course in cls.courses[:index % cls.COURSES + 1]:
+                Enrollment.objects.enroll(student.pk, course.pk)
+            cls.students.append(student)
+        cls.student = cls.students[0]
+        cls.course = cls.courses[0]
+        # A course the first student is not enrolled in
+        cls.other_course = cls.courses[-1]
+
+    def url_names(self):
+        return {pattern.name for pattern in self.urls_module.urlpatterns
+                if isinstance(pattern, URLPattern) and pattern.name}
+
+    def test_every_endpoint_has_a_budget(self):
+        self.assertEqual(self.url_names() - set(self.budgets), set())
+
+    def test_endpoints_stay_within_budget(self):
+        app_name = self.urls_module.app_name
+        for name, budget in sorted(self.budgets.items()):
+            with self.subTest(endpoint=name):
+                client = APIClient()
+                client.force_authenticate(
+                    self.admin if budget.user == 'admin' else self.student.user)
+                url = reverse(f'{app_name}:{name}', kwargs={
+                    param: getattr(self, attribute).pk
+                    for param, attribute in budget.kwargs.items()})
+                cache.clear()
+                # Counter and statistics writes pick a random shard, and a
+                # shard row that does not exist yet costs an extra INSERT
+                random.seed(name)
+
+                with transaction.atomic():
+                    data = budget.data(self) if callable(budget.data) else budget.data
+                    with query_budget(budget.maximum, f'{budget.method.upper()} {url}'):
+                        response = getattr(client, budget.method)(url, data, format='json')
+                        if response.streaming:
+                            b''.join(response.streaming_content)
+                    transaction.set_rollback(True)
+                self.assertLess(response.status_code, 400, response)
@@ -0,0 +1,425 @@
+import json
+import multiprocessing
+import os
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from courses.models import Course
+from courses.views import ActiveCoursesAPIView
+from . import metrics, response_cache, sql_metrics, throttling
+
+User = get_user_model()
+
+
+def client_for(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+class BatchTests(TestCase):
+    """Composite GET requests through /api/batch/"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            username='batch-admin', password='x', role='admin',
+            is_superuser=True, is_staff=True)
+        cls.student_user = User.objects.create_user(
+            username='batch-student', password='x', role='student',
+            email='batch-student@example.com')
+        Course.objects.create(course_name='Batching', course_code='BT101',
+                              course_duration=12, credits=3)
+
+    def batch(self, requests, user=None):
+        return client_for(user or self.admin).post(
+            '/api/batch/', {'requests': requests}, format='json')
+
+    def statuses(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [entry['status'] for entry in response.data['responses']]
+
+    def test_runs_sub_requests_in_order(self):
+        response = self.batch([{'id': 'courses', 'path': '/api/courses/'},
+                               '/api/courses/active/'])
+
+        self.assertEqual(self.statuses(response), [200, 200])
+        self.assertEqual([entry['id'] for entry in response.data['responses']],
+                         ['courses', 1])
+        self.assertEqual(response.data['responses'][1]['body']['count'], 1)
+
+    @override_settings(BATCH_MAX_REQUESTS=2)
+    def test_rejects_batches_over_the_size_cap(self):
+        response = self.batch(['/api/courses/'] * 3)
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_rejects_nested_batches(self):
+        self.assertEqual(self.statuses(self.batch(['/api/batch/'])), [400])
+
+    def test_rejects_paths_outside_the_api(self):
+        self.assertEqual(self.statuses(self.batch(['/admin/', '/metrics', '/'])),
+                         [400, 400, 400])
+
+    def test_checks_permissions_per_sub_request(self):
+        response = self.batch(['/api/throttle/stats/', '/api/courses/'],
+                              user=self.student_user)
+
+        self.assertEqual(self.statuses(response), [403, 200])
+
+    def test_failing_sub_request_does_not_fail_the_batch(self):
+        with mock.patch.object(ActiveCoursesAPIView, 'get', side_effect=RuntimeError), \
+                self.assertLogs('student_course_management.batch', 'ERROR'):
+            response = self.batch(['/api/courses/active/', '/api/courses/'])
+
+        self.assertEqual(self.statuses(response), [500, 200])
+
+    def test_rejects_non_get_requests(self):
+        response = self.batch([{'path': '/api/courses/', 'method': 'POST'}])
+
+        self.assertEqual(response.status_code, 400)
+
+
+class TracingTests(TestCase):
+    """On-demand traces and the trace export file"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'traces.jsonl')
+        overrides = override_settings(TRACING_SAMPLE_RATE=0.0, TRACING_TOKEN='secret',
+                                      TRACING_EXPORT_PATH=self.path)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def get(self, trace_header=None):
+        headers = {'X-Trace': trace_header} if trace_header else {}
+        return self.client.get('/api/courses/active/', headers=headers)
+
+    def exported_lines(self, path=None):
+        with open(path or self.path, encoding='utf-8') as export:
+            return export.read().splitlines()
+
+    def test_header_without_the_token_is_ignored(self):
+        response = self.get('1')
+
+        self.assertNotIn('X-Trace-Id', response)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_header_with_the_token_forces_a_trace(self):
+        response = self.get('secret')
+
+        trace = json.loads(self.exported_lines()[0])
+        spans = trace['resourceSpans'][0]['scopeSpans'][0]['spans']
+        self.assertEqual({span['traceId'] for span in spans}, {response['X-Trace-Id']})
+        self.assertIn('GET courses:active_courses', [span['name'] for span in spans])
+
+    @override_settings(TRACING_TOKEN='')
+    def test_header_is_ignored_without_a_configured_token(self):
+        self.assertNotIn('X-Trace-Id', self.get(''))
+        self.assertNotIn('X-Trace-Id', self.get('1'))
+
+    @override_settings(TRACING_EXPORT_MAX_BYTES=1)
+    def test_export_file_is_rotated_past_its_size_limit(self):
+        first = self.get('secret')['X-Trace-Id']
+        second = self.get('secret')['X-Trace-Id']
+
+        # Each trace overflows the limit, so the second replaced the first
+        self.assertFalse(os.path.exists(self.path))
+        rotated = self.exported_lines(self.path + '.1')
+        self.assertEqual(len(rotated), 1)
+        self.assertIn(second, rotated[0])
+        self.assertNotIn(first, rotated[0])
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class ConditionalGetTests(TestCase):
+    """ETag validation of GET /api/courses/"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='conditional-student', password='x', role='student',
+            email='conditional-student@example.com')
+        cls.courses = [
+            Course.objects.create(course_name=f'Conditional {index}',
+                                  course_code=f'CG10{index}', course_duration=12, credits=3)
+            for index in range(2)
+        ]
+
+    def get(self, **headers):
+        return client_for(self.user).get('/api/courses/', headers=headers)
+
+    def test_matching_etag_gets_304(self):
+        etag = self.get()['ETag']
+
+        response = self.get(**{'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_delete_changes_the_etag(self):
+        etag = self.get()['ETag']
+
+        self.courses[1].delete()
+        response = self.get(**{'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['count'], 1)
+
+    def test_if_modified_since_alone_is_ignored(self):
+        response = self.get()
+        self.assertNotIn('Last-Modified', response)
+
+        # A delete leaves MAX(updated_at) unchanged, so a date cannot tell
+        self.courses[1].delete()
+        response = self.get(**{'If-Modified-Since': 'Fri, 01 Jan 2100 00:00:00 GMT'})
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_if_match_gets_412_unless_it_is_a_wildcard(self):
+        etag = self.get()['ETag']
+
+        # The ETags are weak and If-Match compares strongly, so only *
+        # passes, stale or not
+        self.courses[1].delete()
+        self.assertEqual(self.get(**{'If-Match': etag}).status_code, 412)
+        self.assertEqual(self.get(**{'If-Match': '*'}).status_code, 200)
+
+    def test_admin_action_changes_the_etag(self):
+        # Admins list inactive courses too, so only updated_at can tell
+        admin = User.objects.create_user(
+            username='conditional-admin', password='x', role='admin',
+            is_superuser=True, is_staff=True)
+        etag = client_for(admin).get('/api/courses/')['ETag']
+
+        self.client.force_login(admin)
+        self.client.post('/admin/courses/course/', {
+            'action': 'deactivate_courses', '_selected_action': [str(self.courses[0].pk)]})
+        response = client_for(admin).get('/api/courses/', headers={'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            {course['course_code']: course['is_active'] for course in response.data['results']},
+            {'CG100': False, 'CG101': True})
+
+
+class LoginThrottleTests(TestCase):
+    """Token buckets on /api/auth/login/"""
+
+    def setUp(self):
+        throttling.get_cache().clear()
+        self.addCleanup(throttling.get_cache().clear)
+        rates = {**settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'],
+                 'login': '5/min', 'login_account': '2/min'}
+        overrides = override_settings(REST_FRAMEWORK={
+            **settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': rates})
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        User.objects.create_user(username='victim', password='right-password',
+                                 role='student', email='victim@example.com')
+
+    def login(self, ip, username='victim', password='wrong-password'):
+        return self.client.post('/api/auth/login/', {'username': username, 'password': password},
+                                REMOTE_ADDR=ip)
+
+    def test_guessing_one_account_is_throttled_per_client(self):
+        self.assertEqual([self.login('10.0.0.1').status_code for _ in range(3)],
+                         [400, 400, 429])
+        self.assertIn('Retry-After', self.login('10.0.0.1'))
+
+    def test_guessing_does_not_lock_the_account_out_for_other_clients(self):
+        for _ in range(3):
+            self.login('10.0.0.1')
+
+        response = self.login('10.0.0.2', password='right-password')
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_each_client_ip_is_bounded_across_usernames(self):
+        statuses = [self.login('10.0.0.1', username=f'user{number}').status_code
+                    for number in range(6)]
+
+        self.assertEqual(statuses, [400] * 5 + [429])
+
+    def test_stats_report_and_reset_the_decisions(self):
+        for _ in range(3):
+            self.login('10.0.0.1')
+        admin = client_for(User.objects.create_user(
+            username='throttle-admin', password='x', role='admin',
+            is_superuser=True, is_staff=True))
+
+        data = admin.get('/api/throttle/stats/',
+                         {'scope': 'login_account', 'ident': 'username:victim:ip:10.0.0.1'}).data
+        self.assertEqual(data['scopes']['login_account'],
+                         {'rate': '2/min', 'allowed': 2, 'throttled': 1,
+                          'throttled_rate': 0.3333})
+        self.assertLess(data['bucket']['tokens'], 1)
+        self.assertEqual(admin.get('/api/throttle/stats/',
+                                   {'scope': 'unknown', 'ident': 'ip:1'}).status_code, 400)
+
+        self.assertEqual(admin.delete('/api/throttle/stats/').status_code, 204)
+        self.assertEqual(admin.get('/api/throttle/stats/').data['scopes']['login']['allowed'], 0)
+
+
+class CacheStatsTests(TestCase):
+    """Hit and miss counters of the response cache"""
+
+    def setUp(self):
+        response_cache.get_cache().clear()
+        self.addCleanup(response_cache.get_cache().clear)
+        self.admin = client_for(User.objects.create_user(
+            username='cache-admin', password='x', role='admin',
+            is_superuser=True, is_staff=True))
+
+    def test_stats_report_and_reset_hits_and_misses(self):
+        self.assertEqual(self.admin.get('/api/courses/active/')['X-Cache'], 'MISS')
+        self.assertEqual(self.admin.get('/api/courses/active/')['X-Cache'], 'HIT')
+
+        data = self.admin.get('/api/cache/stats/').data
+        self.assertEqual(data['views']['ActiveCoursesAPIView'],
+                         {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+        self.assertEqual((data['hits'], data['misses']), (1, 1))
+
+        self.assertEqual(self.admin.delete('/api/cache/stats/').status_code, 204)
+        self.assertEqual(self.admin.get('/api/cache/stats/').data['hits'], 0)
+
+
+def _record(route):
+    """Record one request in a separate process (run through multiprocessing)"""
+    metrics.registry.record_request(route, 'GET', '200', 0.02, 0.01, 3, 0.005)
+
+
+class MetricsTests(TestCase):
+    """Metrics registry, the merge of worker files and GET /metrics"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        overrides = override_settings(METRICS_DIR=directory.name, METRICS_TOKEN='')
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def sample(self, name, *labels):
+        return metrics.collect().get(metrics._sample_key(name, labels), 0)
+
+    def test_registry_records_counters_and_histograms(self):
+        metrics.registry.record_request('courses:active_courses', 'GET', '200',
+                                        0.003, 0.001, 2, 0.0)
+        metrics.registry.record_request('courses:active_courses', 'GET', '200',
+                                        0.2, 0.1, 5, 0.05)
+
+        self.assertEqual(self.sample('http_requests_total',
+                                     'courses:active_courses', 'GET', '200'), 2)
+        self.assertEqual(self.sample('http_request_db_queries_total',
+                                     'courses:active_courses'), 7)
+        self.assertEqual(self.sample('http_request_duration_seconds_bucket',
+                                     'courses:active_courses', 'GET', '0.005'), 1)
+        self.assertEqual(self.sample('http_request_duration_seconds_bucket',
+                                     'courses:active_courses', 'GET', '0.25'), 1)
+        self.assertAlmostEqual(self.sample('http_request_duration_seconds_sum',
+                                           'courses:active_courses', 'GET'), 0.203)
+
+    def test_collect_sums_the_files_of_every_process(self):
+        context = multiprocessing.get_context('fork')
+        for _ in range(2):
+            process = context.Process(target=_record, args=('students:student_detail',))
+            process.start()
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+        _record('students:student_detail')
+
+        self.assertEqual(len(os.listdir(metrics.get_metrics_dir())), 3)
+        self.assertEqual(self.sample('http_requests_total',
+                                     'students:student_detail', 'GET', '200'), 3)
+        self.assertEqual(self.sample('http_request_db_queries_total',
+                                     'students:student_detail'), 9)
+
+    def test_text_format(self):
+        text = metrics.render_metrics({
+            metrics._sample_key('http_requests_total', ('a"b', 'GET', '200')): 2.0,
+            metrics._sample_key('http_request_db_duration_seconds_bucket',
+                                ('r', '0.01')): 1.0,
+            metrics._sample_key('http_request_db_duration_seconds_bucket',
+                                ('r', '+Inf')): 1.0,
+            metrics._sample_key('http_request_db_duration_seconds_sum', ('r',)): 20.5,
+        }).splitlines()
+
+        self.assertIn('# TYPE http_requests_total counter', text)
+        self.assertIn('http_requests_total{route="a\\"b",method="GET",status="200"} 2',
+                      text)
+        # Buckets are cumulative and end with the count
+        self.assertIn('http_request_db_duration_seconds_bucket{route="r",le="0.005"} 0', text)
+        self.assertIn('http_request_db_duration_seconds_bucket{route="r",le="0.01"} 1', text)
+        self.assertIn('http_request_db_duration_seconds_bucket{route="r",le="+Inf"} 2', text)
+        self.assertIn('http_request_db_duration_seconds_sum{route="r"} 20.5', text)
+        self.assertIn('http_request_db_duration_seconds_count{route="r"} 2', text)
+
+    def test_requires_a_staff_login_without_a_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+
+        self.client.force_login(User.objects.create_user(
+            username='metrics-staff', password='x', role='admin', is_staff=True))
+        response = self.client.get('/metrics')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'# TYPE http_requests_total counter', response.content)
+
+    @override_settings(METRICS_TOKEN='scrape')
+    def test_requires_the_bearer_token_when_set(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get(
+            '/metrics', headers={'Authorization': 'Bearer wrong'}).status_code, 403)
+        self.assertEqual(self.client.get(
+            '/metrics', headers={'Authorization': 'Bearer scrape'}).status_code, 200)
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False, SQL_METRICS_SAMPLE_RATE=1.0,
+                   TRACING_TOKEN='secret')
+class SharedQueryTimingTests(TestCase):
+    """SQL instrumentation, metrics and tracing time each query once"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'traces.jsonl')
+        overrides = override_settings(METRICS_DIR=directory.name,
+                                      TRACING_EXPORT_PATH=self.path)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.user = User.objects.create_user(
+            username='timing-student', password='x', role='student',
+            email='timing-student@example.com')
+        Course.objects.create(course_name='Timing', course_code='TM101',
+                              course_duration=12, credits=3)
+
+    def test_layers_share_one_wrapper_and_agree_on_the_queries(self):
+        wrappers = []
+        time_query = sql_metrics._time_query
+
+        def counting(execute, sql, params, many, context):
+            wrappers.append(len(context['connection'].execute_wrappers))
+            return time_query(execute, sql, params, many, context)
+
+        with mock.patch.object(sql_metrics, '_time_query', counting):
+            response = client_for(self.user).get('/api/courses/active/',
+                                                 headers={'X-Trace': 'secret'})
+
+        self.assertEqual(response.status_code, 200)
+        queries = int(response['X-DB-Queries'])
+        self.assertGreater(queries, 0)
+        self.assertEqual(wrappers, [1] * queries)
+
+        self.assertEqual(metrics.collect()[metrics._sample_key(
+            'http_request_db_queries_total', ('courses:active_courses',))], queries)
+        with open(self.path, encoding='utf-8') as export:
+            trace = json.loads(export.readline())
+        spans = trace['resourceSpans'][0]['scopeSpans'][0]['spans']
+        self.assertEqual(sum(span['name'].startswith('db ') for span in spans), queries)
+
@@ -0,0 +1,225 @@
+"""
+Token bucket throttling for Student Course Management System
+
+Each throttle scope (login, registration, enrollment) has a bucket per
+caller holding up to N tokens that refill at N per period, where the rate
+is the scope's 'N/period' entry in DEFAULT_THROTTLE_RATES. A request takes
+one token or is answered 429 with a Retry-After of the time until the next
+token. Buckets live in the THROTTLE_CACHE_ALIAS cache as (tokens, last
+update) pairs, so a decision is one cache read and one write, with no
+database access. That cache must be shared by the worker processes: with a
+per-process cache such as the default locmem one, each worker keeps its own
+buckets and the effective rates are multiplied by the number of workers.
+
+Two concurrent requests from the same caller may both read a bucket before
+either writes it back and both be let through; the buckets bound sustained
+rates, not individual races.
+"""
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from .stats import CounterStatsAPIView, OutcomeCounters, ratio
+
+
+KEY_PREFIX = 'tb'
+
+
+def get_cache():
+    """Cache backend holding the buckets and decision counters"""
+    return caches[getattr(settings, 'THROTTLE_CACHE_ALIAS', 'default')]
+
+
+# Allowed and throttled requests per throttle scope
+counters = OutcomeCounters(get_cache, KEY_PREFIX, ('allowed', 'throttled'))
+
+
+def parse_rate(rate):
+    """(capacity, tokens refilled per second) of an 'N/period' rate, or None"""
+    if rate is None:
+        return None
+    count, period = rate.split('/')
+    capacity = int(count)
+    seconds = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[period[0]]
+    return capacity, capacity / seconds
+
+
+def get_rate(scope):
+    """Parsed rate of a throttle scope, or None when it is not throttled"""
+    return parse_rate(api_settings.DEFAULT_THROTTLE_RATES.get(scope))
+
+
+def _bucket_key(scope, ident):
+    return f'{KEY_PREFIX}:bucket:{scope}:{ident}'
+
+
+def _refill(state, capacity, refill_rate, now):
+    """Tokens in a bucket at now, given its stored (tokens, updated) state"""
+    if state is None:
+        return float(capacity)
+    tokens, updated = state
+    return min(float(capacity), tokens + max(0.0, now - updated) * refill_rate)
+
+
+def take_token(scope, ident, capacity, refill_rate):
+    """
+    Take a token from a caller's bucket.
+
+    Returns (allowed, tokens left, seconds until the next token).
+    """
+    cache = get_cache()
+    key = _bucket_key(scope, ident)
+    now = time.time()
+    tokens = _refill(cache.get(key), capacity, refill_rate, now)
+    allowed = tokens >= 1
+    if allowed:
+        tokens -= 1
+    # An untouched bucket is full again after capacity / refill_rate seconds
+    cache.set(key, (tokens, now), math.ceil(capacity / refill_rate) + 1)
+    wait = 0.0 if tokens >= 1 else (1 - tokens) / refill_rate
+    return allowed, tokens, wait
+
+
+def get_bucket_state(scope, ident):
+    """Current tokens of a caller's bucket, without taking one"""
+    rate = get_rate(scope)
+    if rate is None:
+        return None
+    capacity, refill_rate = rate
+    tokens = _refill(get_cache().get(_bucket_key(scope, ident)), capacity,
+                     refill_rate, time.time())
+    return {
+        'scope': scope,
+        'ident': ident,
+        'capacity': capacity,
+        'tokens': round(tokens, 3),
+        'retry_after': round(0.0 if tokens >= 1 else (1 - tokens) / refill_rate, 3),
+    }
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Throttle with a token bucket per caller and scope.
+
+    Callers are identified by user id when authenticated and by client IP
+    otherwise; subclasses set scope and may identify callers differently.
+    """
+    scope = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.scope:
+            counters.register(cls.scope)
+
+    def get_bucket_ident(self, request, view):
+        """Identity of the caller's bucket, or None to let the request through"""
+        if request.user and request.user.is_authenticated:
+            return f'user:{request.user.pk}'
+        return f'ip:{self.get_ident(request)}'
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        rate = get_rate(self.scope)
+        if rate is None:
+            return True
+        ident = self.get_bucket_ident(request, view)
+        if ident is None:
+            return True
+
+        allowed, _, wait = take_token(self.scope, ident, *rate)
+        counters.record(self.scope, 'allowed' if allowed else 'throttled')
+        if not allowed:
+            self.wait_seconds = wait
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class LoginThrottle(TokenBucketThrottle):
+    """Login attempts per client IP"""
+    scope = 'login'
+
+    def get_bucket_ident(self, request, view):
+        return f'ip:{self.get_ident(request)}'
+
+
+class LoginAccountThrottle(TokenBucketThrottle):
+    """
+    Login attempts per username from one client IP.
+
+    Keying on the username alone would let anyone lock an account out of
+    login by sending wrong passwords for it; with the IP in the key only the
+    guessing client is throttled, and LoginThrottle bounds each IP overall.
+    """
+    scope = 'login_account'
+
+    def get_bucket_ident(self, request, view):
+        username = request.data.get('username') if hasattr(request.data, 'get') else None
+        if not isinstance(username, str) or not username:
+            return None
+        return f'username:{username.strip().lower()}:ip:{self.get_ident(request)}'
+
+
+class RegisterThrottle(TokenBucketThrottle):
+    """Registrations per client IP"""
+    scope = 'register'
+
+    def get_bucket_ident(self, request, view):
+        return f'ip:{self.get_ident(request)}'
+
+
+class EnrollThrottle(TokenBucketThrottle):
+    """Enrollment writes per user; reads are not throttled"""
+    scope = 'enroll'
+
+    def allow_request(self, request, view):
+        if request.method in permissions.SAFE_METHODS:
+            return True
+        return super().allow_request(request, view)
+
+
+def get_throttle_stats():
+    """Rate and allowed/throttled counts per throttle scope"""
+    return {
+        scope: {
+            'rate': api_settings.DEFAULT_THROTTLE_RATES.get(scope),
+            'allowed': counts['allowed'],
+            'throttled': counts['throttled'],
+            'throttled_rate': ratio(counts['throttled'],
+                                    counts['allowed'] + counts['throttled']),
+        }
+        for scope, counts in counters.counts().items()
+    }
+
+
+class ThrottleStatsAPIView(CounterStatsAPIView):
+    """
+    Throttle decisions per scope (admin only); DELETE resets them.
+
+    ?scope=login&ident=ip:10.0.0.1 also reports the current state of that
+    caller's bucket.
+    """
+    counters = counters
+
+    def get_report(self, request):
+        return {'scopes': get_throttle_stats()}
+
+    def get(self, request):
+        response = super().get(request)
+        scope = request.query_params.get('scope')
+        ident = request.query_params.get('ident')
+        if scope and ident:
+            bucket = get_bucket_state(scope, ident)
+            if bucket is None:
+                return Response({
+                    'error': f'Unknown throttle scope: {scope}'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            response.data['bucket'] = bucket
+        return response
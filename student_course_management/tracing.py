@@ -0,0 +1,421 @@
+"""
+Request tracing for Student Course Management System
+
+A sampled request is recorded as a trace of nested, timed spans: the
+request itself, the DRF view, authentication, each permission check,
+throttles, serializer validation and representation, model full_clean,
+response rendering and every SQL query. Finished traces are appended to a
+JSON-lines file, one OTLP/JSON ExportTraceServiceRequest per line, which
+the slowest_traces management command summarizes and OTLP tooling can
+import.
+
+Requests are sampled at TRACING_SAMPLE_RATE, or always when their
+TRACING_HEADER header carries the shared TRACING_TOKEN (X-Trace: <token>);
+without a token the header is ignored, so clients cannot force the cost of a
+trace on the server. A W3C traceparent header supplies the trace and parent
+span ids. Sampled responses get an X-Trace-Id header.
+Outside a sampled request span() returns a shared no-op context, so the
+instrumented methods only pay for one thread-local lookup. Query spans are
+built from the shared SQL timing wrapper of sql_metrics rather than a
+wrapper of their own, and all spans are timed on the same monotonic clock.
+
+Work done while a streaming response is consumed happens after the trace
+is exported and is not recorded.
+"""
+import hmac
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from contextlib import nullcontext
+from functools import wraps
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.models import Model
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .sql_metrics import time_queries
+
+
+def get_sample_rate():
+    """Fraction of requests traced (0 traces only requests asking for it)"""
+    return getattr(settings, 'TRACING_SAMPLE_RATE', 0.0)
+
+
+def get_trace_header():
+    """Request header that forces a trace when set to the token, or None"""
+    return getattr(settings, 'TRACING_HEADER', 'X-Trace') or None
+
+
+def get_trace_token():
+    """Shared secret the trace header must carry, or None to ignore the header"""
+    return getattr(settings, 'TRACING_TOKEN', None) or None
+
+
+def get_export_path():
+    """JSON-lines file the finished traces are appended to"""
+    return getattr(settings, 'TRACING_EXPORT_PATH', None) or os.path.join(
+        tempfile.gettempdir(), 'scms-traces.jsonl')
+
+
+def get_export_max_bytes():
+    """Size past which the export file is rotated to <path>.1 (0 never rotates)"""
+    return getattr(settings, 'TRACING_EXPORT_MAX_BYTES', 100 * 1024 * 1024)
+
+
+def get_max_spans():
+    """Spans kept per trace; later spans are counted but not recorded"""
+    return getattr(settings, 'TRACING_MAX_SPANS', 1000)
+
+
+def get_service_name():
+    return getattr(settings, 'TRACING_SERVICE_NAME', 'student-course-management')
+
+
+# OTLP span kinds and status codes
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+STATUS_CODE_ERROR = 2
+
+# Characters of SQL kept in the db.statement attribute
+STATEMENT_LENGTH = 1000
+
+_TRACEPARENT = re.compile(r'^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$')
+
+
+def _attribute(key, value):
+    """OTLP/JSON KeyValue (64-bit integers are encoded as strings)"""
+    if isinstance(value, bool):
+        encoded = {'boolValue': value}
+    elif isinstance(value, int):
+        encoded = {'intValue': str(value)}
+    elif isinstance(value, float):
+        encoded = {'doubleValue': value}
+    else:
+        encoded = {'stringValue': str(value)}
+    return {'key': key, 'value': encoded}
+
+
+class Span:
+    """Timed operation within a trace, used as a context manager"""
+
+    def __init__(self, trace, name, kind, attributes):
+        self.trace = trace
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = None
+        self.start = None
+        self.end = None
+        self.error = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def _set_error(self, exc):
+        if exc is not None:
+            self.error = f'{type(exc).__name__}: {exc}'
+
+    def __enter__(self):
+        stack = self.trace.stack
+        self.parent_id = stack[-1].span_id if stack else self.trace.parent_id
+        stack.append(self)
+        self.start = self.trace.now()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = self.trace.now()
+        self._set_error(exc)
+        self.trace.stack.pop()
+        self.trace.finish(self)
+        return False
+
+    def record(self, started, ended, error=None):
+        """Add the span as a finished child of the open span, given perf_counter_ns() bounds"""
+        stack = self.trace.stack
+        self.parent_id = stack[-1].span_id if stack else self.trace.parent_id
+        self.start = self.trace.to_epoch(started)
+        self.end = self.trace.to_epoch(ended)
+        self._set_error(error)
+        self.trace.finish(self)
+
+    def to_otlp(self, trace_id):
+        span = {
+            'traceId': trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': self.kind,
+            'startTimeUnixNano': str(self.start),
+            'endTimeUnixNano': str(self.end),
+            'attributes': [_attribute(key, value)
+                           for key, value in self.attributes.items()],
+            'status': {'code': STATUS_CODE_ERROR, 'message': self.error}
+            if self.error else {},
+        }
+        if self.parent_id:
+            span['parentSpanId'] = self.parent_id
+        return span
+
+
+class Trace:
+    """Spans of one sampled request"""
+
+    def __init__(self, trace_id=None, parent_id=None):
+        self.trace_id = trace_id or os.urandom(16).hex()
+        self.parent_id = parent_id
+        self.stack = []
+        self.spans = []
+        self.dropped = 0
+        self.max_spans = get_max_spans()
+        self.serializing = False
+        # Spans are timed with perf_counter_ns() and exported as Unix times
+        self.epoch_offset = time.time_ns() - time.perf_counter_ns()
+
+    def to_epoch(self, perf_ns):
+        return self.epoch_offset + perf_ns
+
+    def now(self):
+        return self.to_epoch(time.perf_counter_ns())
+
+    def span(self, name, kind=SPAN_KIND_INTERNAL, attributes=None):
+        return Span(self, name, kind, attributes or {})
+
+    def finish(self, span):
+        # The root span is always kept
+        if len(self.spans) < self.max_spans or not self.stack:
+            self.spans.append(span)
+        else:
+            self.dropped += 1
+
+    def to_otlp(self):
+        """The trace as an OTLP/JSON ExportTraceServiceRequest"""
+        return {
+            'resourceSpans': [{
+                'resource': {'attributes': [_attribute('service.name', get_service_name())]},
+                'scopeSpans': [{
+                    'scope': {'name': __name__},
+                    'spans': [span.to_otlp(self.trace_id) for span in self.spans],
+                }],
+            }],
+        }
+
+
+class _TraceState(threading.local):
+    trace = None
+
+
+_state = _TraceState()
+_no_span = nullcontext()
+
+
+def current_trace():
+    """Trace of the request running on this thread, or None when unsampled"""
+    return _state.trace
+
+
+def span(name, kind=SPAN_KIND_INTERNAL, **attributes):
+    """Context manager recording a child span of the current trace, if any"""
+    trace = _state.trace
+    if trace is None:
+        return _no_span
+    return trace.span(name, kind, attributes)
+
+
+def rotated_path(path):
+    """Path the export file is moved to when it is rotated"""
+    return path + '.1'
+
+
+def export_trace(trace):
+    """
+    Append a finished trace to the export file as one JSON line.
+
+    Once the file grows past TRACING_EXPORT_MAX_BYTES it replaces the
+    previous <path>.1, so the traces never take more than about twice that
+    on disk.
+    """
+    path = get_export_path()
+    line = json.dumps(trace.to_otlp(), separators=(',', ':')).encode() + b'\n'
+    # One O_APPEND write per trace, so lines from several processes never interleave
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+        written = os.fstat(fd)
+    finally:
+        os.close(fd)
+
+    max_bytes = get_export_max_bytes()
+    if max_bytes and written.st_size > max_bytes:
+        try:
+            # Skip the rename when another process has rotated the file already
+            if os.stat(path).st_ino == written.st_ino:
+                os.replace(path, rotated_path(path))
+        except FileNotFoundError:
+            pass
+
+
+def _trace_query(sql, many, context, started, ended, error):
+    """time_queries() listener adding a span per query of a sampled request"""
+    trace = _state.trace
+    if trace is None:
+        return
+    operation = sql.split(None, 1)[0].upper() if sql else 'QUERY'
+    attributes = {
+        'db.system': context['connection'].vendor,
+        'db.statement': sql[:STATEMENT_LENGTH],
+    }
+    if many:
+        attributes['db.executemany'] = True
+    trace.span(f'db {operation}', SPAN_KIND_CLIENT, attributes).record(
+        started, ended, error)
+
+
+def _traced(name_of):
+    """Decorator running a method inside a span named name_of(self, *args)"""
+    def decorate(function):
+        @wraps(function)
+        def traced(self, *args, **kwargs):
+            trace = _state.trace
+            if trace is None:
+                return function(self, *args, **kwargs)
+            with trace.span(name_of(self, *args)):
+                return function(self, *args, **kwargs)
+        traced.tracing_wrapped = True
+        return traced
+    return decorate
+
+
+def _traced_outermost(name_of):
+    """
+    Like _traced, but only the outermost serializer call of a request gets
+    a span: nested serializers and super() calls run inside it.
+    """
+    def decorate(function):
+        @wraps(function)
+        def traced(self, *args, **kwargs):
+            trace = _state.trace
+            if trace is None or trace.serializing:
+                return function(self, *args, **kwargs)
+            trace.serializing = True
+            try:
+                with trace.span(name_of(self)):
+                    return function(self, *args, **kwargs)
+            finally:
+                trace.serializing = False
+        traced.tracing_wrapped = True
+        return traced
+    return decorate
+
+
+def _wrap_method(cls, name, decorator):
+    function = cls.__dict__.get(name)
+    if function is not None and not getattr(function, 'tracing_wrapped', False):
+        setattr(cls, name, decorator(function))
+
+
+def _wrap_property(cls, name, decorator):
+    prop = cls.__dict__.get(name)
+    if isinstance(prop, property) and not getattr(prop.fget, 'tracing_wrapped', False):
+        setattr(cls, name, property(decorator(prop.fget)))
+
+
+def _serializer_name(serializer):
+    if isinstance(serializer, serializers.ListSerializer):
+        return f'{type(serializer.child).__name__}(many=True)'
+    return type(serializer).__name__
+
+
+def _traced_permissions(get_permissions):
+    @wraps(get_permissions)
+    def traced(self):
+        permissions = get_permissions(self)
+        if _state.trace is None:
+            return permissions
+        # Instance attributes shadow the class methods for this request only
+        for permission in permissions:
+            name = f'permission {type(permission).__name__}'
+            permission.has_permission = _traced(lambda *args, name=name: name)(
+                type(permission).has_permission).__get__(permission)
+            permission.has_object_permission = _traced(
+                lambda *args, name=name: f'{name} object')(
+                type(permission).has_object_permission).__get__(permission)
+        return permissions
+    traced.tracing_wrapped = True
+    return traced
+
+
+def install_tracing():
+    """Instrument DRF views, serializers, rendering and model validation (idempotent)"""
+    _wrap_method(APIView, 'dispatch', _traced(
+        lambda view, request, *args: f'view {type(view).__name__}.{request.method.lower()}'))
+    _wrap_method(APIView, 'perform_authentication', _traced(lambda *args: 'authentication'))
+    _wrap_method(APIView, 'check_throttles', _traced(lambda *args: 'throttles'))
+    _wrap_method(APIView, 'get_permissions', _traced_permissions)
+    for cls in (serializers.BaseSerializer, serializers.Serializer,
+                serializers.ListSerializer):
+        _wrap_method(cls, 'is_valid', _traced_outermost(
+            lambda serializer: f'validate {_serializer_name(serializer)}'))
+        _wrap_property(cls, 'data', _traced_outermost(
+            lambda serializer: f'serialize {_serializer_name(serializer)}'))
+    _wrap_method(Model, 'full_clean', _traced(
+        lambda instance, *args: f'{type(instance).__name__}.full_clean'))
+    _wrap_property(Response, 'rendered_content', _traced(
+        lambda response: f'render {type(response.accepted_renderer).__name__}'
+        if getattr(response, 'accepted_renderer', None) else 'render'))
+
+
+class TracingMiddleware:
+    """Trace sampled requests and export their spans"""
+
+    def __init__(self, get_response):
+        if get_sample_rate() <= 0 and not (get_trace_header() and get_trace_token()):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        install_tracing()
+
+    def should_sample(self, request):
+        header = get_trace_header()
+        token = get_trace_token()
+        if header and token and hmac.compare_digest(
+                request.headers.get(header, '').encode(), token.encode()):
+            return True
+        rate = get_sample_rate()
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+    def __call__(self, request):
+        if not self.should_sample(request):
+            return self.get_response(request)
+
+        parent = _TRACEPARENT.match(request.headers.get('traceparent', ''))
+        trace = Trace(*parent.groups()) if parent else Trace()
+        root = trace.span(f'{request.method} {request.path}', SPAN_KIND_SERVER, {
+            'http.request.method': request.method,
+            'url.path': request.path,
+        })
+        _state.trace = trace
+        try:
+            with root, time_queries(listener=_trace_query):
+                response = self.get_response(request)
+                match = request.resolver_match
+                if match:
+                    root.name = f'{request.method} {match.view_name}'
+                    root.set_attribute('http.route', match.view_name)
+                root.set_attribute('http.response.status_code', response.status_code)
+                if response.status_code >= 500:
+                    root.error = f'HTTP {response.status_code}'
+        finally:
+            _state.trace = None
+        if trace.dropped:
+            root.set_attribute('tracing.dropped_spans', trace.dropped)
+
+        export_trace(trace)
+        response['X-Trace-Id'] = trace.trace_id
+        return response
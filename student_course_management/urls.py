@@ -6,6 +6,12 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.http import JsonResponse
+from students.views import EnrollmentExportAPIView, EnrollmentTrendsAPIView
+from .batch import BatchAPIView
+from .dashboard import AdminDashboardAPIView
+from .metrics import metrics_view
+from .response_cache import CacheStatsAPIView
+from .throttling import ThrottleStatsAPIView
 
 # Try to import documentation support
 try:
@@ -26,6 +32,13 @@ def api_root(request):
             'authentication': '/api/auth/',
             'courses': '/api/courses/',
             'students': '/api/students/',
+            'enrollments_export': '/api/enrollments/export/',
+            'enrollment_trends': '/api/stats/enrollment-trends/',
+            'admin_dashboard': '/api/dashboard/admin/',
+            'batch': '/api/batch/',
+            'cache_stats': '/api/cache/stats/',
+            'throttle_stats': '/api/throttle/stats/',
+            'metrics': '/metrics',
             'admin': '/admin/',
             'api_browser': '/api-auth/',
         }
@@ -40,6 +53,17 @@ urlpatterns = [
     path('api/auth/', include('authentication.urls')),
     path('api/courses/', include('courses.urls')),
     path('api/students/', include('students.urls')),
+    path('api/enrollments/export/', EnrollmentExportAPIView.as_view(),
+         name='enrollment_export'),
+    path('api/stats/enrollment-trends/', EnrollmentTrendsAPIView.as_view(),
+         name='enrollment_trends'),
+    path('api/cache/stats/', CacheStatsAPIView.as_view(), name='cache_stats'),
+    path('api/throttle/stats/', ThrottleStatsAPIView.as_view(),
+         name='throttle_stats'),
+    path('api/dashboard/admin/', AdminDashboardAPIView.as_view(),
+         name='admin_dashboard'),
+    path('api/batch/', BatchAPIView.as_view(), name='batch'),
+    path('metrics', metrics_view, name='metrics'),
 
     # DRF browsable API
     path('api-auth/', include('rest_framework.urls')),
@@ -0,0 +1,212 @@
+"""
+GPA and credit engine for Student Course Management System
+
+Graded enrollments are read as plain columns (student, credits, grade
+points, term) straight from the database cursor into NumPy arrays, and
+cumulative GPA, latest-term GPA and credit totals are computed for every
+student at once with bincount reductions - no model instances and no
+per-student Python loop. Results are written to StudentAcademicSummary.
+"""
+import time
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, FloatField, IntegerField, Value, When
+from django.db.models.functions import Coalesce, ExtractYear
+
+from courses.models import GRADED_ENROLLMENT_STATUSES
+from student_course_management.response_cache import invalidate_models
+from .models import Enrollment, StudentAcademicSummary
+
+
+# Grade points on a 4.0 scale; grades not listed (I, W) carry no points
+# and are left out of GPA and credit totals
+GRADE_POINTS = {
+    'A+': 4.0, 'A': 4.0, 'A-': 3.7,
+    'B+': 3.3, 'B': 3.0, 'B-': 2.7,
+    'C+': 2.3, 'C': 2.0, 'C-': 1.7,
+    'D+': 1.3, 'D': 1.0,
+    'F': 0.0,
+}
+
+# Enrollment statuses whose grade counts towards the GPA
+GRADED_STATUSES = GRADED_ENROLLMENT_STATUSES
+
+# Terms are half years: code year * 2 for January-June, + 1 for July-December
+NO_TERM = -1
+
+
+def get_chunk_size():
+    """Number of enrollment rows fetched per cursor round trip"""
+    return max(1, getattr(settings, 'ACADEMIC_SUMMARY_CHUNK_SIZE', 50000))
+
+
+def term_label(code):
+    """Human-readable name of a term code"""
+    if code == NO_TERM:
+        return ''
+    year, half = divmod(int(code), 2)
+    return f"{year} {'Fall' if half else 'Spring'}"
+
+
+def graded_enrollments(student_ids=None):
+    """
+    Queryset of (student_id, credits, points, term) rows for graded enrollments.
+
+    Points and term codes are computed by the database, so every column
+    except the student id arrives as a plain number.
+    """
+    queryset = Enrollment.objects.filter(
+        status__in=GRADED_STATUSES, grade__in=GRADE_POINTS)
+    if student_ids is not None:
+        queryset = queryset.filter(student_id__in=student_ids)
+    return queryset.order_by().annotate(
+        points=Case(
+            *[When(grade=grade, then=Value(points))
+              for grade, points in GRADE_POINTS.items()],
+            output_field=FloatField()),
+        term=Coalesce(
+            ExtractYear('completion_date') * 2 + Case(
+                When(completion_date__month__gt=6, then=Value(1)),
+                default=Value(0)),
+            Value(NO_TERM),
+            output_field=IntegerField()),
+    ).values_list('student_id', Coalesce('credits_earned', 'course__credits'),
+                  'points', 'term')
+
+
+def load_grade_columns(queryset):
+    """
+    Read a graded_enrollments() queryset into NumPy columns.
+
+    The SQL is run on a raw cursor so rows skip Django's per-value
+    converters. Returns (student keys, codes, credits, points, terms) where
+    codes index into the list of raw student keys.
+    """
+    sql, params = queryset.query.sql_with_params()
+    index = {}
+    code_chunks, credit_chunks, point_chunks, term_chunks = [], [], [], []
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(get_chunk_size())
+            if not rows:
+                break
+            student_keys, credits, points, terms = zip(*rows)
+            code_chunks.append(np.fromiter(
+                (index.setdefault(key, len(index)) for key in student_keys),
+                dtype=np.int64, count=len(rows)))
+            credit_chunks.append(np.asarray(credits, dtype=np.float64))
+            point_chunks.append(np.asarray(points, dtype=np.float64))
+            term_chunks.append(np.asarray(terms, dtype=np.int64))
+
+    def join(chunks, dtype):
+        return np.concatenate(chunks) if chunks else np.empty(0, dtype=dtype)
+
+    return (list(index), join(code_chunks, np.int64),
+            join(credit_chunks, np.float64), join(point_chunks, np.float64),
+            join(term_chunks, np.int64))
+
+
+def compute_summaries(codes, credits, points, terms, student_count):
+    """
+    Compute per-student GPA and credit totals in one vectorized pass.
+
+    codes[i] is the student (0..student_count-1) of graded enrollment i.
+    Returns a dict of arrays indexed by student code; GPAs are NaN for
+    students without graded credits.
+    """
+    quality = credits * points
+    attempted = np.bincount(codes, weights=credits, minlength=student_count)
+    earned = np.bincount(codes, weights=credits * (points > 0),
+                         minlength=student_count)
+    quality_total = np.bincount(codes, weights=quality, minlength=student_count)
+    graded = np.bincount(codes, minlength=student_count)
+
+    # Latest term per student, then totals over that term's enrollments only
+    latest_term = np.full(student_count, NO_TERM, dtype=np.int64)
+    np.maximum.at(latest_term, codes, terms)
+    in_latest = terms == latest_term[codes]
+    term_attempted = np.bincount(codes[in_latest], weights=credits[in_latest],
+                                 minlength=student_count)
+    term_quality = np.bincount(codes[in_latest], weights=quality[in_latest],
+                               minlength=student_count)
+
+    def gpa(total, weight):
+        return np.divide(total, weight, out=np.full(student_count, np.nan),
+                         where=weight > 0)
+
+    return {
+        'cumulative_gpa': np.round(gpa(quality_total, attempted), 3),
+        'term': latest_term,
+        'term_gpa': np.round(gpa(term_quality, term_attempted), 3),
+        'credits_attempted': attempted.astype(np.int64),
+        'credits_earned': earned.astype(np.int64),
+        'graded_courses': graded,
+    }
+
+
+def _decimal(value):
+    return None if np.isnan(value) else Decimal(f'{value:.3f}')
+
+
+def build_summaries(student_ids=None):
+    """
+    Compute unsaved StudentAcademicSummary rows.
+
+    Returns (summaries, timings) where timings holds the seconds spent
+    loading and computing.
+    """
+    started = time.perf_counter()
+    student_keys, codes, credits, points, terms = load_grade_columns(
+        graded_enrollments(student_ids))
+    loaded = time.perf_counter()
+    results = compute_summaries(codes, credits, points, terms, len(student_keys))
+    computed = time.perf_counter()
+
+    # Raw keys are the database representation of the UUID primary key
+    to_python = StudentAcademicSummary._meta.pk.target_field.to_python
+    summaries = [
+        StudentAcademicSummary(
+            student_id=to_python(key),
+            cumulative_gpa=_decimal(cumulative_gpa),
+            term=term_label(term),
+            term_gpa=_decimal(term_gpa),
+            credits_attempted=int(attempted),
+            credits_earned=int(earned),
+            graded_courses=int(graded),
+        )
+        for key, cumulative_gpa, term, term_gpa, attempted, earned, graded in zip(
+            student_keys, results['cumulative_gpa'], results['term'],
+            results['term_gpa'], results['credits_attempted'],
+            results['credits_earned'], results['graded_courses'])
+    ]
+    return summaries, {'load': loaded - started, 'compute': computed - loaded,
+                       'rows': len(codes)}
+
+
+def refresh_academic_summaries(student_ids=None, batch_size=2000):
+    """
+    Recompute the academic summaries of the given students (default: all).
+
+    Summaries of students left without graded courses are removed. Returns
+    (number of summaries written, timings).
+    """
+    summaries, timings = build_summaries(student_ids)
+    started = time.perf_counter()
+    with transaction.atomic():
+        stale = StudentAcademicSummary.objects.all()
+        if student_ids is not None:
+            stale = stale.filter(student_id__in=student_ids)
+        stale.delete()
+        StudentAcademicSummary.objects.bulk_create(summaries, batch_size=batch_size)
+        invalidate_models('students.StudentAcademicSummary')
+    timings['write'] = time.perf_counter() - started
+    return len(summaries), timings
+
+
+def update_academic_summary(student_id):
+    """Recompute one student's summary after a grade change"""
+    refresh_academic_summaries([student_id])
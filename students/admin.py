@@ -1,5 +1,15 @@
 from django.contrib import admin
-from .models import Student, Enrollment
+from django.db import transaction
+from django.utils import timezone
+from courses.models import Course, CourseStatistic
+from student_course_management.response_cache import invalidate_models
+from .models import Student, Enrollment, EnrollmentMonthlyFact
+
+
+def refresh_courses(course_ids):
+    """Recount the status counters and rebuild the statistics of courses"""
+    Course.objects.recount(course_ids)
+    CourseStatistic.objects.rebuild(course_ids)
 
 
 class EnrollmentInline(admin.TabularInline):
@@ -62,25 +72,49 @@ class StudentAdmin(admin.ModelAdmin):
 
     def activate_students(self, request, queryset):
         """Bulk activate students"""
-        updated = queryset.update(status='active')
+        updated = queryset.update(status='active', updated_at=timezone.now())
+        invalidate_models('students.Student')
         self.message_user(
             request, f'{updated} students were successfully activated.')
     activate_students.short_description = 'Activate selected students'
 
     def deactivate_students(self, request, queryset):
         """Bulk deactivate students"""
-        updated = queryset.update(status='inactive')
+        updated = queryset.update(status='inactive', updated_at=timezone.now())
+        invalidate_models('students.Student')
         self.message_user(
             request, f'{updated} students were successfully deactivated.')
     deactivate_students.short_description = 'Deactivate selected students'
 
     def graduate_students(self, request, queryset):
         """Bulk graduate students"""
-        updated = queryset.update(status='graduated')
+        updated = queryset.update(status='graduated', updated_at=timezone.now())
+        invalidate_models('students.Student')
         self.message_user(
             request, f'{updated} students were successfully graduated.')
     graduate_students.short_description = 'Graduate selected students'
 
+    def save_formset(self, request, form, formset, change):
+        super().save_formset(request, form, formset, change)
+        if formset.model is not Enrollment:
+            return
+        # Inline rows are saved without the incremental counter and
+        # statistics updates; this runs in the change form's transaction
+        course_ids = set()
+        for inline_form in formset.forms:
+            if not inline_form.has_changed() or inline_form in formset.deleted_forms:
+                continue
+            course_ids.add(inline_form.instance.course_id)
+            if inline_form.initial:
+                # An existing row, possibly moved from another course
+                course_ids.add(inline_form.initial['course'])
+                if {'course', 'enrollment_date'} & set(inline_form.changed_data):
+                    EnrollmentMonthlyFact.objects.mark_stale(
+                        inline_form.initial['course'],
+                        [inline_form.initial['enrollment_date']])
+        if course_ids:
+            refresh_courses(course_ids)
+
     def get_queryset(self, request):
         """Customize queryset based on user permissions"""
         qs = super().get_queryset(request)
@@ -121,16 +155,41 @@ class EnrollmentAdmin(admin.ModelAdmin):
 
     actions = ['mark_completed', 'mark_withdrawn']
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        # Admin edits bypass the incremental counter and statistics updates
+        course_ids = {obj.course_id}
+        if change and 'course' in form.changed_data:
+            course_ids.add(form.initial['course'])
+        refresh_courses(course_ids)
+        if change and {'course', 'enrollment_date'} & set(form.changed_data):
+            EnrollmentMonthlyFact.objects.mark_stale(
+                form.initial['course'], [form.initial['enrollment_date']])
+
+    def _course_ids(self, queryset):
+        # Read before update(): with the changelist filtered by status the
+        # queryset no longer matches the rows once they have been updated
+        return set(queryset.values_list('course_id', flat=True))
+
     def mark_completed(self, request, queryset):
         """Bulk mark enrollments as completed"""
-        updated = queryset.update(status='completed')
+        with transaction.atomic():
+            course_ids = self._course_ids(queryset)
+            updated = queryset.update(status='completed', updated_at=timezone.now())
+            refresh_courses(course_ids)
+        invalidate_models('students.Enrollment')
         self.message_user(
             request, f'{updated} enrollments were marked as completed.')
     mark_completed.short_description = 'Mark selected enrollments as completed'
 
     def mark_withdrawn(self, request, queryset):
         """Bulk mark enrollments as withdrawn"""
-        updated = queryset.update(status='withdrawn', grade='W')
+        with transaction.atomic():
+            course_ids = self._course_ids(queryset)
+            updated = queryset.update(
+                status='withdrawn', grade='W', updated_at=timezone.now())
+            refresh_courses(course_ids)
+        invalidate_models('students.Enrollment')
         self.message_user(
             request, f'{updated} enrollments were marked as withdrawn.')
     mark_withdrawn.short_description = 'Mark selected enrollments as withdrawn'
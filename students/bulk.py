@@ -0,0 +1,290 @@
+"""
+Bulk student import and enrollment for Student Course Management System
+
+Import rows are validated without per-row queries, uniqueness is checked for
+the whole batch, passwords are hashed in a process pool and users and
+students are inserted with bulk_create in chunked transactions. A row that
+fails never aborts the rest of the batch.
+
+Enrollments of imported students and bulk enrollments both go through
+Enrollment.objects.allocate_seats, which
+resolves existing enrollments with one query and inserts or reactivates the
+rest with one statement each, whatever the batch size, and never allocates
+more seats than the course has free.
+"""
+import os
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from courses.models import Course
+from student_course_management.response_cache import invalidate_models
+from .models import Student, Enrollment
+from .numbering import allocate_student_numbers
+from .serializers import StudentBulkCreateRowSerializer
+
+User = get_user_model()
+
+# Below this many passwords the pool start-up costs more than it saves
+MIN_PARALLEL_HASHES = 8
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_max_rows():
+    """Maximum number of rows accepted in one bulk request"""
+    return getattr(settings, 'STUDENT_BULK_MAX_ROWS', 5000)
+
+
+def get_chunk_size():
+    """Number of rows inserted per transaction"""
+    return max(1, getattr(settings, 'STUDENT_BULK_CHUNK_SIZE', 500))
+
+
+def get_hash_workers():
+    """Number of processes used to hash passwords"""
+    workers = getattr(settings, 'PASSWORD_HASH_WORKERS', None)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    return max(1, workers)
+
+
+def _init_hash_worker(settings_module):
+    """Configure Django in a pool process (needed for spawn-based pools)"""
+    if settings_module:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    django.setup()
+
+
+def _get_pool(workers):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_hash_worker,
+                initargs=(os.environ.get('DJANGO_SETTINGS_MODULE'),)
+            )
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def hash_passwords(passwords):
+    """Hash a list of raw passwords, in parallel when the batch is large enough"""
+    workers = get_hash_workers()
+    if workers <= 1 or len(passwords) < MIN_PARALLEL_HASHES:
+        return [make_password(password) for password in passwords]
+
+    chunksize = max(1, len(passwords) // (workers * 4))
+    try:
+        return list(_get_pool(workers).map(
+            make_password, passwords, chunksize=chunksize))
+    except BrokenProcessPool:
+        _reset_pool()
+        return [make_password(password) for password in passwords]
+
+
+class _Row:
+    """A validated import row waiting to be inserted"""
+
+    def __init__(self, index, data):
+        self.index = index
+        self.data = data
+        self.course = None
+        self.enrollment = None
+        self.password_hash = None
+
+
+def bulk_create_students(rows):
+    """
+    Create students (with their users and optional enrollment) from dicts.
+
+    Returns one result dict per input row, in input order, each either
+    {'index', 'status': 'created', 'student_id', 'student_number'} or
+    {'index', 'status': 'error', 'errors'}. Created rows with a course also
+    carry 'enrollment': 'enrolled', or 'full' when the course had no seat
+    left for them (the student is still created).
+    """
+    results = [None] * len(rows)
+
+    def fail(index, errors):
+        results[index] = {'index': index, 'status': 'error', 'errors': errors}
+
+    # Per-row validation (no queries)
+    pending = []
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            fail(index, {'non_field_errors': ['Expected an object']})
+            continue
+        serializer = StudentBulkCreateRowSerializer(data=row)
+        if serializer.is_valid():
+            pending.append(_Row(index, serializer.validated_data))
+        else:
+            fail(index, serializer.errors)
+
+    # Batch-wide checks: one query each for usernames, emails and courses
+    taken_usernames = set(User.objects.filter(
+        username__in={row.data['username'] for row in pending}
+    ).values_list('username', flat=True))
+    taken_emails = set(User.objects.filter(
+        email__in={row.data['email'] for row in pending}
+    ).values_list('email', flat=True))
+    courses = Course.objects.filter(is_active=True).in_bulk(
+        {row.data['course'] for row in pending if row.data.get('course')})
+
+    accepted = []
+    for row in pending:
+        errors = {}
+        if row.data['username'] in taken_usernames:
+            errors['username'] = ['A user with this username already exists']
+        if row.data['email'] in taken_emails:
+            errors['email'] = ['A user with this email already exists']
+        course_id = row.data.get('course')
+        if course_id:
+            row.course = courses.get(course_id)
+            if row.course is None:
+                errors['course'] = ['Course not found or is not active']
+        if errors:
+            fail(row.index, errors)
+            continue
+        # Later duplicates within the batch are rejected as well
+        taken_usernames.add(row.data['username'])
+        taken_emails.add(row.data['email'])
+        accepted.append(row)
+
+    for row, password_hash in zip(accepted, hash_passwords(
+            [row.data['password'] for row in accepted])):
+        row.password_hash = password_hash
+
+    chunk_size = get_chunk_size()
+    for start in range(0, len(accepted), chunk_size):
+        chunk = accepted[start:start + chunk_size]
+        try:
+            with transaction.atomic():
+                created = _insert_rows(chunk)
+        except IntegrityError:
+            # A concurrent request took a username or email after the batch
+            # check; retry the chunk row by row to isolate the failures.
+            created = []
+            for row in chunk:
+                try:
+                    with transaction.atomic():
+                        created.extend(_insert_rows([row]))
+                except IntegrityError as e:
+                    fail(row.index, {'non_field_errors': [str(e)]})
+
+        for row, student in created:
+            results[row.index] = {
+                'index': row.index,
+                'status': 'created',
+                'student_id': str(student.student_id),
+                'student_number': student.student_number,
+            }
+            if row.course:
+                results[row.index]['enrollment'] = row.enrollment
+
+    return results
+
+
+def _insert_rows(rows):
+    """Insert users, students and enrollments for rows in the current transaction"""
+    now = timezone.now()
+    users = User.objects.bulk_create([
+        User(
+            username=row.data['username'],
+            email=row.data['email'],
+            first_name=row.data['first_name'],
+            last_name=row.data['last_name'],
+            password=row.password_hash,
+            phone=row.data.get('phone_number', ''),
+            date_of_birth=row.data.get('date_of_birth'),
+            address=row.data.get('address', ''),
+            role='student',
+            date_joined=now,
+        )
+        for row in rows
+    ])
+
+    if any(user.pk is None for user in users):
+        # Backends without RETURNING support (MySQL) do not set primary keys
+        user_ids = dict(User.objects.filter(
+            username__in=[user.username for user in users]
+        ).values_list('username', 'id'))
+        for user in users:
+            user.pk = user_ids[user.username]
+
+    student_numbers = allocate_student_numbers(len(rows))
+    students = Student.objects.bulk_create([
+        Student(
+            user=user,
+            student_number=student_number,
+            enrollment_date=row.data.get('enrollment_date') or now.date(),
+        )
+        for row, user, student_number in zip(rows, users, student_numbers)
+    ])
+
+    by_course = defaultdict(list)
+    for row, student in zip(rows, students):
+        if row.course:
+            by_course[row.course.pk].append((row, student.pk))
+    # Seats go through the same capacity check as every other enrollment;
+    # courses are locked in a fixed order so concurrent imports cannot deadlock
+    for course_id in sorted(by_course, key=str):
+        course_rows = by_course[course_id]
+        outcomes = Enrollment.objects.allocate_seats(
+            course_id, [student_id for _, student_id in course_rows])
+        for row, student_id in course_rows:
+            row.enrollment = outcomes[student_id]
+
+    # bulk_create sends no signals, so expire cached responses explicitly
+    invalidate_models('authentication.User', 'students.Student',
+                      'students.Enrollment', 'courses.Course')
+    return list(zip(rows, students))
+
+
+def bulk_enroll_students(course, student_ids):
+    """
+    Enroll the given students in course in one transaction.
+
+    Students without an enrollment get a new one, withdrawn enrollments are
+    reactivated and students already enrolled or finished with the course
+    are skipped. When the course has a capacity, students past the last
+    free seat (in the given order) are left out and counted as full.
+    Returns {'created', 'reactivated', 'skipped', 'full'} counts.
+    """
+    student_ids = list(dict.fromkeys(student_ids))
+    for attempt in range(2):
+        try:
+            with transaction.atomic():
+                outcomes = Enrollment.objects.allocate_seats(
+                    course.pk, student_ids, reenrollable=('withdrawn',))
+            break
+        except IntegrityError:
+            # A concurrent request enrolled one of the students between our
+            # read and insert; the retry sees its row and skips it.
+            if attempt:
+                raise
+
+    counts = Counter(outcomes.values())
+    return {
+        'created': counts['enrolled'],
+        'reactivated': counts['reactivated'],
+        'skipped': counts['already_enrolled'],
+        'full': counts['full'],
+    }
@@ -0,0 +1,167 @@
+"""
+Queued enrollment for courses in rush mode
+
+Enroll requests for a rush-mode course are stored as EnrollmentRequest rows
+(a single INSERT each) and answered with a ticket. Worker threads claim
+pending requests in batches, lock each course row once per batch and hand
+out its free seats to the requests in arrival order, so a registration rush
+costs one seat-lock round trip per batch instead of several queries per
+request.
+"""
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.utils import timezone
+
+from courses.models import Course, CourseFullError
+from student_course_management.db import retry_on_deadlock
+from .models import SEATED_OUTCOMES, Enrollment, EnrollmentRequest
+
+
+# (status, message) outcomes recorded on processed requests
+ALREADY_ENROLLED = ('already_enrolled', 'Student is already enrolled in this course')
+COURSE_FULL = ('full', 'Course is full')
+ENROLLED = ('enrolled', '')
+OUTCOMES = {
+    'enrolled': ENROLLED,
+    'reactivated': ENROLLED,
+    'already_enrolled': ALREADY_ENROLLED,
+    'full': COURSE_FULL,
+}
+
+
+def get_batch_size():
+    """Number of queued requests a worker claims per transaction"""
+    return max(1, getattr(settings, 'ENROLLMENT_QUEUE_BATCH_SIZE', 200))
+
+
+def get_worker_count():
+    """Number of worker threads draining the queue"""
+    return max(1, getattr(settings, 'ENROLLMENT_QUEUE_WORKERS', 4))
+
+
+def submit_enrollment_request(student, course):
+    """Queue an enroll request and return it; its request_id is the ticket"""
+    return EnrollmentRequest.objects.create(student=student, course=course)
+
+
+def submit_enrollment_requests(course, student_ids):
+    """Queue one enroll request per student with batched INSERTs; returns them"""
+    return EnrollmentRequest.objects.bulk_create([
+        EnrollmentRequest(student_id=student_id, course=course)
+        for student_id in student_ids
+    ], batch_size=get_batch_size())
+
+
+@retry_on_deadlock
+def process_batch(batch_size=None):
+    """
+    Claim up to batch_size pending requests and process them.
+
+    Returns the number of requests processed (0 when the queue is empty).
+    Concurrent workers skip each other's locked requests.
+    """
+    batch_size = batch_size or get_batch_size()
+    with transaction.atomic():
+        requests = list(EnrollmentRequest.objects.select_for_update(
+            skip_locked=True
+        ).filter(status='pending').order_by('created_at')[:batch_size])
+        if not requests:
+            return 0
+
+        by_course = defaultdict(list)
+        for request in requests:
+            by_course[request.course_id].append(request)
+
+        outcomes = {}
+        # Courses are locked in a fixed order so workers cannot deadlock
+        for course_id in sorted(by_course, key=str):
+            course_requests = by_course[course_id]
+            try:
+                with transaction.atomic():
+                    outcomes.update(_allocate_seats(course_id, course_requests))
+            except IntegrityError:
+                # A synchronous enrollment raced the batch insert; fall back
+                # to enrolling this course's requests one at a time
+                outcomes.update(_allocate_one_by_one(course_id, course_requests))
+
+        now = timezone.now()
+        grouped = defaultdict(list)
+        for request_id, outcome in outcomes.items():
+            grouped[outcome].append(request_id)
+        for (status, message), request_ids in grouped.items():
+            EnrollmentRequest.objects.filter(pk__in=request_ids).update(
+                status=status, message=message, processed_at=now)
+
+    return len(requests)
+
+
+def _allocate_seats(course_id, requests):
+    """Allocate a course's free seats to requests, oldest first"""
+    allocated = Enrollment.objects.allocate_seats(
+        course_id, [request.student_id for request in requests])
+
+    outcomes = {}
+    seen = set()
+    for request in requests:
+        outcome = allocated[request.student_id]
+        if request.student_id in seen and outcome in SEATED_OUTCOMES:
+            # A later ticket of a student enrolled by this batch
+            outcome = 'already_enrolled'
+        seen.add(request.student_id)
+        outcomes[request.pk] = OUTCOMES[outcome]
+    return outcomes
+
+
+def _allocate_one_by_one(course_id, requests):
+    capacity = Course.objects.values_list('capacity', flat=True).get(pk=course_id)
+    outcomes = {}
+    for request in requests:
+        try:
+            result = Enrollment.objects.enroll(
+                request.student_id, course_id, capacity=capacity)
+        except CourseFullError:
+            outcomes[request.pk] = COURSE_FULL
+            continue
+        outcomes[request.pk] = ENROLLED if result.changed else ALREADY_ENROLLED
+    return outcomes
+
+
+def _drain(batch_size, stop_event=None, poll_interval=None):
+    """Worker loop: process batches until the queue is empty (or stop_event is set)"""
+    processed = 0
+    try:
+        while stop_event is None or not stop_event.is_set():
+            count = process_batch(batch_size)
+            processed += count
+            if not count:
+                if poll_interval is None:
+                    break
+                stop_event.wait(poll_interval)
+    finally:
+        connections.close_all()
+    return processed
+
+
+def drain_queue(workers=None, batch_size=None):
+    """Process the queue with a pool of worker threads until it is empty"""
+    workers = workers or get_worker_count()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return sum(pool.map(lambda _: _drain(batch_size), range(workers)))
+
+
+def serve_queue(workers=None, batch_size=None, poll_interval=1.0, stop_event=None):
+    """Run worker threads polling the queue until stop_event is set"""
+    workers = workers or get_worker_count()
+    stop_event = stop_event or threading.Event()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_drain, batch_size, stop_event, poll_interval)
+                   for _ in range(workers)]
+        try:
+            return sum(future.result() for future in futures)
+        except KeyboardInterrupt:
+            stop_event.set()
+            raise
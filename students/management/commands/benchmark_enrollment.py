@@ -0,0 +1,170 @@
+import threading
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.db.models import Count
+from courses.models import Course, CourseFullError
+from students.enrollment_queue import drain_queue, submit_enrollment_request
+from students.models import Enrollment, EnrollmentRequest, Student
+from students.numbering import allocate_student_numbers
+
+User = get_user_model()
+
+
+def _run_threads(target, items, threads):
+    """Split items over threads running target(chunk); return elapsed seconds"""
+    chunks = [items[index::threads] for index in range(threads)]
+
+    def run(chunk):
+        try:
+            target(chunk)
+        finally:
+            connections.close_all()
+
+    workers = [threading.Thread(target=run, args=(chunk,))
+               for chunk in chunks if chunk]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = ('Compare synchronous and queued (rush mode) enrollment throughput '
+            'on a temporary fixture course')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--students',
+            type=int,
+            default=1000,
+            help='Number of students competing for seats',
+        )
+        parser.add_argument(
+            '--capacity',
+            type=int,
+            default=None,
+            help='Course capacity (default: half the students)',
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=8,
+            help='Concurrent clients sending enroll requests',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Queue worker threads (default: ENROLLMENT_QUEUE_WORKERS)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Requests claimed per worker transaction',
+        )
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help='Keep the fixture users, students and courses',
+        )
+
+    def handle(self, *args, **options):
+        student_count = options['students']
+        if student_count < 1:
+            raise CommandError('--students must be at least 1')
+        capacity = options['capacity']
+        if capacity is None:
+            capacity = max(1, student_count // 2)
+        threads = max(1, options['threads'])
+
+        tag = uuid.uuid4().hex[:8]
+        self.stdout.write(f'Creating fixture "bench-{tag}" with {student_count} students...')
+        student_ids = self.create_students(tag, student_count)
+        sync_course = self.create_course(tag, 'S', capacity, rush_mode=False)
+        queued_course = self.create_course(tag, 'Q', capacity, rush_mode=True)
+
+        try:
+            def enroll(chunk):
+                for student_id in chunk:
+                    try:
+                        Enrollment.objects.enroll(
+                            student_id, sync_course.pk, capacity=capacity)
+                    except CourseFullError:
+                        pass
+
+            sync_seconds = _run_threads(enroll, student_ids, threads)
+
+            students = list(Student.objects.filter(pk__in=student_ids))
+
+            def submit(chunk):
+                for student in chunk:
+                    submit_enrollment_request(student, queued_course)
+
+            submit_seconds = _run_threads(submit, students, threads)
+            started = time.perf_counter()
+            drain_queue(options['workers'], options['batch_size'])
+            drain_seconds = time.perf_counter() - started
+
+            self.report('synchronous', sync_course, student_count, sync_seconds)
+            self.report('queued (submit)', queued_course, student_count, submit_seconds)
+            self.report('queued (submit + drain)', queued_course, student_count,
+                        submit_seconds + drain_seconds)
+            self.stdout.write(
+                f'  queue drain: {drain_seconds:.2f}s; outcomes '
+                f'{self.ticket_outcomes(queued_course)}')
+        finally:
+            if options['keep']:
+                self.stdout.write(f'Kept fixture "bench-{tag}"')
+            else:
+                self.cleanup(tag, sync_course, queued_course)
+
+    def create_students(self, tag, count):
+        with transaction.atomic():
+            users = User.objects.bulk_create([
+                User(username=f'bench-{tag}-{index}',
+                     email=f'bench-{tag}-{index}@example.com',
+                     password='!', role='student')
+                for index in range(count)
+            ])
+            if any(user.pk is None for user in users):
+                users = list(User.objects.filter(
+                    username__startswith=f'bench-{tag}-'))
+            students = Student.objects.bulk_create([
+                Student(user=user, student_number=student_number)
+                for user, student_number in zip(
+                    users, allocate_student_numbers(len(users)))
+            ])
+        return [student.pk for student in students]
+
+    def create_course(self, tag, suffix, capacity, rush_mode):
+        return Course.objects.create(
+            course_name=f'Enrollment benchmark {tag}',
+            course_code=f'BN{tag}{suffix}',
+            course_duration=1,
+            capacity=capacity,
+            rush_mode=rush_mode,
+        )
+
+    def report(self, label, course, requests, seconds):
+        enrolled = Enrollment.objects.filter(course=course, status='enrolled').count()
+        rate = requests / seconds if seconds else float('inf')
+        self.stdout.write(self.style.SUCCESS(
+            f'{label}: {requests} requests in {seconds:.2f}s '
+            f'({rate:.0f} req/s); {enrolled}/{course.capacity} seats filled'))
+
+    def ticket_outcomes(self, course):
+        return dict(EnrollmentRequest.objects.filter(course=course).order_by(
+        ).values('status').annotate(total=Count('pk')).values_list('status', 'total'))
+
+    def cleanup(self, tag, *courses):
+        EnrollmentRequest.objects.filter(course__in=courses).delete()
+        Course.objects.filter(pk__in=[course.pk for course in courses]).delete()
+        User.objects.filter(username__startswith=f'bench-{tag}-').delete()
+        self.stdout.write('Removed the benchmark fixture')
@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from students.enrollment_queue import (
+    drain_queue,
+    get_batch_size,
+    get_worker_count,
+    serve_queue,
+)
+
+
+class Command(BaseCommand):
+    help = 'Process queued enrollment requests for courses in rush mode'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Number of worker threads (default: ENROLLMENT_QUEUE_WORKERS)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Requests claimed per transaction (default: ENROLLMENT_QUEUE_BATCH_SIZE)',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once the queue is empty instead of polling for new requests',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=None,
+            help='Seconds an idle worker waits before polling again',
+        )
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'] or get_worker_count())
+        batch_size = max(1, options['batch_size'] or get_batch_size())
+
+        if options['once']:
+            processed = drain_queue(workers, batch_size)
+            self.stdout.write(
+                self.style.SUCCESS(f'Processed {processed} enrollment request(s)'))
+            return
+
+        poll_interval = options['poll_interval']
+        if poll_interval is None:
+            poll_interval = getattr(settings, 'ENROLLMENT_QUEUE_POLL_INTERVAL', 1.0)
+        self.stdout.write(
+            f'Processing enrollment requests with {workers} worker(s), '
+            f'batches of {batch_size}; press Ctrl+C to stop')
+        try:
+            serve_queue(workers, batch_size, poll_interval)
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.SUCCESS('Stopped'))
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+from students.waitlist import promote_waitlists
+
+
+class Command(BaseCommand):
+    help = 'Enroll waitlisted students into seats freed by withdrawals'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=None,
+            help='Repeat the pass every INTERVAL seconds instead of running it once',
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        try:
+            while True:
+                promoted = promote_waitlists()
+                total = sum(promoted.values())
+                if total or interval is None:
+                    self.stdout.write(self.style.SUCCESS(
+                        f'Promoted {total} waitlisted student(s) in {len(promoted)} course(s)'))
+                if interval is None:
+                    return
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.SUCCESS('Stopped'))
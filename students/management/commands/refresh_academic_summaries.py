@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from students.academics import refresh_academic_summaries
+
+
+class Command(BaseCommand):
+    help = 'Recompute GPA and credit totals of every student into StudentAcademicSummary'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Summaries inserted per INSERT statement',
+        )
+
+    def handle(self, *args, **options):
+        written, timings = refresh_academic_summaries(
+            batch_size=max(1, options['batch_size']))
+        self.stdout.write(self.style.SUCCESS(
+            f"Summarized {timings['rows']} graded enrollment(s) into {written} "
+            f"student summaries (load {timings['load']:.2f}s, compute "
+            f"{timings['compute']:.2f}s, write {timings['write']:.2f}s)"))
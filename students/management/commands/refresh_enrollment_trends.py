@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand
+from students.trends import backfill_enrollment_facts, refresh_enrollment_facts
+
+
+class Command(BaseCommand):
+    help = 'Recompute the monthly enrollment facts of months touched since the last refresh'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--backfill',
+            action='store_true',
+            help='Rebuild the whole history instead of the touched months',
+        )
+        parser.add_argument(
+            '--chunk-months',
+            type=int,
+            default=None,
+            help='Months rebuilt per transaction (default: ENROLLMENT_TRENDS_CHUNK_MONTHS)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=None,
+            help='Repeat the refresh every INTERVAL seconds instead of running it once',
+        )
+
+    def handle(self, *args, **options):
+        chunk_months = options['chunk_months']
+        if options['backfill']:
+            started = time.perf_counter()
+            months, facts = backfill_enrollment_facts(chunk_months)
+            self.stdout.write(self.style.SUCCESS(
+                f'Backfilled {months} month(s) into {facts} fact(s) '
+                f'in {time.perf_counter() - started:.2f}s'))
+
+        interval = options['interval']
+        if options['backfill'] and interval is None:
+            return
+        try:
+            while True:
+                months, facts = refresh_enrollment_facts(chunk_months)
+                if months or interval is None:
+                    self.stdout.write(self.style.SUCCESS(
+                        f'Refreshed {months} month(s) into {facts} fact(s)'))
+                if interval is None:
+                    return
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.SUCCESS('Stopped'))
@@ -0,0 +1,153 @@
+import heapq
+import json
+import os
+from collections import defaultdict
+from itertools import chain
+
+from django.core.management.base import BaseCommand, CommandError
+from student_course_management.tracing import get_export_path, rotated_path
+
+
+def _attributes(span):
+    """{key: value} of an OTLP/JSON span's attributes"""
+    return {
+        attribute['key']: next(iter(attribute['value'].values()), None)
+        for attribute in span.get('attributes', [])
+    }
+
+
+def _duration_ms(span):
+    return (int(span['endTimeUnixNano']) - int(span['startTimeUnixNano'])) / 1e6
+
+
+def read_traces(path):
+    """Yield the spans of each trace in an OTLP/JSON lines file"""
+    with open(path, encoding='utf-8') as export:
+        for line in export:
+            if not line.strip():
+                continue
+            traces = defaultdict(list)
+            for resource_spans in json.loads(line).get('resourceSpans', []):
+                for scope_spans in resource_spans.get('scopeSpans', []):
+                    for span in scope_spans.get('spans', []):
+                        traces[span['traceId']].append(span)
+            yield from traces.values()
+
+
+def find_root(spans):
+    """The span whose parent is not part of the trace"""
+    span_ids = {span['spanId'] for span in spans}
+    for span in spans:
+        if span.get('parentSpanId') not in span_ids:
+            return span
+    return None
+
+
+class Command(BaseCommand):
+    help = 'Print the slowest exported request traces with their span trees'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file',
+            default=None,
+            help='Trace export file (default: TRACING_EXPORT_PATH and its rotated copy)',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=10,
+            help='Number of traces printed',
+        )
+        parser.add_argument(
+            '--route',
+            default=None,
+            help='Only traces of this URL name, e.g. students:student_list_create',
+        )
+        parser.add_argument(
+            '--trace',
+            default=None,
+            help='Only the trace with this id (or id prefix)',
+        )
+        parser.add_argument(
+            '--depth',
+            type=int,
+            default=None,
+            help='Deepest span level printed (default: all)',
+        )
+        parser.add_argument(
+            '--sql',
+            action='store_true',
+            help='Print the statement of each query span',
+        )
+
+    def handle(self, *args, **options):
+        if options['file']:
+            paths = [options['file']]
+        else:
+            path = get_export_path()
+            paths = [rotated_path(path), path]
+        paths = [path for path in paths if os.path.exists(path)]
+        if not paths:
+            raise CommandError(f"No trace export at {options['file'] or get_export_path()}")
+
+        def matching():
+            for spans in chain.from_iterable(read_traces(path) for path in paths):
+                root = find_root(spans)
+                if root is None:
+                    continue
+                if options['trace'] and not root['traceId'].startswith(options['trace']):
+                    continue
+                if options['route'] and \
+                        _attributes(root).get('http.route') != options['route']:
+                    continue
+                yield root, spans
+
+        slowest = heapq.nlargest(max(1, options['limit']), matching(),
+                                 key=lambda trace: _duration_ms(trace[0]))
+        if not slowest:
+            self.stdout.write('No matching traces')
+            return
+
+        for rank, (root, spans) in enumerate(slowest, 1):
+            attributes = _attributes(root)
+            queries = [span for span in spans if span['name'].startswith('db ')]
+            self.stdout.write(self.style.SUCCESS(
+                f"{rank}. {_duration_ms(root):.1f}ms {root['name']} "
+                f"[{attributes.get('http.response.status_code', '-')}] "
+                f"{len(queries)} queries in "
+                f"{sum(_duration_ms(span) for span in queries):.1f}ms "
+                f"trace {root['traceId']}"))
+            if attributes.get('tracing.dropped_spans'):
+                self.stdout.write(f"   ({attributes['tracing.dropped_spans']} spans dropped)")
+
+            children = defaultdict(list)
+            for span in spans:
+                children[span.get('parentSpanId')].append(span)
+            for siblings in children.values():
+                siblings.sort(key=lambda span: int(span['startTimeUnixNano']))
+            self.print_children(root, children, 1, options)
+            self.stdout.write('')
+
+    def print_children(self, parent, children, depth, options):
+        """Print the spans under parent, folding siblings of the same name into one line"""
+        if options['depth'] is not None and depth > options['depth']:
+            return
+        groups = defaultdict(list)
+        for span in children[parent['spanId']]:
+            groups[span['name']].append(span)
+
+        indent = '  ' * depth
+        for name, spans in groups.items():
+            total = sum(_duration_ms(span) for span in spans)
+            if len(spans) > 1:
+                self.stdout.write(f'{total:10.1f}ms {indent}{len(spans)}x {name}')
+                continue
+            span = spans[0]
+            line = f'{total:10.1f}ms {indent}{name}'
+            if span.get('status', {}).get('message'):
+                line += f" !! {span['status']['message']}"
+            self.stdout.write(line)
+            if options['sql'] and name.startswith('db '):
+                statement = _attributes(span).get('db.statement', '')
+                self.stdout.write(f'{"":12} {indent}  {statement[:200]}')
+            self.print_children(span, children, depth + 1, options)
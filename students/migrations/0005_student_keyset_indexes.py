@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-17 20:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0002_remove_course_prerequisites'),
+        ('students', '0004_remove_student_course_alter_student_enrollment_date_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['enrollment_date', 'student_id'], name='students_enroll_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['created_at', 'student_id'], name='students_created_at_idx'),
+        ),
+    ]
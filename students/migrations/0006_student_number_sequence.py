@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-17 20:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0005_student_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentNumberSequence',
+            fields=[
+                ('year', models.PositiveSmallIntegerField(help_text='Registration year the sequence belongs to', primary_key=True, serialize=False)),
+                ('next_value', models.PositiveIntegerField(default=1, help_text='Next sequence value that has not been reserved')),
+            ],
+            options={
+                'verbose_name': 'Student Number Sequence',
+                'verbose_name_plural': 'Student Number Sequences',
+                'db_table': 'student_number_sequences',
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-17 20:57
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_course_capacity_rush_mode'),
+        ('students', '0006_student_number_sequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EnrollmentRequest',
+            fields=[
+                ('request_id', models.UUIDField(default=uuid.uuid4, editable=False, help_text='Ticket identifying the request', primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('enrolled', 'Enrolled'), ('already_enrolled', 'Already Enrolled'), ('full', 'Course Full'), ('failed', 'Failed')], default='pending', help_text='Outcome of the request', max_length=20)),
+                ('message', models.CharField(blank=True, default='', help_text='Details about the outcome', max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, help_text='When a worker processed the request', null=True)),
+                ('course', models.ForeignKey(help_text='Course requested', on_delete=django.db.models.deletion.CASCADE, related_name='enrollment_requests', to='courses.course')),
+                ('student', models.ForeignKey(help_text='Student asking to enroll', on_delete=django.db.models.deletion.CASCADE, related_name='enrollment_requests', to='students.student')),
+            ],
+            options={
+                'verbose_name': 'Enrollment Request',
+                'verbose_name_plural': 'Enrollment Requests',
+                'db_table': 'enrollment_requests',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='enroll_req_status_idx')],
+            },
+        ),
+    ]
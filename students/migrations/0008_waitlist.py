@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-17 21:02
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_course_capacity_rush_mode'),
+        ('students', '0007_enrollment_request'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Waitlist',
+            fields=[
+                ('waitlist_id', models.UUIDField(default=uuid.uuid4, editable=False, help_text='Unique identifier for the waitlist entry', primary_key=True, serialize=False)),
+                ('position', models.PositiveIntegerField(help_text="Place in the course's waitlist (lowest is promoted first)")),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('course', models.ForeignKey(help_text='Course the student is waiting for', on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='courses.course')),
+                ('student', models.ForeignKey(help_text='Student waiting for a seat', on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='students.student')),
+            ],
+            options={
+                'verbose_name': 'Waitlist Entry',
+                'verbose_name_plural': 'Waitlist Entries',
+                'db_table': 'waitlists',
+                'ordering': ['course', 'position'],
+                'indexes': [models.Index(fields=['course', 'position'], name='waitlist_course_pos_idx')],
+                'unique_together': {('student', 'course')},
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-17 21:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0008_waitlist'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentAcademicSummary',
+            fields=[
+                ('student', models.OneToOneField(help_text='Student the summary belongs to', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='academic_summary', serialize=False, to='students.student')),
+                ('cumulative_gpa', models.DecimalField(blank=True, decimal_places=3, help_text='Credit-weighted GPA over all graded courses', max_digits=4, null=True)),
+                ('term', models.CharField(blank=True, default='', help_text='Most recent term with graded courses', max_length=20)),
+                ('term_gpa', models.DecimalField(blank=True, decimal_places=3, help_text='Credit-weighted GPA of the most recent term', max_digits=4, null=True)),
+                ('credits_attempted', models.PositiveIntegerField(default=0, help_text='Credits of all graded courses')),
+                ('credits_earned', models.PositiveIntegerField(default=0, help_text='Credits of graded courses passed')),
+                ('graded_courses', models.PositiveIntegerField(default=0, help_text='Number of graded courses')),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Student Academic Summary',
+                'verbose_name_plural': 'Student Academic Summaries',
+                'db_table': 'student_academic_summaries',
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.5 on 2026-10-17 21:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0005_course_statistic'),
+        ('students', '0009_student_academic_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EnrollmentMonthlyFact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('status', models.CharField(help_text='Enrollment status', max_length=20)),
+                ('enrollments', models.PositiveIntegerField(default=0)),
+                ('stale', models.BooleanField(default=False, help_text='Set when the month must be recomputed on the next refresh')),
+            ],
+            options={
+                'verbose_name': 'Enrollment Monthly Fact',
+                'verbose_name_plural': 'Enrollment Monthly Facts',
+                'db_table': 'enrollment_monthly_facts',
+                'ordering': ['month', 'course', 'status'],
+            },
+        ),
+        migrations.CreateModel(
+            name='RefreshWatermark',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('value', models.DateTimeField(blank=True, help_text='Rows changed after this time are picked up by the next refresh', null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Refresh Watermark',
+                'verbose_name_plural': 'Refresh Watermarks',
+                'db_table': 'refresh_watermarks',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['updated_at'], name='enrollment_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['enrollment_date'], name='enrollment_date_idx'),
+        ),
+        migrations.AddField(
+            model_name='enrollmentmonthlyfact',
+            name='course',
+            field=models.ForeignKey(help_text='Course the enrollments belong to', on_delete=django.db.models.deletion.CASCADE, related_name='monthly_facts', to='courses.course'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollmentmonthlyfact',
+            index=models.Index(fields=['course', 'month'], name='enroll_fact_course_month_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='enrollmentmonthlyfact',
+            unique_together={('month', 'course', 'status')},
+        ),
+    ]
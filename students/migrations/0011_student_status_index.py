@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-17 21:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0005_course_statistic'),
+        ('students', '0010_enrollment_monthly_facts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['status'], name='students_status_idx'),
+        ),
+    ]
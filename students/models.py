@@ -1,10 +1,353 @@
-from django.db import models
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, Exists, OuterRef, Prefetch, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.conf import settings
 from django.core.validators import RegexValidator
 from django.utils import timezone
+from student_course_management.db import retry_on_deadlock
+from student_course_management.response_cache import invalidate_models
 import uuid
 
 
+# Statuses an enrollment may be moved out of by each kind of transition
+REENROLLABLE_STATUSES = ('withdrawn', 'completed', 'failed', 'suspended')
+WITHDRAWABLE_STATUSES = ('enrolled', 'suspended')
+
+# allocate_seats outcomes that took a seat
+SEATED_OUTCOMES = ('enrolled', 'reactivated')
+
+
+class EnrollmentTransition(NamedTuple):
+    """Outcome of an enrollment status change"""
+    previous_status: Optional[str]  # None when the enrollment was just created
+    status: str
+    changed_at: Optional[datetime]  # None when nothing was changed
+
+    @property
+    def changed(self):
+        return self.changed_at is not None
+
+
+def _enrollment_total(aggregate, status):
+    """Correlated subquery aggregating a student's enrollments with a given status"""
+    totals = Enrollment.objects.filter(
+        student=OuterRef('pk'),
+        status=status
+    ).order_by().values('student').annotate(total=aggregate).values('total')
+    return Coalesce(Subquery(totals, output_field=models.IntegerField()), 0)
+
+
+class StudentQuerySet(models.QuerySet):
+    """Custom queryset for Student model"""
+
+    def with_enrollment_summary(self, fields=None):
+        """
+        Load everything StudentSerializer needs in a fixed number of queries.
+
+        Active enrollments (with their courses) are prefetched into
+        `prefetched_active_enrollments`, and the credit totals and active
+        course count are annotated as `credits_enrolled_total`,
+        `credits_earned_total` and `active_courses_total`.
+
+        When `fields` (a set of serializer field names) is given, only the
+        columns, joins, prefetches and annotations those fields need are
+        loaded.
+        """
+        def wanted(*names):
+            return fields is None or any(name in fields for name in names)
+
+        queryset = self
+        columns = None
+        if fields is not None:
+            columns = {'student_id'} | (fields & {
+                field.name for field in self.model._meta.concrete_fields})
+
+        if wanted('full_name', 'email', 'user_details'):
+            queryset = queryset.select_related('user')
+            if columns is not None:
+                columns.add('user')
+                if 'user_details' not in fields:
+                    columns |= {'user__username', 'user__first_name',
+                                'user__last_name', 'user__email'}
+
+        if wanted('courses'):
+            queryset = queryset.prefetch_related('courses')
+
+        if wanted('academic_summary'):
+            queryset = queryset.select_related('academic_summary')
+            if columns is not None:
+                columns.add('academic_summary')
+
+        if wanted('active_enrollments', 'active_courses'):
+            active_enrollments = Enrollment.objects.filter(
+                status='enrolled').with_course_details()
+            queryset = queryset.prefetch_related(
+                Prefetch('enrollments', queryset=active_enrollments,
+                         to_attr='prefetched_active_enrollments'))
+
+        annotations = {}
+        if wanted('total_credits_enrolled'):
+            annotations['credits_enrolled_total'] = _enrollment_total(
+                Sum('course__credits'), 'enrolled')
+        if wanted('total_credits_earned'):
+            annotations['credits_earned_total'] = _enrollment_total(
+                Sum('credits_earned'), 'completed')
+        if wanted('active_courses_count'):
+            annotations['active_courses_total'] = _enrollment_total(
+                Count('enrollment_id'), 'enrolled')
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+
+        if columns is not None:
+            queryset = queryset.only(*columns)
+        return queryset
+
+
+class EnrollmentQuerySet(models.QuerySet):
+    """Custom queryset for Enrollment model"""
+
+    def with_course_details(self, fields=None):
+        """
+        Load the course data EnrollmentSerializer renders without per-row queries.
+
+        When `fields` (a set of serializer field names) is given, the course
+        is only joined or prefetched if a course field was requested and
+        enrollment columns are limited to the requested ones.
+        """
+        from courses.models import Course
+
+        def wanted(*names):
+            return fields is None or any(name in fields for name in names)
+
+        queryset = self
+        columns = None
+        if fields is not None:
+            # student is kept so the enrollments related manager can attach
+            # the known student without reloading the deferred column
+            columns = {'enrollment_id', 'student'} | (fields & {
+                field.name for field in self.model._meta.concrete_fields})
+
+        if wanted('course_details'):
+            queryset = queryset.prefetch_related(
+                Prefetch('course', queryset=Course.objects.with_enrollment_counts()))
+            if columns is not None:
+                columns.add('course')
+        elif wanted('course_name', 'course_code'):
+            queryset = queryset.select_related('course')
+            if columns is not None:
+                columns |= {'course', 'course__course_name',
+                            'course__course_code'}
+
+        if columns is not None:
+            queryset = queryset.only(*columns)
+        return queryset
+
+    @retry_on_deadlock
+    def transition(self, student_id, course_id, to_status, from_statuses, **changes):
+        """
+        Compare-and-set the status of the (student, course) enrollment.
+
+        Each candidate in from_statuses is tried with a single
+        UPDATE ... WHERE status = <candidate>, most likely first, so the
+        counters know which status the row left; the UPDATE is atomic, so
+        two concurrent transitions can never both apply. Returns an
+        EnrollmentTransition, or None when the row was in none of
+        from_statuses (or does not exist).
+
+        Moving out of (or into) a graded status without the new grade and
+        credits needs the row's grade for the statistics rollup, so the
+        row is then read with a lock first and only its current status tried.
+        """
+        from courses.models import Course, CourseStatistic, GRADED_ENROLLMENT_STATUSES
+
+        now = timezone.now()
+        rows = self.filter(student_id=student_id, course_id=course_id)
+        needs_grade = (
+            any(status in GRADED_ENROLLMENT_STATUSES for status in from_statuses) or
+            (to_status in GRADED_ENROLLMENT_STATUSES and
+             not {'grade', 'credits_earned'} <= changes.keys()))
+        with transaction.atomic():
+            old_grade = old_credits = None
+            if needs_grade:
+                current = rows.select_for_update().values_list(
+                    'status', 'grade', 'credits_earned').first()
+                if current is None or current[0] not in from_statuses:
+                    return None
+                from_statuses = (current[0],)
+                _, old_grade, old_credits = current
+
+            for from_status in from_statuses:
+                # update() skips auto_now, so updated_at is set explicitly
+                if rows.filter(status=from_status).update(
+                        status=to_status, updated_at=now, **changes):
+                    Course.objects.record_enrollment_transition(
+                        course_id, from_status, to_status)
+                    CourseStatistic.objects.record(
+                        course_id,
+                        (from_status, old_grade, old_credits),
+                        (to_status, changes.get('grade', old_grade),
+                         changes.get('credits_earned', old_credits)))
+                    invalidate_models('students.Enrollment', 'courses.Course')
+                    return EnrollmentTransition(from_status, to_status, now)
+        return None
+
+    @retry_on_deadlock
+    def enroll(self, student_id, course_id, capacity=None):
+        """
+        Enroll a student in a course, creating or reactivating the enrollment.
+
+        The enrollment is inserted directly; when the unique (student,
+        course) constraint shows it already exists, its status is read with
+        a row lock and reactivated with a compare-and-set instead, so
+        concurrent calls never raise IntegrityError. Returns the resulting
+        EnrollmentTransition.
+
+        When the course has a capacity, pass it so the course row is locked
+        and CourseFullError raised once every seat is taken. Free seats are
+        held for the course's waitlist first: a student not on it only gets
+        a seat when there are more free seats than waitlisted students, and
+        a waitlisted student when there are more than students ahead of them
+        (their waitlist entry is then removed).
+        """
+        from courses.models import Course, CourseFullError, CourseStatistic
+
+        now = timezone.now()
+        with transaction.atomic():
+            if capacity is not None:
+                _, taken = Course.objects.lock_seats(course_id)
+                free = capacity - taken
+                if free > 0:
+                    free -= Waitlist.objects.seats_held(course_id, student_id)
+                if free <= 0:
+                    current = self.filter(
+                        student_id=student_id, course_id=course_id
+                    ).values_list('status', flat=True).first()
+                    if current == 'enrolled':
+                        return EnrollmentTransition(current, current, None)
+                    raise CourseFullError('Course is full')
+
+            try:
+                with transaction.atomic():
+                    self.create(student_id=student_id, course_id=course_id,
+                                status='enrolled', enrollment_date=now)
+            except IntegrityError:
+                # The enrollment exists; a locking read returns its latest
+                # status (not a REPEATABLE READ snapshot) for the compare-and-set
+                current, enrolled_at = self.select_for_update().filter(
+                    student_id=student_id, course_id=course_id
+                ).values_list('status', 'enrollment_date').first() or (None, None)
+                if current is None:
+                    # Not a duplicate: the student or course does not exist
+                    raise
+                if current not in REENROLLABLE_STATUSES:
+                    return EnrollmentTransition(current, current, None)
+                result = self.transition(
+                    student_id, course_id, 'enrolled', (current,),
+                    enrollment_date=now)
+                if result is not None:
+                    # The enrollment moves to this month's trend facts
+                    EnrollmentMonthlyFact.objects.mark_stale(course_id, [enrolled_at])
+                    if capacity is not None:
+                        Waitlist.objects.filter(
+                            student_id=student_id, course_id=course_id).delete()
+                return result
+
+            Course.objects.record_enrollment_transition(course_id, None, 'enrolled')
+            CourseStatistic.objects.record(course_id, new=('enrolled', None, None))
+            if capacity is not None:
+                Waitlist.objects.filter(
+                    student_id=student_id, course_id=course_id).delete()
+        return EnrollmentTransition(None, 'enrolled', now)
+
+    def allocate_seats(self, course_id, student_ids, seats=None, waitlist=True,
+                       reenrollable=REENROLLABLE_STATUSES):
+        """
+        Enroll students in a course in order until its seats run out.
+
+        Locks the course row once and writes the whole allocation with one
+        INSERT, one UPDATE per reactivated status and one counter update, so
+        the number of statements does not grow with the number of students.
+        Must run inside a transaction; callers that already hold the lock
+        pass its (capacity, taken) result as seats. Returns
+        {student_id: outcome} with outcome 'enrolled' (new enrollment),
+        'reactivated' (an enrollment in one of the reenrollable statuses),
+        'already_enrolled' (any other existing enrollment) or 'full'.
+
+        Seats held for the course's waitlist are not allocated unless
+        waitlist is False, as when the waitlist itself is being promoted.
+        """
+        from courses.models import Course, CourseStatistic, statistic_cell
+
+        capacity, taken = seats or Course.objects.lock_seats(course_id)
+        free = None if capacity is None else max(0, capacity - taken)
+        if free and waitlist:
+            free = max(0, free - Waitlist.objects.seats_held(course_id))
+
+        student_ids = list(dict.fromkeys(student_ids))
+        rows = self.select_for_update().filter(
+            course_id=course_id, student_id__in=student_ids
+        ).values_list('student_id', 'status', 'grade', 'credits_earned',
+                      'enrollment_date')
+        existing = {}
+        enrolled_at = {}
+        for student_id, status, grade, credits_earned, enrollment_date in rows:
+            existing[student_id] = (status, grade, credits_earned)
+            enrolled_at[student_id] = enrollment_date
+
+        outcomes = {}
+        new_ids = []
+        reactivated = {}
+        for student_id in student_ids:
+            current = existing.get(student_id, (None,))[0]
+            if current is not None and current not in reenrollable:
+                outcomes[student_id] = 'already_enrolled'
+            elif free is not None and free <= 0:
+                outcomes[student_id] = 'full'
+            else:
+                if free is not None:
+                    free -= 1
+                if current is None:
+                    new_ids.append(student_id)
+                    outcomes[student_id] = 'enrolled'
+                else:
+                    reactivated.setdefault(current, []).append(student_id)
+                    outcomes[student_id] = 'reactivated'
+
+        now = timezone.now()
+        self.bulk_create([
+            self.model(student_id=student_id, course_id=course_id,
+                       status='enrolled', enrollment_date=now)
+            for student_id in new_ids
+        ])
+        changes = {'enrolled': len(new_ids)}
+        cells = {}
+        for from_status, ids in reactivated.items():
+            # update() skips auto_now, so updated_at is set explicitly
+            self.filter(
+                course_id=course_id, student_id__in=ids, status=from_status
+            ).update(status='enrolled', enrollment_date=now, updated_at=now)
+            changes['enrolled'] += len(ids)
+            changes[from_status] = -len(ids)
+            EnrollmentMonthlyFact.objects.mark_stale(
+                course_id, [enrolled_at[student_id] for student_id in ids])
+            for student_id in ids:
+                key, credits = statistic_cell(*existing[student_id])
+                enrollments, credit_total = cells.get(key, (0, 0))
+                cells[key] = (enrollments - 1, credit_total - credits)
+
+        if changes['enrolled']:
+            # The course row is already locked, so update it directly
+            Course.objects.record_enrollment_changes(
+                course_id, changes, use_shard=False)
+            cells[statistic_cell('enrolled')[0]] = (changes['enrolled'], 0)
+            CourseStatistic.objects.record_cells(course_id, cells)
+            invalidate_models('students.Enrollment', 'courses.Course')
+        return outcomes
+
+
 class Student(models.Model):
     """
     Student model to store student information
@@ -54,11 +397,22 @@ class Student(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = StudentQuerySet.as_manager()
+
     class Meta:
         db_table = 'students'
         verbose_name = 'Student'
         verbose_name_plural = 'Students'
         ordering = ['student_number']
+        # Back the keyset orderings used by the student list endpoint
+        indexes = [
+            models.Index(fields=['enrollment_date', 'student_id'],
+                         name='students_enroll_date_idx'),
+            models.Index(fields=['created_at', 'student_id'],
+                         name='students_created_at_idx'),
+            # Lets the dashboard count students by status from the index alone
+            models.Index(fields=['status'], name='students_status_idx'),
+        ]
 
     def __str__(self):
         return f"{self.student_number} - {self.user.get_full_name() or self.user.username}"
@@ -89,27 +443,20 @@ class Student(models.Model):
         return self.courses.filter(enrollments__status='enrolled')
 
     def enroll_in_course(self, course):
-        """Enroll student in a course"""
-        enrollment, created = Enrollment.objects.get_or_create(
-            student=self,
-            course=course,
-            defaults={'status': 'enrolled'}
-        )
-        if not created and enrollment.status != 'enrolled':
-            enrollment.status = 'enrolled'
-            enrollment.enrollment_date = timezone.now()
-            enrollment.save()
-        return enrollment
+        """Enroll student in a course (raises CourseFullError when it is full)"""
+        Enrollment.objects.enroll(self.pk, course.pk, capacity=course.capacity)
+        return self.enrollments.get(course=course)
 
     def unenroll_from_course(self, course):
-        """Unenroll student from a course"""
-        try:
-            enrollment = Enrollment.objects.get(student=self, course=course)
-            enrollment.status = 'withdrawn'
-            enrollment.save()
-            return enrollment
-        except Enrollment.DoesNotExist:
-            return None
+        """
+        Unenroll student from a course.
+
+        The freed seat is handed to the course's waitlist by the next
+        promote_waitlists pass, not here.
+        """
+        Enrollment.objects.transition(
+            self.pk, course.pk, 'withdrawn', WITHDRAWABLE_STATUSES)
+        return self.enrollments.filter(course=course).first()
 
     def is_enrolled_in_course(self, course):
         """Check if student is enrolled in a specific course"""
@@ -126,29 +473,35 @@ class Student(models.Model):
     def save(self, *args, **kwargs):
         # Generate student number if not provided
         if not self.student_number:
-            from django.utils import timezone
-            year = timezone.now().year
-            # Get the latest student number for this year
-            latest_student = Student.objects.filter(
-                student_number__startswith=f"STU{year}"
-            ).order_by('student_number').last()
-
-            if latest_student:
-                # Extract the number and increment
-                try:
-                    last_number = int(latest_student.student_number[-4:])
-                    new_number = last_number + 1
-                except (ValueError, IndexError):
-                    new_number = 1
-            else:
-                new_number = 1
-
-            self.student_number = f"STU{year}{new_number:04d}"
+            from .numbering import allocate_student_number
+            self.student_number = allocate_student_number()
 
         self.full_clean()
         super().save(*args, **kwargs)
 
 
+class StudentNumberSequence(models.Model):
+    """
+    Next free student number sequence value for each year
+    """
+    year = models.PositiveSmallIntegerField(
+        primary_key=True,
+        help_text="Registration year the sequence belongs to"
+    )
+    next_value = models.PositiveIntegerField(
+        default=1,
+        help_text="Next sequence value that has not been reserved"
+    )
+
+    class Meta:
+        db_table = 'student_number_sequences'
+        verbose_name = 'Student Number Sequence'
+        verbose_name_plural = 'Student Number Sequences'
+
+    def __str__(self):
+        return f"{self.year}: {self.next_value}"
+
+
 class Enrollment(models.Model):
     """
     Intermediate model for student-course enrollment with additional information
@@ -226,6 +579,8 @@ class Enrollment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = EnrollmentQuerySet.as_manager()
+
     class Meta:
         db_table = 'enrollments'
         verbose_name = 'Enrollment'
@@ -233,6 +588,11 @@ class Enrollment(models.Model):
         ordering = ['-enrollment_date']
         # Prevent duplicate enrollments
         unique_together = [['student', 'course']]
+        # Range scans of the monthly trend refresh
+        indexes = [
+            models.Index(fields=['updated_at'], name='enrollment_updated_idx'),
+            models.Index(fields=['enrollment_date'], name='enrollment_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.student.student_number} - {self.course.course_code} ({self.status})"
@@ -248,20 +608,43 @@ class Enrollment(models.Model):
         return self.status == 'completed'
 
     def complete_course(self, grade=None):
-        """Mark the course as completed"""
-        self.status = 'completed'
-        self.completion_date = timezone.now()
-        if grade:
-            self.grade = grade
-        if not self.credits_earned:
-            self.credits_earned = self.course.credits
-        self.save()
+        """
+        Mark the course as completed and update the student's academic summary.
+
+        Returns False if the enrollment's status changed since it was loaded.
+        """
+        from .academics import update_academic_summary
+
+        changes = {
+            'completion_date': timezone.now(),
+            'grade': grade or self.grade,
+            'credits_earned': self.credits_earned or self.course.credits,
+        }
+        with transaction.atomic():
+            if not self._apply_transition('completed', changes):
+                return False
+            update_academic_summary(self.student_id)
+        return True
 
     def withdraw_from_course(self):
-        """Withdraw from the course"""
-        self.status = 'withdrawn'
-        self.grade = 'W'
-        self.save()
+        """
+        Withdraw from the course.
+
+        Returns False if the enrollment's status changed since it was loaded.
+        """
+        return self._apply_transition('withdrawn', {'grade': 'W'})
+
+    def _apply_transition(self, to_status, changes):
+        # Compare-and-set against the status this instance was loaded with
+        result = Enrollment.objects.transition(
+            self.student_id, self.course_id, to_status, (self.status,), **changes)
+        if result is None:
+            return False
+        for field_name, value in changes.items():
+            setattr(self, field_name, value)
+        self.status = to_status
+        self.updated_at = result.changed_at
+        return True
 
     def clean(self):
         """Custom validation"""
@@ -274,3 +657,323 @@ class Enrollment(models.Model):
         # Ensure credits earned matches course credits when completed
         if self.status == 'completed' and not self.credits_earned:
             self.credits_earned = self.course.credits
+
+
+class EnrollmentRequest(models.Model):
+    """
+    Queued enroll request for a course in rush mode
+
+    The request_id doubles as the ticket returned to the client; the
+    process_enrollment_queue workers allocate seats and record the outcome.
+    """
+    REQUEST_STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('enrolled', 'Enrolled'),
+        ('already_enrolled', 'Already Enrolled'),
+        ('full', 'Course Full'),
+        ('failed', 'Failed'),
+    ]
+
+    request_id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False,
+        help_text="Ticket identifying the request"
+    )
+    student = models.ForeignKey(
+        Student,
+        on_delete=models.CASCADE,
+        related_name='enrollment_requests',
+        help_text="Student asking to enroll"
+    )
+    course = models.ForeignKey(
+        'courses.Course',
+        on_delete=models.CASCADE,
+        related_name='enrollment_requests',
+        help_text="Course requested"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=REQUEST_STATUS_CHOICES,
+        default='pending',
+        help_text="Outcome of the request"
+    )
+    message = models.CharField(
+        max_length=255,
+        blank=True,
+        default='',
+        help_text="Details about the outcome"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text="When a worker processed the request"
+    )
+
+    class Meta:
+        db_table = 'enrollment_requests'
+        verbose_name = 'Enrollment Request'
+        verbose_name_plural = 'Enrollment Requests'
+        ordering = ['created_at']
+        # Workers claim pending requests oldest first
+        indexes = [
+            models.Index(fields=['status', 'created_at'],
+                         name='enroll_req_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.student_id} -> {self.course_id} ({self.status})"
+
+
+class WaitlistQuerySet(models.QuerySet):
+    """Custom queryset for Waitlist model"""
+
+    def with_rank(self):
+        """
+        Annotate entries with their place in their course's waitlist.
+
+        waitlist_rank is 1 for the next student to be promoted and
+        waitlist_length the number of students waiting. Positions may have
+        gaps left by students who left, so both are counted over the
+        (course, position) index rather than derived from the positions.
+        """
+        same_course = Waitlist.objects.filter(
+            course=OuterRef('course')).order_by().values('course')
+        return self.annotate(
+            waitlist_rank=Subquery(same_course.filter(
+                position__lte=OuterRef('position')
+            ).annotate(count=Count('pk')).values('count')),
+            waitlist_length=Subquery(
+                same_course.annotate(count=Count('pk')).values('count')),
+        )
+
+    def seats_held(self, course_id, student_id=None):
+        """
+        Number of a course's free seats reserved for its waitlist.
+
+        That is every waitlisted student, or only those ahead of student_id
+        when the student is on the waitlist.
+        """
+        entries = self.filter(course_id=course_id)
+        if student_id is not None:
+            position = entries.filter(student_id=student_id).values('position')[:1]
+            entries = entries.filter(
+                Q(position__lt=Subquery(position)) | ~Exists(position))
+        return entries.count()
+
+    def join(self, student_id, course_id):
+        """
+        Add a student to the end of a course's waitlist.
+
+        Returns (entry, created); a student already on the waitlist keeps
+        their place.
+        """
+        from courses.models import Course
+
+        with transaction.atomic():
+            # Waitlist writes for a course serialize on its row lock
+            Course.objects.lock_seats(course_id)
+            entry = self.filter(student_id=student_id, course_id=course_id).first()
+            if entry is not None:
+                return entry, False
+            last = self.filter(course_id=course_id).order_by(
+                '-position').values_list('position', flat=True).first()
+            entry = self.create(student_id=student_id, course_id=course_id,
+                                position=(last or 0) + 1)
+        return entry, True
+
+    def leave(self, student_id, course_id):
+        """
+        Remove a student from a course's waitlist; returns False if not on it.
+
+        The entries behind it keep their positions, so leaving is a single
+        DELETE however long the waitlist is.
+        """
+        deleted, _ = self.filter(student_id=student_id, course_id=course_id).delete()
+        return bool(deleted)
+
+
+class Waitlist(models.Model):
+    """
+    Student waiting for a seat in a full course
+
+    Seats freed by withdrawals are handed to the waitlist, lowest position
+    first, by the promote_waitlists background pass.
+    """
+    waitlist_id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False,
+        help_text="Unique identifier for the waitlist entry"
+    )
+    student = models.ForeignKey(
+        Student,
+        on_delete=models.CASCADE,
+        related_name='waitlist_entries',
+        help_text="Student waiting for a seat"
+    )
+    course = models.ForeignKey(
+        'courses.Course',
+        on_delete=models.CASCADE,
+        related_name='waitlist_entries',
+        help_text="Course the student is waiting for"
+    )
+    position = models.PositiveIntegerField(
+        help_text="Place in the course's waitlist (lowest is promoted first)"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = WaitlistQuerySet.as_manager()
+
+    class Meta:
+        db_table = 'waitlists'
+        verbose_name = 'Waitlist Entry'
+        verbose_name_plural = 'Waitlist Entries'
+        ordering = ['course', 'position']
+        unique_together = [['student', 'course']]
+        indexes = [
+            models.Index(fields=['course', 'position'],
+                         name='waitlist_course_pos_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.student_id} waiting for {self.course_id} (#{self.position})"
+
+
+class StudentAcademicSummary(models.Model):
+    """
+    Materialized GPA and credit totals of a student
+
+    Rebuilt for all students by refresh_academic_summaries and kept up to
+    date for single students by Enrollment.complete_course (see
+    students.academics).
+    """
+    student = models.OneToOneField(
+        Student,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='academic_summary',
+        help_text="Student the summary belongs to"
+    )
+    cumulative_gpa = models.DecimalField(
+        max_digits=4,
+        decimal_places=3,
+        blank=True,
+        null=True,
+        help_text="Credit-weighted GPA over all graded courses"
+    )
+    term = models.CharField(
+        max_length=20,
+        blank=True,
+        default='',
+        help_text="Most recent term with graded courses"
+    )
+    term_gpa = models.DecimalField(
+        max_digits=4,
+        decimal_places=3,
+        blank=True,
+        null=True,
+        help_text="Credit-weighted GPA of the most recent term"
+    )
+    credits_attempted = models.PositiveIntegerField(
+        default=0,
+        help_text="Credits of all graded courses"
+    )
+    credits_earned = models.PositiveIntegerField(
+        default=0,
+        help_text="Credits of graded courses passed"
+    )
+    graded_courses = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of graded courses"
+    )
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'student_academic_summaries'
+        verbose_name = 'Student Academic Summary'
+        verbose_name_plural = 'Student Academic Summaries'
+
+    def __str__(self):
+        return f"{self.student_id}: GPA {self.cumulative_gpa}"
+
+
+def month_of(value):
+    """First day of the (local time) month of a datetime, as TruncMonth computes it"""
+    return timezone.localtime(value).date().replace(day=1)
+
+
+class EnrollmentMonthlyFactQuerySet(models.QuerySet):
+    """Custom queryset for EnrollmentMonthlyFact model"""
+
+    def mark_stale(self, course_id, enrollment_dates):
+        """
+        Flag a course's facts for the months of the given enrollment dates.
+
+        Used when an enrollment leaves a month without its updated_at
+        showing it there (deleted, or reactivated with a new enrollment
+        date), so the next refresh recomputes that month.
+        """
+        months = {month_of(value) for value in enrollment_dates if value}
+        if months:
+            self.filter(course_id=course_id, month__in=months, stale=False).update(
+                stale=True)
+
+
+class EnrollmentMonthlyFact(models.Model):
+    """
+    Number of a course's enrollments of one month with a given status
+
+    Months are those of Enrollment.enrollment_date. Maintained by
+    refresh_enrollment_trends (see students.trends), which recomputes only
+    the months touched since its last run.
+    """
+    month = models.DateField(help_text="First day of the month")
+    course = models.ForeignKey(
+        'courses.Course',
+        on_delete=models.CASCADE,
+        related_name='monthly_facts',
+        help_text="Course the enrollments belong to"
+    )
+    status = models.CharField(max_length=20, help_text="Enrollment status")
+    enrollments = models.PositiveIntegerField(default=0)
+    stale = models.BooleanField(
+        default=False,
+        help_text="Set when the month must be recomputed on the next refresh"
+    )
+
+    objects = EnrollmentMonthlyFactQuerySet.as_manager()
+
+    class Meta:
+        db_table = 'enrollment_monthly_facts'
+        verbose_name = 'Enrollment Monthly Fact'
+        verbose_name_plural = 'Enrollment Monthly Facts'
+        ordering = ['month', 'course', 'status']
+        unique_together = [['month', 'course', 'status']]
+        indexes = [
+            models.Index(fields=['course', 'month'],
+                         name='enroll_fact_course_month_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.month:%Y-%m} {self.course_id} {self.status}: {self.enrollments}"
+
+
+class RefreshWatermark(models.Model):
+    """Point in time up to which an incrementally refreshed rollup is current"""
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text="Rows changed after this time are picked up by the next refresh"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'refresh_watermarks'
+        verbose_name = 'Refresh Watermark'
+        verbose_name_plural = 'Refresh Watermarks'
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
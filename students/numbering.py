@@ -0,0 +1,118 @@
+"""
+Student number allocation for Student Course Management System
+
+Student numbers have the form STU{year}{sequence:04d}. Instead of scanning
+the existing numbers on every insert, each thread reserves a block of
+sequence values from the StudentNumberSequence row for the year and hands
+them out from memory, so allocation costs one locked round trip per block
+and concurrent creations never collide. A block reserved inside a
+transaction is only reused after that transaction commits, so within one
+transaction each call reserves its own block. Unused values in a block are
+skipped, which only leaves gaps in the numbering.
+"""
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Length
+from django.utils import timezone
+
+
+_local = threading.local()
+
+
+def get_block_size():
+    """Number of sequence values reserved per allocation round trip"""
+    return max(1, getattr(settings, 'STUDENT_NUMBER_BLOCK_SIZE', 20))
+
+
+def format_student_number(year, value):
+    """Format a sequence value as a student number"""
+    return f"STU{year}{value:04d}"
+
+
+class _Block:
+    """A reserved range [next_value, end) of sequence values for one year"""
+
+    def __init__(self, start, size):
+        self.next_value = start
+        self.end = start + size
+        self.confirmed = False
+
+    def confirm(self):
+        """Called once the transaction that reserved the block has committed"""
+        self.confirmed = True
+
+    def is_usable(self):
+        # A block reserved inside a transaction is only kept once that
+        # transaction commits: after a rollback the reservation is undone
+        # and its values may be handed out again elsewhere, and on_commit
+        # callbacks of a rolled back transaction never run.
+        return self.confirmed and self.next_value < self.end
+
+
+def _initial_value(year):
+    """First sequence value for a year, continuing after existing numbers"""
+    from .models import Student
+
+    prefix = format_student_number(year, 0)[:-4]
+    # Longest first: past 9999 the sequence outgrows its zero padding and
+    # no longer sorts as text
+    latest = Student.objects.filter(
+        student_number__startswith=prefix
+    ).order_by(
+        Length('student_number').desc(), '-student_number'
+    ).values_list('student_number', flat=True).first()
+    try:
+        return int(latest[len(prefix):]) + 1
+    except (TypeError, ValueError):
+        return 1
+
+
+def _reserve_block(year, size):
+    """Reserve `size` sequence values for `year` and return the first one"""
+    from .models import StudentNumberSequence
+
+    with transaction.atomic():
+        sequence = StudentNumberSequence.objects.select_for_update().filter(
+            year=year).first()
+        if sequence is None:
+            sequence, _ = StudentNumberSequence.objects.get_or_create(
+                year=year, defaults={'next_value': _initial_value(year)})
+            sequence = StudentNumberSequence.objects.select_for_update().get(
+                year=year)
+        StudentNumberSequence.objects.filter(year=year).update(
+            next_value=F('next_value') + size)
+        return sequence.next_value
+
+
+def allocate_student_numbers(count, year=None):
+    """Return `count` unused student numbers for `year` (default: this year)"""
+    year = year or timezone.now().year
+    blocks = getattr(_local, 'blocks', None)
+    if blocks is None:
+        blocks = _local.blocks = {}
+
+    numbers = []
+    while len(numbers) < count:
+        block = blocks.get(year)
+        if block is None or not block.is_usable():
+            # Large requests reserve everything they need in one round trip
+            size = max(get_block_size(), count - len(numbers))
+            block = blocks[year] = _Block(_reserve_block(year, size), size)
+            transaction.on_commit(block.confirm)
+
+        take = min(count - len(numbers), block.end - block.next_value)
+        numbers.extend(
+            format_student_number(year, value)
+            for value in range(block.next_value, block.next_value + take)
+        )
+        block.next_value += take
+
+    return numbers
+
+
+def allocate_student_number(year=None):
+    """Return a single unused student number"""
+    return allocate_student_numbers(1, year)[0]
@@ -0,0 +1,256 @@
+"""
+Keyset (cursor) pagination utilities for Student Course Management System
+"""
+import base64
+import binascii
+import json
+import math
+import uuid
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+COUNT_MODES = ('exact', 'estimate', 'none')
+
+
+class InvalidCursor(Exception):
+    """Raised when a cursor token cannot be decoded or does not match the request"""
+
+
+def parse_page_size(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE) -> int:
+    """Parse a page_size query parameter, clamping it to [1, maximum]"""
+    try:
+        page_size = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(page_size, maximum))
+
+
+def parse_ordering(value, allowed_fields, default):
+    """
+    Validate an ordering query parameter against an allow-list.
+
+    Returns the ordering string (optionally prefixed with '-') or None when
+    the requested field is not in allowed_fields.
+    """
+    if not value:
+        return default
+    field_name = value[1:] if value.startswith('-') else value
+    if field_name not in allowed_fields:
+        return None
+    return value
+
+
+def _encode_value(value):
+    """Convert an ordering value into a JSON-safe representation"""
+    if isinstance(value, (datetime, date)):
+        # isoformat() keeps full microsecond precision, which keyset
+        # comparisons on timestamps depend on.
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def encode_cursor(payload: Dict[str, Any]) -> str:
+    """Encode a cursor payload as an opaque URL-safe token"""
+    data = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: str) -> Dict[str, Any]:
+    """Decode an opaque cursor token back into its payload"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (binascii.Error, UnicodeError, ValueError):
+        raise InvalidCursor('Invalid cursor')
+    if not isinstance(payload, dict) or not {'o', 'v', 'k', 'd'} <= payload.keys():
+        raise InvalidCursor('Invalid cursor')
+    return payload
+
+
+def estimate_count(queryset) -> Optional[int]:
+    """
+    Return the planner's row estimate for a queryset instead of running COUNT(*).
+
+    MySQL and PostgreSQL expose the estimate through EXPLAIN; other backends
+    fall back to an exact count.
+    """
+    queryset = queryset.order_by()
+    connection = connections[queryset.db]
+    sql, params = queryset.query.sql_with_params()
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute(f'EXPLAIN {sql}', params)
+            columns = [col[0] for col in cursor.description]
+            row = cursor.fetchone()
+            if row and 'rows' in columns:
+                return int(row[columns.index('rows')] or 0)
+            return None
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]['Plan']['Plan Rows'])
+
+    return queryset.count()
+
+
+def count_rows(queryset, count_mode: str) -> Optional[int]:
+    """Row count of a queryset for a ?count= mode: exact, estimated or None"""
+    if count_mode == 'exact':
+        return queryset.count()
+    if count_mode == 'estimate':
+        return estimate_count(queryset)
+    return None
+
+
+def paginate_offset(queryset, page, page_size: int, count_mode: str = 'exact') -> Dict[str, Any]:
+    """
+    Return page number `page` of an ordered queryset.
+
+    With the exact count this is Paginator.get_page, so out-of-range pages
+    fall back to the last one. Otherwise no COUNT(*) runs: one extra row is
+    fetched to tell whether a next page exists, and 'count' and
+    'total_pages' come from the planner's estimate or are None.
+    """
+    if count_mode == 'exact':
+        paginator = Paginator(queryset, page_size)
+        page_obj = paginator.get_page(page)
+        return {
+            'results': page_obj.object_list,
+            'count': paginator.count,
+            'next': page_obj.has_next(),
+            'previous': page_obj.has_previous(),
+            'page': page_obj.number,
+            'total_pages': paginator.num_pages,
+        }
+
+    page = max(1, page)
+    offset = (page - 1) * page_size
+    rows = list(queryset[offset:offset + page_size + 1])
+    count = count_rows(queryset, count_mode)
+    return {
+        'results': rows[:page_size],
+        'count': count,
+        'next': len(rows) > page_size,
+        'previous': page > 1,
+        'page': page,
+        'total_pages': max(1, math.ceil(count / page_size)) if count is not None else None,
+    }
+
+
+class KeysetPaginator:
+    """
+    Seek-based paginator ordering on (ordering field, primary key).
+
+    Each page is fetched with a WHERE clause positioned after the last row of
+    the previous page, so the cost of a page does not depend on how deep it
+    is and no COUNT(*) or OFFSET is needed.
+    """
+
+    def __init__(self, queryset, ordering: str, page_size: int):
+        self.queryset = queryset
+        self.ordering = ordering
+        self.page_size = page_size
+        self.descending = ordering.startswith('-')
+        self.field_name = ordering.lstrip('-')
+        self.pk_name = queryset.model._meta.pk.name
+        self.field = queryset.model._meta.get_field(self.field_name)
+
+    def _order_by(self, reverse: bool):
+        descending = self.descending != reverse
+        prefix = '-' if descending else ''
+        return [f'{prefix}{self.field_name}', f'{prefix}{self.pk_name}']
+
+    def _seek_filter(self, value, key, reverse: bool) -> Q:
+        lookup = 'lt' if self.descending != reverse else 'gt'
+        return (
+            Q(**{f'{self.field_name}__{lookup}': value}) |
+            Q(**{self.field_name: value, f'{self.pk_name}__{lookup}': key})
+        )
+
+    def _make_cursor(self, obj, direction: str) -> str:
+        return encode_cursor({
+            'o': self.ordering,
+            'v': _encode_value(getattr(obj, self.field_name)),
+            'k': _encode_value(obj.pk),
+            'd': direction,
+        })
+
+    def paginate(self, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Return the page located by cursor (or the first page).
+
+        The result holds 'results' (a list of model instances) plus opaque
+        'next' and 'previous' cursors, either of which may be None.
+        """
+        reverse = False
+        queryset = self.queryset
+
+        if cursor:
+            payload = decode_cursor(cursor)
+            if payload['o'] != self.ordering:
+                raise InvalidCursor('Cursor does not match the requested ordering')
+            reverse = payload['d'] == 'p'
+            try:
+                value = self.field.to_python(payload['v'])
+                key = self.queryset.model._meta.pk.to_python(payload['k'])
+            except Exception:
+                raise InvalidCursor('Invalid cursor')
+            queryset = queryset.filter(self._seek_filter(value, key, reverse))
+
+        rows = list(queryset.order_by(
+            *self._order_by(reverse))[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if reverse:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, bool(cursor)
+
+        return {
+            'results': rows,
+            'next': self._make_cursor(rows[-1], 'n') if rows and has_next else None,
+            'previous': self._make_cursor(rows[0], 'p') if rows and has_previous else None,
+        }
+
+
+def iterate_keyset(queryset, ordering: str, chunk_size: int = 2000):
+    """
+    Yield every row of a values() queryset in chunks of chunk_size.
+
+    Each chunk is a separate seek query on (ordering field, primary key), so
+    memory stays flat on backends without server-side cursors (MySQL) and no
+    transaction or cursor is held open while the caller consumes rows. The
+    values() queryset must include the ordering field and the primary key.
+    """
+    descending = ordering.startswith('-')
+    field_name = ordering.lstrip('-')
+    pk_name = queryset.model._meta.pk.name
+    prefix = '-' if descending else ''
+    lookup = 'lt' if descending else 'gt'
+    queryset = queryset.order_by(f'{prefix}{field_name}', f'{prefix}{pk_name}')
+
+    chunk = list(queryset[:chunk_size])
+    while chunk:
+        yield from chunk
+        if len(chunk) < chunk_size:
+            return
+        last = chunk[-1]
+        chunk = list(queryset.filter(
+            Q(**{f'{field_name}__{lookup}': last[field_name]}) |
+            Q(**{field_name: last[field_name], f'{pk_name}__{lookup}': last[pk_name]})
+        )[:chunk_size])
@@ -1,15 +1,25 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from .models import Student, Enrollment
-from courses.models import Course
-from courses.serializers import CourseSerializer
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from .models import (
+    Student,
+    StudentAcademicSummary,
+    Enrollment,
+    EnrollmentRequest,
+    Waitlist,
+    WITHDRAWABLE_STATUSES,
+)
+from courses.models import Course, CourseFullError
+from courses.serializers import CourseSerializer, SparseFieldsMixin
 from authentication.serializers import UserProfileSerializer
 
 User = get_user_model()
 
 
-class EnrollmentSerializer(serializers.ModelSerializer):
+class EnrollmentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for Enrollment model"""
+    expandable_fields = ('course_details',)
+
     course_details = CourseSerializer(source='course', read_only=True)
     course_name = serializers.CharField(
         source='course.course_name', read_only=True)
@@ -34,16 +44,30 @@ class StudentBasicSerializer(serializers.ModelSerializer):
                   'email', 'status', 'enrollment_date', 'active_courses_count')
 
     def get_active_courses_count(self, obj):
+        if hasattr(obj, 'active_courses_total'):
+            return obj.active_courses_total
         return obj.active_enrollments.count()
 
 
-class StudentSerializer(serializers.ModelSerializer):
+class AcademicSummarySerializer(serializers.ModelSerializer):
+    """Serializer for a student's materialized GPA and credit totals"""
+
+    class Meta:
+        model = StudentAcademicSummary
+        exclude = ('student',)
+
+
+class StudentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Full serializer for Student model"""
+    expandable_fields = ('active_enrollments', 'active_courses', 'user_details',
+                         'academic_summary')
+
     full_name = serializers.ReadOnlyField()
     email = serializers.ReadOnlyField()
-    active_enrollments = EnrollmentSerializer(many=True, read_only=True)
-    active_courses = CourseSerializer(many=True, read_only=True)
+    active_enrollments = serializers.SerializerMethodField()
+    active_courses = serializers.SerializerMethodField()
     user_details = UserProfileSerializer(source='user', read_only=True)
+    academic_summary = serializers.SerializerMethodField()
     total_credits_enrolled = serializers.SerializerMethodField()
     total_credits_earned = serializers.SerializerMethodField()
 
@@ -54,12 +78,42 @@ class StudentSerializer(serializers.ModelSerializer):
                             'full_name', 'email', 'active_enrollments',
                             'active_courses', 'user_details')
 
+    def get_academic_summary(self, obj):
+        """GPA and credit totals, or None before any course is graded"""
+        try:
+            summary = obj.academic_summary
+        except StudentAcademicSummary.DoesNotExist:
+            return None
+        return AcademicSummarySerializer(summary).data
+
+    def _get_active_enrollments(self, obj):
+        """Use enrollments prefetched by with_enrollment_summary() when available"""
+        if hasattr(obj, 'prefetched_active_enrollments'):
+            return obj.prefetched_active_enrollments
+        return obj.active_enrollments.select_related('course')
+
+    def get_active_enrollments(self, obj):
+        """Get active course enrollments"""
+        return EnrollmentSerializer(self._get_active_enrollments(obj), many=True).data
+
+    def get_active_courses(self, obj):
+        """Get courses the student is actively enrolled in"""
+        courses = sorted(
+            (enrollment.course for enrollment in self._get_active_enrollments(obj)),
+            key=lambda course: course.course_name
+        )
+        return CourseSerializer(courses, many=True).data
+
     def get_total_credits_enrolled(self, obj):
         """Get total credits from active enrollments"""
-        return sum([enrollment.course.credits for enrollment in obj.active_enrollments.all()])
+        if hasattr(obj, 'credits_enrolled_total'):
+            return obj.credits_enrolled_total
+        return sum([enrollment.course.credits for enrollment in self._get_active_enrollments(obj)])
 
     def get_total_credits_earned(self, obj):
         """Get total credits earned from completed courses"""
+        if hasattr(obj, 'credits_earned_total'):
+            return obj.credits_earned_total
         return sum([enrollment.credits_earned or 0 for enrollment in obj.enrollments.filter(status='completed')])
 
     def validate_user(self, value):
@@ -171,11 +225,36 @@ class StudentCreateSerializer(serializers.ModelSerializer):
 
             # Enroll in course if provided
             if course:
-                student.enroll_in_course(course)
+                try:
+                    student.enroll_in_course(course)
+                except CourseFullError:
+                    raise serializers.ValidationError({'course': "Course is full"})
 
             return student
 
 
+class StudentBulkCreateRowSerializer(serializers.Serializer):
+    """
+    Serializer for one row of a bulk student import.
+
+    Mirrors StudentCreateSerializer's input but runs no queries: username
+    and email uniqueness and the course lookup are checked for the whole
+    batch at once (see students.bulk).
+    """
+    username = serializers.CharField(
+        max_length=150, validators=[UnicodeUsernameValidator()])
+    email = serializers.EmailField(max_length=254)
+    first_name = serializers.CharField(max_length=150)
+    last_name = serializers.CharField(max_length=150)
+    password = serializers.CharField(write_only=True)
+    phone_number = serializers.CharField(
+        max_length=15, required=False, allow_blank=True)
+    date_of_birth = serializers.DateField(required=False, allow_null=True)
+    address = serializers.CharField(required=False, allow_blank=True)
+    course = serializers.UUIDField(required=False, allow_null=True)
+    enrollment_date = serializers.DateField(required=False)
+
+
 class StudentUpdateSerializer(serializers.ModelSerializer):
     """Serializer for updating student information"""
     full_name = serializers.ReadOnlyField()
@@ -207,13 +286,44 @@ class EnrollStudentSerializer(serializers.Serializer):
         student = self.context['student']
         course = validated_data['course_id']
 
-        # Check if already enrolled
-        if student.is_enrolled_in_course(course):
+        try:
+            result = Enrollment.objects.enroll(
+                student.pk, course.pk, capacity=course.capacity)
+        except CourseFullError:
+            raise serializers.ValidationError("Course is full")
+        if not result.changed:
             raise serializers.ValidationError(
                 "Student is already enrolled in this course")
 
-        enrollment = student.enroll_in_course(course)
-        return enrollment
+        return student.enrollments.get(course=course)
+
+
+class BulkEnrollSerializer(serializers.Serializer):
+    """Serializer for enrolling many students in a course at once"""
+    # Keys accepted in `filter`; they mean the same as on the student list
+    FILTER_KEYS = ('search', 'status', 'course')
+
+    student_ids = serializers.ListField(
+        child=serializers.UUIDField(), required=False, allow_empty=False)
+    filter = serializers.DictField(
+        child=serializers.CharField(), required=False, allow_empty=False)
+
+    def validate_filter(self, value):
+        """Only allow the student list filters"""
+        unknown = set(value) - set(self.FILTER_KEYS)
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unknown filter keys: {', '.join(sorted(unknown))}")
+        if 'course' in value:
+            serializers.UUIDField().run_validation(value['course'])
+        return value
+
+    def validate(self, attrs):
+        """Require exactly one way of selecting students"""
+        if ('student_ids' in attrs) == ('filter' in attrs):
+            raise serializers.ValidationError(
+                "Provide either student_ids or filter")
+        return attrs
 
 
 class UnenrollStudentSerializer(serializers.Serializer):
@@ -233,10 +343,40 @@ class UnenrollStudentSerializer(serializers.Serializer):
         student = self.context['student']
         course = validated_data['course_id']
 
-        # Check if enrolled
-        if not student.is_enrolled_in_course(course):
+        result = Enrollment.objects.transition(
+            student.pk, course.pk, 'withdrawn', WITHDRAWABLE_STATUSES)
+        if result is None:
             raise serializers.ValidationError(
                 "Student is not enrolled in this course")
 
-        enrollment = student.unenroll_from_course(course)
-        return enrollment
+        return student.enrollments.get(course=course)
+
+
+class EnrollmentRequestSerializer(serializers.ModelSerializer):
+    """Serializer for queued enrollment requests (rush-mode tickets)"""
+    course_code = serializers.CharField(source='course.course_code', read_only=True)
+
+    class Meta:
+        model = EnrollmentRequest
+        fields = ('request_id', 'student', 'course', 'course_code', 'status',
+                  'message', 'created_at', 'processed_at')
+        read_only_fields = fields
+
+
+class WaitlistSerializer(serializers.ModelSerializer):
+    """
+    Serializer for waitlist entries annotated by Waitlist.objects.with_rank()
+
+    position is the place in the line (1 = next to be promoted), not the
+    stored position.
+    """
+    course_code = serializers.CharField(source='course.course_code', read_only=True)
+    course_name = serializers.CharField(source='course.course_name', read_only=True)
+    position = serializers.IntegerField(source='waitlist_rank', read_only=True)
+    waitlist_length = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Waitlist
+        fields = ('waitlist_id', 'course', 'course_code', 'course_name',
+                  'position', 'waitlist_length', 'created_at')
+        read_only_fields = fields
@@ -1,7 +1,9 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from .models import Student
+from courses.models import Course, CourseStatistic
+from student_course_management.response_cache import invalidate_models
+from .models import Student, Enrollment, EnrollmentMonthlyFact
 
 User = get_user_model()
 
@@ -40,3 +42,29 @@ def save_student_profile(sender, instance, **kwargs):
         except Exception as e:
             print(
                 f"❌ Error saving student profile for {instance.username}: {e}")
+
+
+@receiver(post_delete, sender=Enrollment)
+def release_enrollment_counter(sender, instance, **kwargs):
+    """
+    Remove a deleted enrollment from its course's counters and statistics,
+    and flag its month's trend facts for recomputation.
+    """
+    Course.objects.record_enrollment_transition(
+        instance.course_id, instance.status, None)
+    CourseStatistic.objects.record(
+        instance.course_id,
+        old=(instance.status, instance.grade, instance.credits_earned))
+    EnrollmentMonthlyFact.objects.mark_stale(
+        instance.course_id, [instance.enrollment_date])
+
+
+@receiver([post_save, post_delete], sender=Course)
+@receiver([post_save, post_delete], sender=Student)
+@receiver([post_save, post_delete], sender=Enrollment)
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_responses(sender, **kwargs):
+    """
+    Expire cached API responses that depend on the changed model.
+    """
+    invalidate_models(sender._meta.label)
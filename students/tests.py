@@ -1,3 +1,670 @@
-from django.test import TestCase
+import json
+import threading
+from unittest import skipIf, skipUnless
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import connection, connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from courses.models import Course, CourseFullError, CourseStatistic
+from student_course_management.testing import QueryBudget, QueryBudgetMixin
+from . import numbering, urls
+from .models import Enrollment, EnrollmentRequest, Student, Waitlist
+from .numbering import allocate_student_number
+from .academics import refresh_academic_summaries
+from .pagination import encode_cursor, estimate_count
+from .waitlist import promote_waitlists
+
+User = get_user_model()
+
+
+@skipIf(connection.vendor == 'sqlite', 'SQLite serializes all writers')
+class EnrollmentTransitionConcurrencyTests(TransactionTestCase):
+    """Many threads racing on the same (student, course) enrollment"""
+    THREADS = 16
+
+    def setUp(self):
+        user = User.objects.create_user(
+            username='racer', password='x', role='student', email='racer@example.com')
+        self.student = Student.objects.get(user=user)
+        self.course = Course.objects.create(
+            course_name='Concurrency', course_code='CC101', course_duration=12, credits=3)
+
+    def run_threads(self, target):
+        barrier = threading.Barrier(self.THREADS)
+        results, errors = [], []
+
+        def worker(index):
+            try:
+                barrier.wait()
+                results.append(target(index))
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=(i,))
+                   for i in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        return results
+
+    def counts(self):
+        course = Course.objects.with_enrollment_counts().get(pk=self.course.pk)
+        return (course.enrolled_students_total, course.withdrawn_students_total)
+
+    def test_concurrent_enroll_creates_one_enrollment(self):
+        results = self.run_threads(
+            lambda i: Enrollment.objects.enroll(self.student.pk, self.course.pk))
+
+        self.assertEqual(sum(result.changed for result in results), 1)
+        self.assertEqual(Enrollment.objects.filter(
+            student=self.student, course=self.course).count(), 1)
+        self.assertEqual(self.counts(), (1, 0))
+
+    def test_concurrent_enroll_and_withdraw_keep_counters_consistent(self):
+        Enrollment.objects.enroll(self.student.pk, self.course.pk)
+
+        def flip(index):
+            if index % 2:
+                return Enrollment.objects.enroll(self.student.pk, self.course.pk)
+            return Enrollment.objects.transition(
+                self.student.pk, self.course.pk, 'withdrawn', ('enrolled',))
+
+        self.run_threads(flip)
+
+        status = Enrollment.objects.get(
+            student=self.student, course=self.course).status
+        expected = (1, 0) if status == 'enrolled' else (0, 1)
+        self.assertEqual(self.counts(), expected)
+
+
+@skipIf(connection.vendor == 'sqlite', 'SQLite serializes all writers')
+class StudentNumberConcurrencyTests(TransactionTestCase):
+    """Many threads allocating student numbers at once"""
+    THREADS = 8
+    NUMBERS_PER_THREAD = 25
+
+    @override_settings(STUDENT_NUMBER_BLOCK_SIZE=10)
+    def test_concurrent_allocation_is_unique_and_batched(self):
+        barrier = threading.Barrier(self.THREADS)
+        numbers, query_counts, errors = [], [], []
+
+        def worker():
+            try:
+                with CaptureQueriesContext(connections['default']) as queries:
+                    barrier.wait()
+                    allocated = [allocate_student_number()
+                                 for _ in range(self.NUMBERS_PER_THREAD)]
+                numbers.extend(allocated)
+                query_counts.append(sum(
+                    1 for query in queries
+                    if query['sql'].split(None, 1)[0] in ('SELECT', 'INSERT', 'UPDATE')))
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(set(numbers)), self.THREADS * self.NUMBERS_PER_THREAD)
+        # Three blocks of 10 per thread (a locking read and an UPDATE each),
+        # plus creating the year's sequence row in the first thread
+        self.assertLessEqual(max(query_counts), 3 * 2 + 4)
+
+
+class StudentNumberTests(TestCase):
+    """Student number sequences and block reuse"""
+
+    def setUp(self):
+        numbering._local.blocks = {}
+
+    def test_committed_block_serves_later_numbers_without_queries(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            first = allocate_student_number(2030)
+
+        with self.assertNumQueries(0):
+            second = allocate_student_number(2030)
+
+        self.assertEqual((first, second), ('STU20300001', 'STU20300002'))
+
+    def test_block_of_a_rolled_back_transaction_is_not_reused(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            first = allocate_student_number(2030)
+            raise RuntimeError
+
+        # The reservation was rolled back with the transaction
+        self.assertEqual(allocate_student_number(2030), first)
+
+    def test_new_sequence_continues_after_numbers_past_9999(self):
+        first, second = create_students(2)
+        Student.objects.filter(pk=first.pk).update(student_number='STU20309999')
+        Student.objects.filter(pk=second.pk).update(student_number='STU203010000')
+
+        self.assertEqual(allocate_student_number(2030), 'STU203010001')
+
+
+def create_students(count, prefix='student'):
+    """Students with user accounts, in creation order"""
+    students = []
+    for index in range(count):
+        user = User.objects.create_user(
+            username=f'{prefix}-{index}', password='x', role='student',
+            first_name='Test', last_name=str(index),
+            email=f'{prefix}-{index}@example.com')
+        students.append(Student.objects.get(user=user))
+    return students
+
+
+def admin_client():
+    admin = User.objects.create_user(
+        username='test-admin', password='x', role='admin',
+        is_superuser=True, is_staff=True)
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class StudentListQueryCountTests(TestCase):
+    """GET /api/students/ runs the same queries whatever the page holds"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.courses = [
+            Course.objects.create(course_name=f'List {index}', course_code=f'LS10{index}',
+                                  course_duration=12, credits=3)
+            for index in range(2)
+        ]
+
+    def setUp(self):
+        self.client = admin_client()
+
+    def add_students(self, count, prefix):
+        for student in create_students(count, prefix):
+            for course in self.courses:
+                Enrollment.objects.enroll(student.pk, course.pk)
+
+    def list_students(self):
+        response = self.client.get(reverse('students:student_list_create'),
+                                   {'page_size': 50})
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_query_count_does_not_grow_with_the_rows(self):
+        self.add_students(2, 'few')
+        with CaptureQueriesContext(connection) as few:
+            self.assertEqual(len(self.list_students().data['results']), 2)
+
+        self.add_students(8, 'many')
+        with self.assertNumQueries(len(few)):
+            self.assertEqual(len(self.list_students().data['results']), 10)
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class StudentPaginationTests(TestCase):
+    """Cursor and page-numbered pages of GET /api/students/"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.students = create_students(7, 'page')
+
+    def setUp(self):
+        self.client = admin_client()
+
+    def list_students(self, status_code=200, **params):
+        response = self.client.get(reverse('students:student_list_create'),
+                                   {'page_size': 3, **params})
+        self.assertEqual(response.status_code, status_code)
+        return response.data
+
+    def ids(self, page):
+        return [row['student_id'] for row in page['results']]
+
+    def walk(self, ordering):
+        """Pages followed through their next cursors from the first one"""
+        pages = [self.list_students(ordering=ordering, cursor='')]
+        while pages[-1]['next']:
+            pages.append(self.list_students(ordering=ordering, cursor=pages[-1]['next']))
+        return pages
+
+    def test_cursor_pages_break_ties_on_the_primary_key(self):
+        # Every student was enrolled today, so the ordering field ties
+        pages = self.walk('enrollment_date')
+
+        self.assertEqual([len(page['results']) for page in pages], [3, 3, 1])
+        self.assertEqual(sum((self.ids(page) for page in pages), []),
+                         sorted(str(student.pk) for student in self.students))
+
+        # Following previous cursors returns the same pages
+        previous = self.list_students(ordering='enrollment_date', cursor=pages[2]['previous'])
+        self.assertEqual(self.ids(previous), self.ids(pages[1]))
+        first = self.list_students(ordering='enrollment_date', cursor=previous['previous'])
+        self.assertEqual(self.ids(first), self.ids(pages[0]))
+        self.assertIsNone(first['previous'])
+
+    def test_next_cursor_is_stable_when_rows_are_added_before_it(self):
+        expected = self.ids(self.list_students(ordering='-created_at', page=2))
+        first = self.list_students(ordering='-created_at', cursor='')
+
+        # New students sort first and would shift an offset page by two rows
+        create_students(2, 'late')
+        second = self.list_students(ordering='-created_at', cursor=first['next'])
+
+        self.assertEqual(self.ids(second), expected)
+
+    def test_invalid_cursors_are_rejected(self):
+        other_ordering = self.list_students(ordering='-created_at', cursor='')['next']
+        for cursor in ('not a cursor', encode_cursor(['o', 'v', 'k', 'd']), other_ordering,
+                       encode_cursor({'o': 'enrollment_date', 'v': 'yesterday',
+                                      'k': str(self.students[0].pk), 'd': 'n'})):
+            with self.subTest(cursor=cursor):
+                data = self.list_students(400, ordering='enrollment_date', cursor=cursor)
+                self.assertIn('error', data)
+
+    def test_count_modes_apply_to_page_numbers_too(self):
+        with CaptureQueriesContext(connection) as exact_queries:
+            exact = self.list_students()
+        with CaptureQueriesContext(connection) as uncounted_queries:
+            uncounted = self.list_students(count='none')
+
+        self.assertEqual((exact['count'], exact['total_pages']), (7, 3))
+        self.assertEqual((uncounted['count'], uncounted['total_pages']), (None, None))
+        self.assertEqual(len(uncounted_queries), len(exact_queries) - 1)
+        self.assertEqual(self.ids(uncounted), self.ids(exact))
+        self.assertTrue(uncounted['next'])
+
+        last = self.list_students(count='none', page=3)
+        self.assertEqual((len(last['results']), last['next'], last['previous']),
+                         (1, False, True))
+
+        self.list_students(400, count='all')
+        self.list_students(400, count='all', cursor='')
+
+    def test_estimated_count_is_reported_in_both_modes(self):
+        for params in ({}, {'cursor': ''}):
+            with self.subTest(**params):
+                data = self.list_students(count='estimate', **params)
+                self.assertIsInstance(data['count'], int)
+
+    @skipUnless(connection.vendor == 'sqlite', 'SQLite has no planner row estimate')
+    def test_estimate_falls_back_to_an_exact_count(self):
+        self.assertEqual(estimate_count(Student.objects.filter(user__username__startswith='page')), 7)
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class MyProfileConditionalGetTests(TestCase):
+    """ETag of GET /api/students/my-profile/ after changes outside the student row"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = create_students(1, 'profile')[0]
+        course = Course.objects.create(
+            course_name='Profile', course_code='PF101', course_duration=12, credits=3)
+        Enrollment.objects.enroll(cls.student.pk, course.pk)
+        cls.enrollment = Enrollment.objects.select_related('course').get(student=cls.student)
+        cls.enrollment.complete_course('B')
+        cls.admin = User.objects.create_user(
+            username='profile-admin', password='x', role='admin',
+            is_superuser=True, is_staff=True)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.student.user)
+
+    def get(self, etag=None):
+        headers = {'If-None-Match': etag} if etag else {}
+        return self.client.get(reverse('students:my_profile'), headers=headers)
+
+    def test_refreshed_academic_summary_changes_the_etag(self):
+        first = self.get()
+        self.assertEqual(first.data['academic_summary']['cumulative_gpa'], '3.000')
+
+        # A grade fix that bypasses complete_course, picked up by the refresh
+        Enrollment.objects.filter(pk=self.enrollment.pk).update(grade='A')
+        refresh_academic_summaries()
+        response = self.get(first['ETag'])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], first['ETag'])
+        self.assertEqual(response.data['academic_summary']['cumulative_gpa'], '4.000')
+
+    def test_admin_status_action_changes_the_etag(self):
+        etag = self.get()['ETag']
+
+        admin = APIClient()
+        admin.force_login(self.admin)
+        admin.post('/admin/students/student/', {
+            'action': 'graduate_students', '_selected_action': [str(self.student.pk)]})
+        response = self.get(etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'graduated')
+
+
+class StudentExportTests(TestCase):
+    """Streaming CSV and NDJSON student exports"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.students = create_students(5)
+
+    def setUp(self):
+        self.client = admin_client()
+
+    def export(self, export_format):
+        response = self.client.get(reverse('students:student_export'),
+                                   {'format': export_format})
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    @override_settings(EXPORT_CHUNK_SIZE=2)
+    def test_csv_spanning_several_chunks_has_one_header(self):
+        lines = self.export('csv').splitlines()
+
+        self.assertEqual(lines[0].split(',')[0], 'student_id')
+        self.assertEqual(sum(line.startswith('student_id,') for line in lines), 1)
+        self.assertEqual(len(lines), 1 + len(self.students))
+
+    @override_settings(EXPORT_CHUNK_SIZE=2)
+    def test_ndjson_has_one_line_per_student(self):
+        lines = self.export('ndjson').splitlines()
+
+        self.assertEqual(sorted(json.loads(line)['student_id'] for line in lines),
+                         sorted(str(student.pk) for student in self.students))
+
+
+class EnrollmentAdminActionTests(TestCase):
+    """Bulk status actions in the enrollment admin"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.students = create_students(2)
+        cls.course = Course.objects.create(
+            course_name='Admin actions', course_code='AA101', course_duration=12, credits=3)
+        for student in cls.students:
+            Enrollment.objects.enroll(student.pk, cls.course.pk)
+        cls.admin = User.objects.create_user(
+            username='admin-actions', password='x', role='admin',
+            is_superuser=True, is_staff=True)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def run_action(self, action, enrollments, query='status__exact=enrolled'):
+        response = self.client.post(f'/admin/students/enrollment/?{query}', {
+            'action': action,
+            '_selected_action': [str(enrollment.pk) for enrollment in enrollments],
+        })
+        self.assertEqual(response.status_code, 302)
+
+    def statistics(self):
+        return CourseStatistic.objects.summarize([self.course.pk])[self.course.pk]['enrollments']
+
+    def counters(self):
+        course = Course.objects.with_enrollment_counts().get(pk=self.course.pk)
+        return (course.enrolled_students_total, course.completed_students_total,
+                course.withdrawn_students_total)
+
+    def test_mark_completed_from_a_status_filtered_list_rebuilds_statistics(self):
+        enrollment = Enrollment.objects.get(student=self.students[0], course=self.course)
+
+        self.run_action('mark_completed', [enrollment])
+
+        self.assertEqual(self.statistics(), {'enrolled': 1, 'completed': 1})
+
+    def test_mark_withdrawn_from_a_status_filtered_list_rebuilds_statistics(self):
+        self.run_action('mark_withdrawn', Enrollment.objects.filter(course=self.course))
+
+        self.assertEqual(self.statistics(), {'withdrawn': 2})
+
+    def test_actions_update_the_course_counters(self):
+        first, second = Enrollment.objects.filter(course=self.course).order_by('pk')
+
+        self.run_action('mark_completed', [first])
+        self.assertEqual(self.counters(), (1, 1, 0))
+        self.run_action('mark_withdrawn', [second])
+        self.assertEqual(self.counters(), (0, 1, 1))
+
+    def test_change_form_updates_the_course_counters(self):
+        enrollment = Enrollment.objects.get(student=self.students[0], course=self.course)
+
+        response = self.client.post(
+            f'/admin/students/enrollment/{enrollment.pk}/change/', {
+                'student': enrollment.student_id,
+                'course': enrollment.course_id,
+                'enrollment_date_0': enrollment.enrollment_date.strftime('%Y-%m-%d'),
+                'enrollment_date_1': enrollment.enrollment_date.strftime('%H:%M:%S'),
+                'status': 'completed',
+                'grade': 'A',
+                'credits_earned': 3,
+            })
+
+        self.assertEqual(response.status_code, 302, getattr(response, 'context', None)
+                         and response.context['adminform'].form.errors)
+        self.assertEqual(self.counters(), (1, 1, 0))
+        self.assertEqual(self.statistics(), {'enrolled': 1, 'completed': 1})
+
+    def test_student_inline_updates_the_course_counters(self):
+        student = self.students[0]
+        enrollment = Enrollment.objects.get(student=student, course=self.course)
+        other = Course.objects.create(
+            course_name='Inline', course_code='IN101', course_duration=12, credits=3)
+        date, time = enrollment.enrollment_date.strftime('%Y-%m-%d %H:%M:%S').split()
+        row = {'student': student.pk, 'enrollment_date_0': date, 'enrollment_date_1': time,
+               'initial-enrollment_date_0': date, 'initial-enrollment_date_1': time,
+               'completion_date_0': '', 'completion_date_1': '', 'credits_earned': 0}
+        inline = {'TOTAL_FORMS': 2, 'INITIAL_FORMS': 1, 'MIN_NUM_FORMS': 0,
+                  'MAX_NUM_FORMS': 1000}
+        # Complete the existing enrollment and add one in another course
+        inline.update({f'0-{name}': value for name, value in row.items()})
+        inline.update({'0-enrollment_id': enrollment.pk, '0-course': self.course.pk,
+                       '0-status': 'completed', '0-grade': 'A'})
+        inline.update({f'1-{name}': value for name, value in row.items()})
+        inline.update({'1-course': other.pk, '1-status': 'enrolled', '1-grade': ''})
+
+        response = self.client.post(f'/admin/students/student/{student.pk}/change/', {
+            'user': student.user_id,
+            'student_number': student.student_number,
+            'enrollment_date': student.enrollment_date.isoformat(),
+            'initial-enrollment_date': student.enrollment_date.isoformat(),
+            'status': student.status,
+            **{f'enrollments-{name}': value for name, value in inline.items()},
+        })
+
+        self.assertEqual(response.status_code, 302, getattr(response, 'context', None)
+                         and response.context['inline_admin_formsets'][0].formset.errors)
+        self.assertEqual(Enrollment.objects.filter(student=student).count(), 2)
+        self.assertEqual(self.counters(), (1, 1, 0))
+        self.assertEqual(self.statistics(), {'enrolled': 1, 'completed': 1})
+        other = Course.objects.with_enrollment_counts().get(pk=other.pk)
+        self.assertEqual(other.enrolled_students_total, 1)
+        self.assertEqual(
+            CourseStatistic.objects.summarize([other.pk])[other.pk]['enrollments'],
+            {'enrolled': 1})
+
+
+class WaitlistTests(TestCase):
+    """Joining, leaving and promotion of a full course's waitlist"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.enrolled, *cls.waiting = create_students(4)
+        cls.course = Course.objects.create(
+            course_name='Waitlist', course_code='WL101', course_duration=12,
+            credits=3, capacity=1)
+        Enrollment.objects.enroll(cls.enrolled.pk, cls.course.pk, capacity=1)
+
+    def join(self, student):
+        client = APIClient()
+        client.force_authenticate(student.user)
+        return client.post(reverse('courses:course_waitlist', args=[self.course.pk]))
+
+    def ranks(self):
+        return {entry.student_id: (entry.waitlist_rank, entry.waitlist_length)
+                for entry in Waitlist.objects.with_rank().filter(course=self.course)}
+
+    def free_seat(self):
+        Enrollment.objects.transition(
+            self.enrolled.pk, self.course.pk, 'withdrawn', ('enrolled',))
+
+    def test_join_appends_and_reports_the_rank(self):
+        for rank, student in enumerate(self.waiting, 1):
+            response = self.join(student)
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual((response.data['position'], response.data['waitlist_length']),
+                             (rank, rank))
+
+        response = self.join(self.waiting[0])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['position'], 1)
+
+    def test_leave_deletes_one_row_and_later_ranks_move_up(self):
+        for student in self.waiting:
+            Waitlist.objects.join(student.pk, self.course.pk)
+        positions = dict(Waitlist.objects.values_list('student_id', 'position'))
+
+        with self.assertNumQueries(1):
+            self.assertTrue(Waitlist.objects.leave(self.waiting[0].pk, self.course.pk))
+
+        self.assertFalse(Waitlist.objects.leave(self.waiting[0].pk, self.course.pk))
+        # The remaining entries keep their stored positions
+        self.assertEqual(dict(Waitlist.objects.values_list('student_id', 'position')),
+                         {student.pk: positions[student.pk] for student in self.waiting[1:]})
+        self.assertEqual(self.ranks(), {self.waiting[1].pk: (1, 2),
+                                        self.waiting[2].pk: (2, 2)})
+
+    def test_promotion_fills_freed_seats_from_the_head(self):
+        for student in self.waiting:
+            Waitlist.objects.join(student.pk, self.course.pk)
+        Waitlist.objects.leave(self.waiting[0].pk, self.course.pk)
+        self.free_seat()
+
+        self.assertEqual(promote_waitlists(), {self.course.pk: 1})
+
+        self.assertTrue(self.waiting[1].is_enrolled_in_course(self.course))
+        self.assertEqual(self.ranks(), {self.waiting[2].pk: (1, 1)})
+
+    def test_direct_enrollment_cannot_take_a_seat_held_for_the_waitlist(self):
+        Waitlist.objects.join(self.waiting[0].pk, self.course.pk)
+        self.free_seat()
+        outsider = self.waiting[1]
+
+        with self.assertRaises(CourseFullError):
+            Enrollment.objects.enroll(outsider.pk, self.course.pk, capacity=1)
+        self.assertEqual(
+            Enrollment.objects.allocate_seats(self.course.pk, [outsider.pk]),
+            {outsider.pk: 'full'})
+        # With every free seat held the outsider may join the waitlist
+        self.assertEqual(self.join(outsider).status_code, 201)
+
+    def test_head_of_the_waitlist_may_enroll_directly(self):
+        Waitlist.objects.join(self.waiting[0].pk, self.course.pk)
+        Waitlist.objects.join(self.waiting[1].pk, self.course.pk)
+        self.free_seat()
+
+        with self.assertRaises(CourseFullError):
+            Enrollment.objects.enroll(self.waiting[1].pk, self.course.pk, capacity=1)
+        result = Enrollment.objects.enroll(self.waiting[0].pk, self.course.pk, capacity=1)
+
+        self.assertTrue(result.changed)
+        self.assertEqual(self.ranks(), {self.waiting[1].pk: (1, 1)})
+
+
+class CapacityTests(TestCase):
+    """Imports and student enroll requests against a course's capacity"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.course = Course.objects.create(
+            course_name='Capacity', course_code='CP101', course_duration=12,
+            credits=3, capacity=2)
+
+    def setUp(self):
+        self.client = admin_client()
+
+    def test_import_reports_rows_past_the_capacity_as_full(self):
+        rows = [
+            {'username': f'import-{index}', 'email': f'import-{index}@example.com',
+             'first_name': 'Import', 'last_name': str(index),
+             'password': 'Passw0rd!x', 'course': str(self.course.pk)}
+            for index in range(3)
+        ]
+
+        response = self.client.post(reverse('students:student_bulk_create'),
+                                    rows, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([result['enrollment'] for result in response.data['results']],
+                         ['enrolled', 'enrolled', 'full'])
+        self.assertEqual(Student.objects.count(), 3)
+        course = Course.objects.with_enrollment_counts().get(pk=self.course.pk)
+        self.assertEqual(course.enrolled_students_total, 2)
+
+    def test_student_enroll_is_queued_in_rush_mode(self):
+        Course.objects.filter(pk=self.course.pk).update(rush_mode=True)
+        student = create_students(1)[0]
+
+        response = self.client.post(
+            reverse('students:student_enroll', args=[student.pk]),
+            {'course_id': str(self.course.pk)}, format='json')
+
+        self.assertEqual(response.status_code, 202)
+        ticket = EnrollmentRequest.objects.get(pk=response.data['request_id'])
+        self.assertEqual((ticket.student_id, ticket.status), (student.pk, 'pending'))
+        self.assertFalse(Enrollment.objects.filter(student=student).exists())
+
+
+def _new_students(test):
+    return [
+        {'username': f'bulk-{index}', 'email': f'bulk-{index}@example.com',
+         'first_name': 'Bulk', 'last_name': str(index), 'password': 'Passw0rd!x'}
+        for index in range(3)
+    ]
+
+
+class StudentEndpointQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Each students endpoint runs a fixed number of queries"""
+    urls_module = urls
+    budgets = {
+        'student_list_create': QueryBudget(5),
+        'student_list_create_alt': QueryBudget(5),
+        'student_bulk_create': QueryBudget(10, 'post', data=_new_students),
+        'student_export': QueryBudget(1),
+        'student_detail': QueryBudget(4, kwargs={'pk': 'student'}),
+        'student_detail_alt': QueryBudget(4, kwargs={'pk': 'student'}),
+        'student_enroll': QueryBudget(
+            15, 'post', user='student', kwargs={'pk': 'student'},
+            data=lambda test: {'course_id': str(test.other_course.pk)}),
+        'student_enrollments': QueryBudget(7, kwargs={'pk': 'student'}),
+        'student_waitlists': QueryBudget(2, user='student', kwargs={'pk': 'student'}),
+        'student_change_status': QueryBudget(
+            18, 'post', kwargs={'pk': 'student'}, data={'status': 'inactive'}),
+        'student_change_course': QueryBudget(
+            36, 'post', kwargs={'pk': 'student'},
+            data=lambda test: {'course_id': str(test.other_course.pk)}),
+        'students_by_course': QueryBudget(
+            1, data=lambda test: {'course_id': str(test.course.pk)}),
+        'active_students': QueryBudget(5),
+        'my_profile': QueryBudget(7, user='student'),
+        'my_dashboard': QueryBudget(5, user='student'),
+        'enrollment_request_status': QueryBudget(
+            1, user='student', kwargs={'pk': 'ticket'}),
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.ticket = EnrollmentRequest.objects.create(
+            student=cls.student, course=cls.other_course)
@@ -0,0 +1,199 @@
+"""
+Monthly enrollment time series for Student Course Management System
+
+EnrollmentMonthlyFact holds one row per (month, course, status) with the
+number of enrollments whose enrollment date falls in that month, and trend
+queries read only those rows. refresh_enrollment_facts() recomputes just the
+months touched since a stored watermark on Enrollment.updated_at (plus the
+months flagged stale by deletes and reactivations);
+backfill_enrollment_facts() rebuilds the whole history a chunk of months
+per transaction.
+"""
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, DateField, Max, Min, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from student_course_management.response_cache import invalidate_models
+from .models import Enrollment, EnrollmentMonthlyFact, RefreshWatermark, month_of
+
+
+WATERMARK_NAME = 'enrollment_monthly_facts'
+
+# Longest range a trend query may span
+MAX_TREND_MONTHS = 240
+
+
+def get_watermark_lag():
+    """
+    Seconds the stored watermark trails the start of a refresh.
+
+    Rows written by transactions still open when a refresh starts may carry
+    an earlier updated_at than the refresh; the lag makes the next refresh
+    rescan them.
+    """
+    return max(0, getattr(settings, 'ENROLLMENT_TRENDS_WATERMARK_LAG', 300))
+
+
+def get_chunk_months():
+    """Number of months rebuilt per transaction by a backfill"""
+    return max(1, getattr(settings, 'ENROLLMENT_TRENDS_CHUNK_MONTHS', 12))
+
+
+def add_months(month, count):
+    """First day of the month count months after month"""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_range(first, last):
+    """Months from first to last, inclusive"""
+    months = []
+    while first <= last:
+        months.append(first)
+        first = add_months(first, 1)
+    return months
+
+
+def _month_start(month):
+    return timezone.make_aware(datetime.combine(month, time.min))
+
+
+def _contiguous_runs(months, limit):
+    """Group months into [first, end) runs of consecutive months, at most limit long"""
+    runs = []
+    for month in sorted(months):
+        if runs and runs[-1][1] == month and len(month_range(runs[-1][0], month)) <= limit:
+            runs[-1][1] = add_months(month, 1)
+        else:
+            runs.append([month, add_months(month, 1)])
+    return runs
+
+
+def rebuild_months(first, end):
+    """
+    Recompute the facts of the months [first, end) with one GROUP BY.
+
+    Returns the number of facts written.
+    """
+    rows = Enrollment.objects.filter(
+        enrollment_date__gte=_month_start(first),
+        enrollment_date__lt=_month_start(end),
+    ).order_by().annotate(
+        month=TruncMonth('enrollment_date', output_field=DateField()),
+    ).values('month', 'course_id', 'status').annotate(total=Count('pk'))
+
+    with transaction.atomic():
+        facts = [
+            EnrollmentMonthlyFact(month=row['month'], course_id=row['course_id'],
+                                  status=row['status'], enrollments=row['total'])
+            for row in rows
+        ]
+        EnrollmentMonthlyFact.objects.filter(month__gte=first, month__lt=end).delete()
+        EnrollmentMonthlyFact.objects.bulk_create(facts, batch_size=1000)
+    return len(facts)
+
+
+def _store_watermark(started):
+    RefreshWatermark.objects.update_or_create(
+        name=WATERMARK_NAME,
+        defaults={'value': started - timedelta(seconds=get_watermark_lag())})
+    invalidate_models('students.EnrollmentMonthlyFact')
+
+
+def backfill_enrollment_facts(chunk_months=None):
+    """
+    Rebuild every fact from the enrollments table.
+
+    Each chunk of chunk_months months is one range scan and one
+    transaction, so a backfill of years of history never holds locks for
+    long. Returns (months rebuilt, facts written).
+    """
+    started = timezone.now()
+    chunk_months = chunk_months or get_chunk_months()
+    bounds = Enrollment.objects.aggregate(
+        first=Min('enrollment_date'), last=Max('enrollment_date'))
+    if bounds['first'] is None:
+        EnrollmentMonthlyFact.objects.all().delete()
+        _store_watermark(started)
+        return 0, 0
+
+    first = month_of(bounds['first'])
+    end = add_months(month_of(bounds['last']), 1)
+    EnrollmentMonthlyFact.objects.filter(Q(month__lt=first) | Q(month__gte=end)).delete()
+
+    months = facts = 0
+    while first < end:
+        chunk_end = min(add_months(first, chunk_months), end)
+        facts += rebuild_months(first, chunk_end)
+        months += len(month_range(first, add_months(chunk_end, -1)))
+        first = chunk_end
+
+    _store_watermark(started)
+    return months, facts
+
+
+def refresh_enrollment_facts(chunk_months=None):
+    """
+    Recompute the months touched since the last refresh.
+
+    Touched months are those of enrollments updated after the watermark
+    and those with stale facts. Without a watermark the whole history is
+    backfilled. Returns (months rebuilt, facts written).
+    """
+    started = timezone.now()
+    if not RefreshWatermark.objects.filter(
+            name=WATERMARK_NAME, value__isnull=False).exists():
+        return backfill_enrollment_facts(chunk_months)
+
+    with transaction.atomic():
+        # Concurrent refreshes wait for each other on the watermark row
+        since = RefreshWatermark.objects.select_for_update().values_list(
+            'value', flat=True).get(name=WATERMARK_NAME)
+        months = set(Enrollment.objects.filter(updated_at__gte=since).order_by().annotate(
+            month=TruncMonth('enrollment_date', output_field=DateField()),
+        ).values_list('month', flat=True).distinct())
+        months.update(EnrollmentMonthlyFact.objects.filter(stale=True).order_by().values_list(
+            'month', flat=True).distinct())
+
+        facts = sum(rebuild_months(first, end) for first, end in
+                    _contiguous_runs(months, chunk_months or get_chunk_months()))
+        _store_watermark(started)
+    return len(months), facts
+
+
+def enrollment_trends(first, last, course_ids=None):
+    """
+    Monthly enrollment counts by status for the months first..last.
+
+    Reads only the facts table. Returns (months, series): one series per
+    course in course_ids, or a single series over all courses (course_id
+    None), each holding a list of counts per status aligned with months.
+    """
+    months = month_range(first, last)
+    statuses = [choice for choice, _ in Enrollment.ENROLLMENT_STATUS_CHOICES]
+    facts = EnrollmentMonthlyFact.objects.filter(month__gte=first, month__lte=last)
+    group = ['month', 'status']
+    if course_ids:
+        facts = facts.filter(course_id__in=course_ids)
+        group.append('course_id')
+    rows = facts.order_by().values(*group).annotate(total=Sum('enrollments'))
+
+    slots = {month: index for index, month in enumerate(months)}
+    series = {course_id: {status: [0] * len(months) for status in statuses}
+              for course_id in (course_ids or [None])}
+    for row in rows:
+        counts = series[row.get('course_id')]
+        counts.setdefault(row['status'], [0] * len(months))[slots[row['month']]] = row['total']
+
+    return months, [
+        {
+            'course_id': course_id,
+            'counts': counts,
+            'total': [sum(values) for values in zip(*counts.values())],
+        }
+        for course_id, counts in series.items()
+    ]
@@ -6,6 +6,10 @@ app_name = 'students'
 urlpatterns = [
     # Student CRUD endpoints
     path('', views.StudentListCreateAPIView.as_view(), name='student_list_create'),
+    path('bulk/', views.StudentBulkCreateAPIView.as_view(),
+         name='student_bulk_create'),
+    path('export/', views.StudentExportAPIView.as_view(),
+         name='student_export'),
     path('<uuid:pk>/', views.StudentDetailAPIView.as_view(), name='student_detail'),
 
     # Student enrollment endpoints
@@ -13,6 +17,8 @@ urlpatterns = [
          name='student_enroll'),
     path('<uuid:pk>/enrollments/',
          views.StudentEnrollmentsAPIView.as_view(), name='student_enrollments'),
+    path('<uuid:pk>/waitlists/',
+         views.StudentWaitlistsAPIView.as_view(), name='student_waitlists'),
 
     # Student action endpoints
     path('<uuid:pk>/change-status/',
@@ -24,6 +30,10 @@ urlpatterns = [
          name='students_by_course'),
     path('active/', views.ActiveStudentsAPIView.as_view(), name='active_students'),
     path('my-profile/', views.MyProfileAPIView.as_view(), name='my_profile'),
+    path('my-dashboard/', views.MyDashboardAPIView.as_view(), name='my_dashboard'),
+    path('enrollment-requests/<uuid:pk>/',
+         views.EnrollmentRequestStatusAPIView.as_view(),
+         name='enrollment_request_status'),
 
     # Additional student endpoints (for compatibility)
     path('list/', views.StudentListCreateAPIView.as_view(),
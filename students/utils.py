@@ -2,6 +2,8 @@
 Database utilities for Student Course Management System
 """
 from django.db import connection
+from django.db.models import F, Sum
+from django.utils import timezone
 from typing import Dict, List, Any
 
 
@@ -177,40 +179,25 @@ class DatabaseManager:
             return cursor.fetchone()[0]
 
     @staticmethod
-    def get_course_statistics() -> Dict[str, Any]:
-        """Get comprehensive course statistics"""
-        with connection.cursor() as cursor:
-            cursor.execute("""
-                SELECT 
-                    c.course_id,
-                    c.course_name,
-                    c.course_code,
-                    COUNT(s.student_id) as total_students,
-                    COUNT(CASE WHEN s.status = 'active' THEN 1 END) as active_students,
-                    COUNT(CASE WHEN s.status = 'graduated' THEN 1 END) as graduated_students
-                FROM courses c
-                LEFT JOIN students s ON c.course_id = s.course_id
-                WHERE c.is_active = TRUE
-                GROUP BY c.course_id, c.course_name, c.course_code
-                ORDER BY c.course_name
-            """)
-            columns = [col[0] for col in cursor.description]
-            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    def get_course_statistics() -> List[Dict[str, Any]]:
+        """Get comprehensive course statistics from the course statistics rollup"""
+        from courses.models import Course, course_statistics
+
+        return course_statistics(Course.objects.filter(is_active=True).only(
+            'course_id', 'course_code', 'course_name', 'is_active'
+        ).order_by('course_name'))
 
     @staticmethod
-    def get_student_enrollment_trends() -> Dict[str, Any]:
-        """Get student enrollment trends by month"""
-        with connection.cursor() as cursor:
-            cursor.execute("""
-                SELECT 
-                    DATE_TRUNC('month', enrollment_date) as month,
-                    COUNT(*) as enrollments,
-                    c.course_name
-                FROM students s
-                JOIN courses c ON s.course_id = c.course_id
-                WHERE s.enrollment_date >= NOW() - INTERVAL '12 months'
-                GROUP BY DATE_TRUNC('month', enrollment_date), c.course_name
-                ORDER BY month DESC, c.course_name
-            """)
-            columns = [col[0] for col in cursor.description]
-            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    def get_student_enrollment_trends() -> List[Dict[str, Any]]:
+        """Get enrollment trends by month and course over the last 12 months"""
+        from .models import EnrollmentMonthlyFact, month_of
+        from .trends import add_months
+
+        since = add_months(month_of(timezone.now()), -11)
+        return list(EnrollmentMonthlyFact.objects.filter(
+            month__gte=since
+        ).values(
+            'month', course_name=F('course__course_name')
+        ).annotate(
+            enrollments=Sum('enrollments')
+        ).order_by('-month', 'course_name'))
@@ -1,13 +1,22 @@
-from rest_framework import permissions, status, filters
+import uuid
+from datetime import datetime
+
+from rest_framework import permissions, serializers, status, filters
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
 from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db import transaction
 from django.core.exceptions import ValidationError
 from django.core.paginator import Paginator
-from django.db.models import Q
+from django.db.models import Count, Q, Sum
 from django.contrib.auth import get_user_model
-from .models import Student, Enrollment
+from django.utils import timezone
+from .models import (
+    Student, StudentAcademicSummary, Enrollment, EnrollmentRequest, Waitlist, month_of
+)
 from .serializers import (
     StudentSerializer,
     StudentCreateSerializer,
@@ -15,12 +24,148 @@ from .serializers import (
     StudentBasicSerializer,
     EnrollStudentSerializer,
     UnenrollStudentSerializer,
-    EnrollmentSerializer
+    EnrollmentSerializer,
+    EnrollmentRequestSerializer,
+    WaitlistSerializer,
+    AcademicSummarySerializer
+)
+from .bulk import bulk_create_students, get_max_rows
+from .export import (
+    CSVExportRenderer,
+    ENROLLMENT_EXPORT_COLUMNS,
+    EXPORT_CONTENT_TYPES,
+    NDJSONExportRenderer,
+    STUDENT_EXPORT_COLUMNS,
+    stream_export
 )
-from courses.permissions import IsAdminOrReadOnly, IsStudentOwnerOrAdmin
+from .parsers import NDJSONParser
+from .trends import MAX_TREND_MONTHS, add_months, enrollment_trends, month_range
+from .pagination import (
+    COUNT_MODES,
+    InvalidCursor,
+    KeysetPaginator,
+    count_rows,
+    paginate_offset,
+    parse_ordering,
+    parse_page_size
+)
+from courses.models import Course, CourseFullError
+from courses.serializers import CourseSerializer
+from courses.permissions import IsAdminOrReadOnly, IsAdminUser, IsStudentOwnerOrAdmin
+from student_course_management.conditional import Validators, conditional_get
+from student_course_management.response_cache import cache_response
+from student_course_management.throttling import EnrollThrottle
 
 User = get_user_model()
 
+# Models whose changes expire cached student responses
+STUDENT_CACHE_MODELS = ('students.Student', 'students.Enrollment',
+                        'courses.Course', 'authentication.User',
+                        'students.StudentAcademicSummary')
+
+
+def filter_students(request, queryset, params=None):
+    """
+    Apply the student list's role-based restriction and query filters.
+
+    Filters are read from params, defaulting to the request's query string.
+    """
+    if params is None:
+        params = request.query_params
+
+    # Apply role-based filtering
+    if hasattr(request.user, 'role') and request.user.role == 'student':
+        if request.user.student_id is not None:
+            queryset = queryset.filter(user=request.user)
+        else:
+            queryset = queryset.none()
+
+    # Apply search filter
+    search = params.get('search')
+    if search:
+        queryset = queryset.filter(
+            Q(student_number__icontains=search) |
+            Q(user__username__icontains=search) |
+            Q(user__first_name__icontains=search) |
+            Q(user__last_name__icontains=search) |
+            Q(user__email__icontains=search)
+        )
+
+    # Apply filters
+    status_filter = params.get('status')
+    if status_filter:
+        queryset = queryset.filter(status=status_filter)
+
+    course_filter = params.get('course')
+    if course_filter:
+        queryset = queryset.filter(
+            courses__course_id=course_filter).distinct()
+
+    return queryset
+
+
+def filter_enrollments(request, queryset):
+    """Apply role-based restriction and query filters to enrollments"""
+    # Students only see their own enrollments
+    if hasattr(request.user, 'role') and request.user.role == 'student':
+        queryset = queryset.filter(student__user=request.user)
+
+    status_filter = request.query_params.get('status')
+    if status_filter:
+        queryset = queryset.filter(status=status_filter)
+
+    course_filter = request.query_params.get('course')
+    if course_filter:
+        queryset = queryset.filter(course_id=course_filter)
+
+    student_filter = request.query_params.get('student')
+    if student_filter:
+        queryset = queryset.filter(student_id=student_filter)
+
+    return queryset
+
+
+def student_profile_validators(student):
+    """
+    Fingerprint everything a full student representation is built from.
+
+    Nested course details carry enrollment counts, so the enrollments of
+    every course the student has an enrollment in are included, and the
+    academic summary is rewritten by refresh_academic_summaries without
+    touching any of the other rows.
+    """
+    course_ids = Enrollment.objects.filter(student=student).values('course_id')
+    try:
+        summary = (1, student.academic_summary.computed_at)
+    except StudentAcademicSummary.DoesNotExist:
+        summary = (0, None)
+    return (Validators()
+            .add_instance(student)
+            .add_instance(student.user)
+            .add(*summary)
+            .add_queryset(Course.objects.filter(pk__in=course_ids))
+            .add_queryset(Enrollment.objects.filter(course_id__in=course_ids)))
+
+
+def my_profile_validators(view, request):
+    try:
+        student = Student.objects.select_related(
+            'user', 'academic_summary').get(user=request.user)
+    except Student.DoesNotExist:
+        return None
+    return student_profile_validators(student)
+
+
+def student_enrollments_validators(view, request, pk):
+    try:
+        student = Student.objects.select_related(
+            'user', 'academic_summary').get(pk=pk)
+    except (Student.DoesNotExist, ValidationError):
+        return None
+    if not view.has_object_permission(request, student):
+        return None
+    return student_profile_validators(student)
+
 
 class StudentListCreateAPIView(APIView):
     """
@@ -28,62 +173,98 @@ class StudentListCreateAPIView(APIView):
     """
     permission_classes = [permissions.IsAuthenticated, IsAdminOrReadOnly]
 
+    # Orderings accepted from ?ordering=; each is backed by an index ending
+    # in student_id so keyset pagination can seek on it.
+    ORDERING_FIELDS = ('student_number', 'enrollment_date', 'created_at')
+
+    @cache_response(*STUDENT_CACHE_MODELS)
     def get(self, request):
         """Get list of students with filtering and pagination"""
-        queryset = Student.objects.select_related('user').prefetch_related(
-            'courses', 'enrollments__course').all()
+        # Apply ordering (only index-backed fields are accepted)
+        ordering = parse_ordering(
+            request.query_params.get('ordering'),
+            self.ORDERING_FIELDS,
+            default='student_number'
+        )
+        if ordering is None:
+            return Response({
+                'error': 'Invalid ordering. Allowed fields: ' +
+                ', '.join(self.ORDERING_FIELDS)
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-        # Apply role-based filtering
-        if hasattr(request.user, 'role') and request.user.role == 'student':
-            if hasattr(request.user, 'student_profile'):
-                queryset = queryset.filter(user=request.user)
-            else:
-                queryset = queryset.none()
+        # Sparse fieldsets (?fields= / ?expand=)
+        try:
+            fields = StudentSerializer.get_requested_fields(
+                request.query_params)
+        except serializers.ValidationError as e:
+            return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
 
-        # Apply search filter
-        search = request.query_params.get('search')
-        if search:
-            queryset = queryset.filter(
-                Q(student_number__icontains=search) |
-                Q(user__username__icontains=search) |
-                Q(user__first_name__icontains=search) |
-                Q(user__last_name__icontains=search) |
-                Q(user__email__icontains=search)
-            )
-
-        # Apply filters
-        status_filter = request.query_params.get('status')
-        if status_filter:
-            queryset = queryset.filter(status=status_filter)
+        # The ordering column is always loaded so cursors can be built
+        queryset = Student.objects.with_enrollment_summary(
+            fields | {ordering.lstrip('-')} if fields is not None else None)
+
+        queryset = filter_students(request, queryset)
 
-        gender_filter = request.query_params.get('gender')
-        if gender_filter:
-            queryset = queryset.filter(gender=gender_filter)
+        page_size = parse_page_size(request.query_params.get('page_size'))
 
-        course_filter = request.query_params.get('course')
-        if course_filter:
-            queryset = queryset.filter(
-                courses__course_id=course_filter).distinct()
+        # ?count= applies to both modes; offset pages count exactly by
+        # default (they report total_pages), cursor pages do not count
+        cursor_mode = 'cursor' in request.query_params
+        count_mode = request.query_params.get(
+            'count', 'none' if cursor_mode else 'exact')
+        if count_mode not in COUNT_MODES:
+            return Response({
+                'error': 'Invalid count. Allowed values: ' + ', '.join(COUNT_MODES)
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-        # Apply ordering
-        ordering = request.query_params.get('ordering', 'student_number')
-        queryset = queryset.order_by(ordering)
+        # Cursor (keyset) pagination
+        if cursor_mode:
+            return self.get_cursor_page(
+                request, queryset, ordering, page_size, count_mode, fields)
+
+        queryset = queryset.order_by(ordering, 'student_id')
 
         # Pagination
-        page_size = int(request.query_params.get('page_size', 20))
-        page = int(request.query_params.get('page', 1))
+        try:
+            page = int(request.query_params.get('page', 1))
+        except ValueError:
+            page = 1
+
+        page_data = paginate_offset(queryset, page, page_size, count_mode)
+
+        serializer = StudentSerializer(
+            page_data['results'], many=True, fields=fields)
+
+        return Response({
+            'count': page_data['count'],
+            'next': page_data['next'],
+            'previous': page_data['previous'],
+            'page': page_data['page'],
+            'total_pages': page_data['total_pages'],
+            'results': serializer.data
+        }, status=status.HTTP_200_OK)
+
+    def get_cursor_page(self, request, queryset, ordering, page_size,
+                        count_mode='none', fields=None):
+        """Serve a page using keyset pagination on (ordering, student_id)"""
+        paginator = KeysetPaginator(queryset, ordering, page_size)
+        try:
+            page = paginator.paginate(request.query_params.get('cursor'))
+        except InvalidCursor as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-        paginator = Paginator(queryset, page_size)
-        page_obj = paginator.get_page(page)
+        count = count_rows(queryset, count_mode)
 
-        serializer = StudentSerializer(page_obj.object_list, many=True)
+        serializer = StudentSerializer(
+            page['results'], many=True, fields=fields)
 
         return Response({
-            'count': paginator.count,
-            'next': page_obj.has_next(),
-            'previous': page_obj.has_previous(),
-            'page': page,
-            'total_pages': paginator.num_pages,
+            'count': count,
+            'next': page['next'],
+            'previous': page['previous'],
+            'page_size': page_size,
             'results': serializer.data
         }, status=status.HTTP_200_OK)
 
@@ -100,6 +281,138 @@ class StudentListCreateAPIView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class StudentBulkCreateAPIView(APIView):
+    """
+    Create many students in one request using APIView
+
+    Accepts a JSON list (or {"students": [...]}) or an NDJSON body with one
+    student per line, using the same fields as student creation.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAdminUser]
+    parser_classes = [JSONParser, NDJSONParser]
+
+    def post(self, request):
+        """Create students in bulk, reporting per-row results"""
+        rows = request.data
+        if isinstance(rows, dict):
+            rows = rows.get('students')
+        if not isinstance(rows, list) or not rows:
+            return Response({
+                'error': 'Expected a non-empty list of students'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        max_rows = get_max_rows()
+        if len(rows) > max_rows:
+            return Response({
+                'error': f'A bulk request may contain at most {max_rows} students'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        results = bulk_create_students(rows)
+        created = sum(1 for result in results if result['status'] == 'created')
+
+        return Response({
+            'message': f'{created} of {len(rows)} students created',
+            'created': created,
+            'failed': len(rows) - created,
+            'results': results
+        }, status=status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST)
+
+
+class BaseExportAPIView(APIView):
+    """
+    Base view for streaming exports selected with ?format=csv|ndjson
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = [JSONRenderer, CSVExportRenderer, NDJSONExportRenderer]
+
+    def perform_content_negotiation(self, request, force=False):
+        # Unknown ?format= values are reported by get() as a 400 rather
+        # than failing negotiation with a 404
+        return super().perform_content_negotiation(request, force=True)
+
+    def get_queryset(self, request):
+        raise NotImplementedError
+
+    def get(self, request):
+        export_format = request.query_params.get('format', 'csv')
+        if export_format not in EXPORT_CONTENT_TYPES:
+            return Response({
+                'error': 'Invalid format. Allowed values: ' +
+                ', '.join(EXPORT_CONTENT_TYPES)
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return stream_export(self.get_queryset(request), self.columns,
+                             self.ordering, export_format, self.filename)
+
+
+class StudentExportAPIView(BaseExportAPIView):
+    """Stream all students matching the list filters as CSV or NDJSON"""
+    columns = STUDENT_EXPORT_COLUMNS
+    ordering = 'student_number'
+    filename = 'students'
+
+    def get_queryset(self, request):
+        return filter_students(request, Student.objects.all())
+
+
+class EnrollmentExportAPIView(BaseExportAPIView):
+    """Stream all enrollments matching the given filters as CSV or NDJSON"""
+    columns = ENROLLMENT_EXPORT_COLUMNS
+    ordering = 'enrollment_date'
+    filename = 'enrollments'
+
+    def get_queryset(self, request):
+        return filter_enrollments(request, Enrollment.objects.all())
+
+
+def parse_month(value):
+    """Parse a YYYY-MM query parameter into the first day of that month"""
+    try:
+        return datetime.strptime(value, '%Y-%m').date()
+    except (TypeError, ValueError):
+        raise serializers.ValidationError(f'Invalid month "{value}". Use YYYY-MM.')
+
+
+class EnrollmentTrendsAPIView(APIView):
+    """
+    Monthly enrollments per status for ?from=YYYY-MM&to=YYYY-MM (default:
+    the last 12 months), read from the monthly facts only. Repeat ?course=
+    for one series per course; without it a single series covers all courses.
+    """
+    permission_classes = [IsAdminUser]
+
+    @cache_response('students.EnrollmentMonthlyFact', per_user=False)
+    def get(self, request):
+        params = request.query_params
+        try:
+            last = parse_month(params['to']) if 'to' in params else month_of(timezone.now())
+            first = parse_month(params['from']) if 'from' in params else add_months(last, -11)
+            course_ids = [uuid.UUID(value) for value in params.getlist('course')]
+        except serializers.ValidationError as e:
+            return Response({'error': e.detail[0]}, status=status.HTTP_400_BAD_REQUEST)
+        except ValueError:
+            return Response({
+                'error': 'Invalid course id'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        if first > last:
+            return Response({
+                'error': '"from" must not be after "to"'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if len(month_range(first, last)) > MAX_TREND_MONTHS:
+            return Response({
+                'error': f'A trend query may span at most {MAX_TREND_MONTHS} months'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        months, series = enrollment_trends(first, last, list(dict.fromkeys(course_ids)))
+        return Response({
+            'from': f'{first:%Y-%m}',
+            'to': f'{last:%Y-%m}',
+            'months': [f'{month:%Y-%m}' for month in months],
+            'series': series
+        }, status=status.HTTP_200_OK)
+
+
 class StudentDetailAPIView(APIView):
     """
     Retrieve, update or delete a student using APIView
@@ -108,10 +421,11 @@ class StudentDetailAPIView(APIView):
 
     def get_object(self, pk):
         try:
-            return Student.objects.select_related('user').prefetch_related('courses', 'enrollments__course').get(pk=pk)
+            return Student.objects.with_enrollment_summary().get(pk=pk)
         except Student.DoesNotExist:
             return None
 
+    @cache_response(*STUDENT_CACHE_MODELS)
     def get(self, request, pk):
         """Retrieve student details"""
         student = self.get_object(pk)
@@ -203,13 +517,14 @@ class StudentDetailAPIView(APIView):
         if request.user.is_superuser or request.user.role == 'admin':
             return True
         if hasattr(obj, 'user'):
-            return obj.user == request.user
+            return obj.user_id == request.user.pk
         return False
 
 
 class StudentEnrollmentAPIView(APIView):
     """Handle student enrollment in courses"""
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [EnrollThrottle]
 
     def post(self, request, pk):
         """Enroll student in a course"""
@@ -232,6 +547,20 @@ class StudentEnrollmentAPIView(APIView):
         )
 
         if serializer.is_valid():
+            # Courses in rush mode queue the request and answer with a ticket
+            course = serializer.validated_data['course_id']
+            if course.rush_mode:
+                from .enrollment_queue import submit_enrollment_request
+
+                ticket = submit_enrollment_request(student, course)
+                return Response({
+                    'message': f'Enrollment request for {course.course_code} queued',
+                    'request_id': str(ticket.request_id),
+                    'status': ticket.status,
+                    'status_url': reverse(
+                        'students:enrollment_request_status',
+                        args=[ticket.request_id], request=request),
+                }, status=status.HTTP_202_ACCEPTED)
             try:
                 enrollment = serializer.save()
                 return Response({
@@ -284,7 +613,7 @@ class StudentEnrollmentAPIView(APIView):
         if request.user.is_superuser or request.user.role == 'admin':
             return True
         if hasattr(obj, 'user'):
-            return obj.user == request.user
+            return obj.user_id == request.user.pk
         return False
 
 
@@ -292,10 +621,12 @@ class StudentEnrollmentsAPIView(APIView):
     """Get all enrollments for a student"""
     permission_classes = [permissions.IsAuthenticated]
 
+    @conditional_get(student_enrollments_validators)
+    @cache_response(*STUDENT_CACHE_MODELS)
     def get(self, request, pk):
         """Get student's enrollment history"""
         try:
-            student = Student.objects.get(pk=pk)
+            student = Student.objects.select_related('user').get(pk=pk)
         except Student.DoesNotExist:
             return Response({
                 'error': 'Student not found'
@@ -307,21 +638,29 @@ class StudentEnrollmentsAPIView(APIView):
                 'error': 'Permission denied'
             }, status=status.HTTP_403_FORBIDDEN)
 
+        # Sparse fieldsets (?fields= / ?expand=)
+        try:
+            fields = EnrollmentSerializer.get_requested_fields(
+                request.query_params)
+        except serializers.ValidationError as e:
+            return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
+
         # Filter enrollments
         status_filter = request.query_params.get('status')
-        queryset = student.enrollments.all()
+        queryset = student.enrollments.with_course_details(fields)
 
         if status_filter:
             queryset = queryset.filter(status=status_filter)
 
-        serializer = EnrollmentSerializer(queryset, many=True)
+        serializer = EnrollmentSerializer(queryset, many=True, fields=fields)
+        enrollments = serializer.data
 
         return Response({
             'student_id': student.student_id,
             'student_name': student.full_name,
-            'total_enrollments': queryset.count(),
+            'total_enrollments': len(enrollments),
             'active_enrollments': student.active_enrollments.count(),
-            'enrollments': serializer.data
+            'enrollments': enrollments
         }, status=status.HTTP_200_OK)
 
     def has_object_permission(self, request, obj):
@@ -329,10 +668,36 @@ class StudentEnrollmentsAPIView(APIView):
         if request.user.is_superuser or request.user.role == 'admin':
             return True
         if hasattr(obj, 'user'):
-            return obj.user == request.user
+            return obj.user_id == request.user.pk
         return False
 
 
+class StudentWaitlistsAPIView(APIView):
+    """Waitlists a student is on, with their place in each line"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        try:
+            student = Student.objects.select_related('user').get(pk=pk)
+        except Student.DoesNotExist:
+            return Response({
+                'error': 'Student not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        if not (request.user.is_superuser or request.user.role == 'admin' or
+                student.user_id == request.user.pk):
+            return Response({
+                'error': 'Permission denied'
+            }, status=status.HTTP_403_FORBIDDEN)
+
+        entries = student.waitlist_entries.with_rank().select_related('course')
+        return Response({
+            'student_id': student.student_id,
+            'student_name': student.full_name,
+            'waitlists': WaitlistSerializer(entries, many=True).data
+        }, status=status.HTTP_200_OK)
+
+
 class StudentChangeStatusAPIView(APIView):
     """Change student status using APIView"""
     permission_classes = [permissions.IsAuthenticated, IsStudentOwnerOrAdmin]
@@ -379,13 +744,20 @@ class StudentChangeCourseAPIView(APIView):
             course = Course.objects.get(pk=course_id, is_active=True)
 
             # For backward compatibility, enroll in the new course
-            if student.is_enrolled_in_course(course):
+            try:
+                result = Enrollment.objects.enroll(
+                    student.pk, course.pk, capacity=course.capacity)
+            except CourseFullError:
+                return Response({
+                    'error': 'Course is full'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            if not result.changed:
                 return Response({
                     'message': 'Student is already enrolled in this course',
                     'student': StudentSerializer(student).data
                 }, status=status.HTTP_200_OK)
 
-            enrollment = student.enroll_in_course(course)
+            enrollment = student.enrollments.get(course=course)
 
             return Response({
                 'message': f'Student enrolled in {course.course_name}',
@@ -399,10 +771,35 @@ class StudentChangeCourseAPIView(APIView):
             }, status=status.HTTP_404_NOT_FOUND)
 
 
+class EnrollmentRequestStatusAPIView(APIView):
+    """Status of a queued enrollment request (rush-mode ticket)"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        try:
+            ticket = EnrollmentRequest.objects.select_related(
+                'student__user', 'course').get(pk=pk)
+        except EnrollmentRequest.DoesNotExist:
+            return Response({
+                'error': 'Enrollment request not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        # Students can only see their own tickets
+        if not (request.user.is_superuser or request.user.role == 'admin' or
+                ticket.student.user_id == request.user.pk):
+            return Response({
+                'error': 'Permission denied'
+            }, status=status.HTTP_403_FORBIDDEN)
+
+        return Response(EnrollmentRequestSerializer(ticket).data,
+                        status=status.HTTP_200_OK)
+
+
 class StudentsByCourseAPIView(APIView):
     """Get all students by course using APIView"""
     permission_classes = [permissions.IsAuthenticated]
 
+    @cache_response(*STUDENT_CACHE_MODELS)
     def get(self, request):
         course_id = request.query_params.get('course_id')
         if not course_id:
@@ -410,25 +807,24 @@ class StudentsByCourseAPIView(APIView):
                 'error': 'course_id parameter is required'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        # Get students enrolled in the course
-        enrollments = Enrollment.objects.filter(
-            course_id=course_id,
-            status__in=['enrolled', 'completed']
-        ).select_related('student__user')
-
-        students = [enrollment.student for enrollment in enrollments]
+        # Get students enrolled in the course, most recent enrollment first
+        students = Student.objects.filter(
+            enrollments__course_id=course_id,
+            enrollments__status__in=['enrolled', 'completed']
+        ).order_by('-enrollments__enrollment_date').with_enrollment_summary(
+            fields=set(StudentBasicSerializer.Meta.fields))
 
         # Apply role-based filtering
         if hasattr(request.user, 'role') and request.user.role == 'student':
-            if hasattr(request.user, 'student_profile'):
-                students = [s for s in students if s.user == request.user]
+            if request.user.student_id is not None:
+                students = students.filter(user_id=request.user.pk)
             else:
-                students = []
+                students = students.none()
 
         serializer = StudentBasicSerializer(students, many=True)
         return Response({
             'course_id': course_id,
-            'students_count': len(students),
+            'students_count': len(serializer.data),
             'students': serializer.data
         }, status=status.HTTP_200_OK)
 
@@ -437,13 +833,14 @@ class ActiveStudentsAPIView(APIView):
     """Get all active students using APIView"""
     permission_classes = [permissions.IsAuthenticated]
 
+    @cache_response(*STUDENT_CACHE_MODELS)
     def get(self, request):
         queryset = Student.objects.filter(
-            status='active').select_related('user').prefetch_related('courses', 'enrollments__course')
+            status='active').with_enrollment_summary()
 
         # Apply role-based filtering
         if hasattr(request.user, 'role') and request.user.role == 'student':
-            if hasattr(request.user, 'student_profile'):
+            if request.user.student_id is not None:
                 queryset = queryset.filter(user=request.user)
             else:
                 queryset = queryset.none()
@@ -455,16 +852,85 @@ class ActiveStudentsAPIView(APIView):
         }, status=status.HTTP_200_OK)
 
 
+class MyDashboardAPIView(APIView):
+    """
+    Everything the student dashboard shows in one request: the student's
+    enrollment summary, credit totals, current courses and a page of active
+    courses they can still enroll in (?page=&page_size=).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    @cache_response(*STUDENT_CACHE_MODELS)
+    def get(self, request):
+        try:
+            student = Student.objects.select_related(
+                'user', 'academic_summary').get(user=request.user)
+        except Student.DoesNotExist:
+            return Response({
+                'error': 'Student profile not found for this user'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        # Counts and credit totals per status in one GROUP BY
+        enrollments = dict.fromkeys(
+            (value for value, _ in Enrollment.ENROLLMENT_STATUS_CHOICES), 0)
+        credits = {'enrolled': 0, 'earned': 0}
+        rows = Enrollment.objects.filter(student=student).order_by().values(
+            'status').annotate(total=Count('pk'), course_credits=Sum('course__credits'),
+                               earned=Sum('credits_earned'))
+        for row in rows:
+            enrollments[row['status']] = row['total']
+            if row['status'] == 'enrolled':
+                credits['enrolled'] = row['course_credits'] or 0
+            elif row['status'] == 'completed':
+                credits['earned'] = row['earned'] or 0
+
+        enrolled_courses = Course.objects.filter(
+            enrollments__student=student, enrollments__status='enrolled'
+        ).with_enrollment_counts().order_by('course_name')
+
+        available = Course.objects.filter(is_active=True).not_enrolled_by(
+            student.pk).with_enrollment_counts().order_by('course_name', 'course_id')
+        page_size = parse_page_size(request.query_params.get('page_size'))
+        paginator = Paginator(available, page_size)
+        page_obj = paginator.get_page(request.query_params.get('page', 1))
+
+        summary = getattr(student, 'academic_summary', None)
+        return Response({
+            'student': {
+                'student_id': student.student_id,
+                'student_number': student.student_number,
+                'full_name': student.full_name,
+                'email': student.email,
+                'phone': student.user.phone,
+                'status': student.status,
+                'is_active': student.is_active_student,
+            },
+            'enrollments': {**enrollments, 'total': sum(enrollments.values())},
+            'credits': credits,
+            'academic_summary': AcademicSummarySerializer(summary).data if summary else None,
+            'enrolled_courses': CourseSerializer(enrolled_courses, many=True).data,
+            'available_courses': {
+                'count': paginator.count,
+                'next': page_obj.has_next(),
+                'previous': page_obj.has_previous(),
+                'page': page_obj.number,
+                'total_pages': paginator.num_pages,
+                'results': CourseSerializer(page_obj.object_list, many=True).data
+            }
+        }, status=status.HTTP_200_OK)
+
+
 class MyProfileAPIView(APIView):
     """
     Student's own profile view using APIView
     """
     permission_classes = [permissions.IsAuthenticated]
 
+    @conditional_get(my_profile_validators)
     def get(self, request):
         """Get current user's student profile"""
         try:
-            student = request.user.student_profile
+            student = Student.objects.with_enrollment_summary().get(user_id=request.user.pk)
             serializer = StudentSerializer(student)
             return Response(serializer.data, status=status.HTTP_200_OK)
         except Student.DoesNotExist:
@@ -0,0 +1,70 @@
+"""
+Waitlist promotion for Student Course Management System
+
+Withdrawals only free a seat; they never promote anyone themselves. The
+promote_waitlists pass finds the courses that have both free seats and a
+waitlist, and fills each course's seats from the head of its waitlist in a
+single transaction: one seat lock, one range read of the next entries, one
+batched allocation and one range delete, however many seats were freed.
+"""
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Q
+
+from courses.models import Course
+from student_course_management.db import retry_on_deadlock
+from .enrollment_queue import get_batch_size
+from .models import SEATED_OUTCOMES, Enrollment, Waitlist
+
+
+def courses_to_promote():
+    """Primary keys of courses with a waitlist and at least one free seat"""
+    return list(Course.objects.with_enrollment_counts().filter(
+        Exists(Waitlist.objects.filter(course=OuterRef('pk')))
+    ).filter(
+        Q(capacity__isnull=True) | Q(capacity__gt=F('enrolled_students_total'))
+    ).order_by().values_list('pk', flat=True))
+
+
+@retry_on_deadlock
+def promote_course(course_id):
+    """
+    Enroll waitlisted students into a course's free seats, lowest position first.
+
+    Returns the number of students enrolled. Entries of students who turn
+    out to be enrolled already are dropped along the way.
+    """
+    promoted = 0
+    with transaction.atomic():
+        capacity, taken = Course.objects.lock_seats(course_id)
+        entries = Waitlist.objects.filter(course_id=course_id).order_by('position')
+        last_position = None
+
+        while capacity is None or taken < capacity:
+            limit = get_batch_size() if capacity is None else capacity - taken
+            if last_position is not None:
+                entries = entries.filter(position__gt=last_position)
+            batch = list(entries.values_list('position', 'student_id')[:limit])
+            if not batch:
+                break
+
+            outcomes = Enrollment.objects.allocate_seats(
+                course_id, [student_id for _, student_id in batch],
+                seats=(capacity, taken), waitlist=False)
+            enrolled = sum(1 for outcome in outcomes.values()
+                           if outcome in SEATED_OUTCOMES)
+            promoted += enrolled
+            if capacity is not None:
+                taken += enrolled
+            last_position = batch[-1][0]
+
+        if last_position is not None:
+            # Promoted entries are always a prefix of the waitlist
+            Waitlist.objects.filter(
+                course_id=course_id, position__lte=last_position).delete()
+    return promoted
+
+
+def promote_waitlists():
+    """Run one promotion pass over every course; returns {course_id: promoted}"""
+    return {course_id: promote_course(course_id)
+            for course_id in courses_to_promote()}